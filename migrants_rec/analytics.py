@@ -0,0 +1,36 @@
+"""Analytics dashboard, served from the precomputed rollups."""
+
+from flask import Blueprint, render_template
+from flask_login import login_required
+
+from rollups import distribution as rollup_distribution, load as load_rollups
+from surveillance import alerts as surveillance_alerts
+
+bp = Blueprint("analytics", __name__)
+
+
+@bp.route("/analytics")
+@login_required
+def dashboard():
+    """Analytics dashboard for migrant health data"""
+    analytics_data = get_analytics_data()
+    return render_template(
+        "analytics.html",
+        title="Analytics Dashboard",
+        analytics=analytics_data,
+        alerts=surveillance_alerts()
+    )
+
+
+# Analytics helper functions
+def get_analytics_data():
+    """Generate analytics data for the dashboard from the precomputed rollups"""
+    rollups = load_rollups()
+    analytics = {}
+    analytics['total_migrants'] = sum(count for dim, _, count in rollups if dim == 'total')
+    analytics['gender_distribution'] = rollup_distribution(rollups, 'gender')
+    analytics['nationality_distribution'] = rollup_distribution(rollups, 'nationality', top=5)
+    analytics['health_distribution'] = rollup_distribution(rollups, 'health_condition')
+    analytics['age_distribution'] = rollup_distribution(rollups, 'age')
+    analytics['occupation_distribution'] = rollup_distribution(rollups, 'occupation', top=5)
+    return analytics
@@ -0,0 +1,205 @@
+"""Versioned JSON API for field tablets (/api/v1)."""
+
+import gzip
+import hashlib
+import json
+from functools import wraps
+
+from flask import Blueprint, current_app, jsonify, request, url_for
+from flask_login import current_user
+
+from exporter import EXPORTABLE_COLUMNS, plain_value
+from importer import RowValidator
+from models import db, Migrant
+from pagination import paginate_keyset
+from search import apply_search, ranked_ids
+
+try:
+    import brotli
+except ImportError:  # Optional: gzip is used when brotli is not installed
+    brotli = None
+
+api = Blueprint("api_v1", __name__, url_prefix="/api/v1")
+
+# Fields a client may request with ?fields= and send when writing
+API_FIELDS = EXPORTABLE_COLUMNS
+# Set by the server: the key, bmi (from height and weight) and the mapper's optimistic-locking version
+READ_ONLY_FIELDS = ("id", "bmi", Migrant.__mapper__.version_id_col.key)
+WRITABLE_FIELDS = tuple(field for field in API_FIELDS if field not in READ_ONLY_FIELDS)
+
+
+def api_login_required(f):
+    """Like login_required, but answers 401 JSON instead of redirecting to the login page."""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if not current_user.is_authenticated:
+            return jsonify(error="Authentication required"), 401
+        return f(*args, **kwargs)
+    return decorated_function
+
+
+def _error(message, status, **extra):
+    return jsonify(error=message, **extra), status
+
+
+def _requested_fields():
+    """Parse ?fields= into a column list that always starts with id; None means invalid."""
+    raw = request.args.get("fields")
+    if not raw:
+        return list(API_FIELDS)
+    fields = [name.strip() for name in raw.split(",") if name.strip()]
+    if any(name not in API_FIELDS for name in fields):
+        return None
+    return ["id"] + [name for name in dict.fromkeys(fields) if name != "id"]
+
+
+def serialize(row, fields):
+    """JSON-ready {field: value} for ``fields`` of a Migrant or result row."""
+    return {name: plain_value(getattr(row, name)) for name in fields}
+
+
+def _conditional_json(payload):
+    """JSON response with a weak content ETag; 304 if the client already has it."""
+    body = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+    etag = hashlib.sha256(body.encode("utf-8")).hexdigest()[:32]
+    if request.if_none_match.contains_weak(etag):
+        response = current_app.response_class(status=304)
+    else:
+        response = current_app.response_class(body, mimetype="application/json")
+    # Weak, because the same record may go out gzip- or brotli-encoded
+    response.set_etag(etag, weak=True)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True  # Always revalidate; a 304 costs a few bytes
+    return response
+
+
+@api.after_request
+def compress_response(response):
+    """gzip/brotli-encode JSON bodies large enough to benefit."""
+    if (response.status_code != 200 or response.direct_passthrough
+            or "Content-Encoding" in response.headers or response.mimetype != "application/json"):
+        return response
+    response.vary.add("Accept-Encoding")
+    data = response.get_data()
+    if len(data) < current_app.config["API_COMPRESS_MIN_SIZE"]:
+        return response
+    if brotli is not None and request.accept_encodings["br"]:
+        response.set_data(brotli.compress(data, quality=5))
+        response.headers["Content-Encoding"] = "br"
+    elif request.accept_encodings["gzip"]:
+        response.set_data(gzip.compress(data, compresslevel=6))
+        response.headers["Content-Encoding"] = "gzip"
+    return response
+
+
+@api.route("/migrants")
+@api_login_required
+def list_migrants():
+    """Keyset-paginated list; accepts fields, q/by, after/before and per_page like the index page."""
+    fields = _requested_fields()
+    if fields is None:
+        return _error("Unknown field in ?fields=", 400, allowed=list(API_FIELDS))
+    config = current_app.config
+    per_page = request.args.get("per_page", type=int) or config["MIGRANTS_PER_PAGE"]
+    per_page = max(1, min(per_page, config["MAX_MIGRANTS_PER_PAGE"]))
+    search_term, filter_by = request.args.get("q"), request.args.get("by")
+    query = db.session.query(*[getattr(Migrant, name) for name in fields])
+
+    if search_term and request.args.get("sort") == "relevance":
+        # Best matches first; one page only, since bm25 order has no stable cursor
+        ids = ranked_ids(search_term, filter_by, per_page)
+        rows = {row.id: row for row in query.filter(Migrant.id.in_(ids))} if ids else {}
+        return _conditional_json({"data": [serialize(rows[i], fields) for i in ids if i in rows], "links": {}})
+
+    if search_term:
+        query = apply_search(query, search_term, filter_by)
+    page = paginate_keyset(
+        query, Migrant.id,
+        after=request.args.get("after", type=int),
+        before=request.args.get("before", type=int),
+        per_page=per_page
+    )
+    link_args = {k: v for k, v in request.args.items() if k not in ("after", "before")}
+    links = {}
+    if page.has_next:
+        links["next"] = url_for("api_v1.list_migrants", after=page.next_cursor, **link_args)
+    if page.has_prev:
+        links["prev"] = url_for("api_v1.list_migrants", before=page.prev_cursor, **link_args)
+    return _conditional_json({"data": [serialize(row, fields) for row in page.items], "links": links})
+
+
+@api.route("/migrants/<int:migrant_id>")
+@api_login_required
+def get_migrant(migrant_id):
+    fields = _requested_fields()
+    if fields is None:
+        return _error("Unknown field in ?fields=", 400, allowed=list(API_FIELDS))
+    row = db.session.query(*[getattr(Migrant, name) for name in fields]).filter(Migrant.id == migrant_id).first()
+    if row is None:
+        return _error("Migrant not found", 404)
+    return _conditional_json({"data": serialize(row, fields)})
+
+
+def _json_body():
+    payload = request.get_json(silent=True)
+    return payload if isinstance(payload, dict) else None
+
+
+def validate_payload(payload, base=None):
+    """Validate ``payload`` (merged over ``base`` column values) with the MigrantForm rules."""
+    unknown = [key for key in payload if key not in WRITABLE_FIELDS]
+    if unknown:
+        return None, {key: ["Unknown or read-only field."] for key in unknown}
+    data = dict(base or {})
+    data.update(payload)
+    return RowValidator()(data)
+
+
+@api.route("/migrants", methods=["POST"])
+@api_login_required
+def create_migrant():
+    payload = _json_body()
+    if payload is None:
+        return _error("Expected a JSON object body", 415)
+    values, errors = validate_payload(payload)
+    if errors:
+        return _error("Validation failed", 422, fields=errors)
+    migrant = Migrant(**values)
+    db.session.add(migrant)
+    try:
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return _error(f"Could not save record: {getattr(e, 'orig', e)}", 409)
+    response = _conditional_json({"data": serialize(migrant, list(API_FIELDS))})
+    response.status_code = 201
+    response.headers["Location"] = url_for("api_v1.get_migrant", migrant_id=migrant.id)
+    return response
+
+
+@api.route("/migrants/<int:migrant_id>", methods=["PUT", "PATCH"])
+@api_login_required
+def update_migrant(migrant_id):
+    migrant = Migrant.with_groups().filter(Migrant.id == migrant_id).first()
+    if migrant is None:
+        return _error("Migrant not found", 404)
+    payload = _json_body()
+    if payload is None:
+        return _error("Expected a JSON object body", 415)
+    base = {field: getattr(migrant, field) for field in WRITABLE_FIELDS} if request.method == "PATCH" else None
+    values, errors = validate_payload(payload, base)
+    if errors:
+        return _error("Validation failed", 422, fields=errors)
+    for field, value in values.items():
+        setattr(migrant, field, value)
+    try:
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return _error(f"Could not save record: {getattr(e, 'orig', e)}", 409)
+    return _conditional_json({"data": serialize(migrant, list(API_FIELDS))})
+
+
+def init_app(app):
+    """Register the API blueprint on ``app``."""
+    app.register_blueprint(api)
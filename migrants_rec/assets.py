@@ -0,0 +1,89 @@
+"""Static assets under content-hashed names, cached for good by browsers.
+
+`python build_assets.py` copies every file in ASSETS (our own CSS/JS
+minified, the vendored libraries as shipped) to static/dist/ as
+``<name>.<hash>.<ext>``, writes gzip and, when the optional ``brotli``
+package is installed, brotli copies next to each, and records the names in
+static/dist/manifest.json. Templates link assets with ``asset_url("aos.js")``.
+A fingerprinted file never changes, so it is served with a year-long
+immutable Cache-Control: a repeat visit takes every script and stylesheet
+from the browser cache without revalidating it.
+
+The libraries are vendored under static/vendor/ and served from here; pages
+never load them from a CDN. Before a build, asset_url falls back to the
+plain static file.
+"""
+
+import json
+import mimetypes
+import os
+
+from flask import Blueprint, abort, current_app, request, send_from_directory, url_for
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+DIST_DIR = os.path.join(STATIC_DIR, "dist")
+MANIFEST_PATH = os.path.join(DIST_DIR, "manifest.json")
+
+# Logical name -> (source under static/, upstream URL of a vendored library or None for our own files).
+# Library versions are pinned; build_assets.py --fetch downloads a missing one from its upstream URL.
+ASSETS = {
+    "tailwind.js": ("vendor/tailwindcss-3.4.5.js", "https://cdn.tailwindcss.com/3.4.5"),
+    "aos.css": ("vendor/aos-2.3.1.css", "https://unpkg.com/aos@2.3.1/dist/aos.css"),
+    "aos.js": ("vendor/aos-2.3.1.js", "https://unpkg.com/aos@2.3.1/dist/aos.js"),
+    "feather.js": ("vendor/feather-icons-4.29.1.min.js", "https://unpkg.com/feather-icons@4.29.1/dist/feather.min.js"),
+    "chart.js": ("vendor/chart-4.4.0.umd.js", "https://cdn.jsdelivr.net/npm/chart.js@4.4.0/dist/chart.umd.js"),
+    "main.js": ("main.js", None),
+    "analytics.js": ("analytics.js", None),
+    "visits.js": ("visits.js", None),
+}
+
+# Content-Encoding -> suffix of the precompressed copy, in order of preference
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+bp = Blueprint("assets", __name__)
+
+
+def load_manifest(path=MANIFEST_PATH):
+    """{logical name: fingerprinted file name}; empty before the first build."""
+    try:
+        with open(path, encoding="utf-8") as stream:
+            return json.load(stream)
+    except FileNotFoundError:
+        return {}
+
+
+def asset_url(name):
+    """URL of asset ``name``: fingerprinted if built, else the plain static file."""
+    built = current_app.extensions["assets"].get(name)
+    if built:
+        return url_for("assets.asset", filename=built)
+    return url_for("static", filename=ASSETS[name][0])
+
+
+@bp.route("/assets/<filename>")
+def asset(filename):
+    """A fingerprinted asset, precompressed if the browser accepts it; cached as immutable."""
+    if filename not in current_app.extensions["assets_files"]:
+        abort(404)
+    sent, encoding = filename, None
+    for candidate, suffix in ENCODINGS:
+        if candidate in request.accept_encodings and os.path.exists(os.path.join(DIST_DIR, filename + suffix)):
+            sent, encoding = filename + suffix, candidate
+            break
+    response = send_from_directory(DIST_DIR, sent, mimetype=mimetypes.guess_type(filename)[0],
+                                   max_age=current_app.config["ASSET_MAX_AGE"], conditional=True, etag=True)
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    response.vary.add("Accept-Encoding")
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+
+def init_app(app):
+    """Load the asset manifest and make ``asset_url`` available to templates."""
+    manifest = load_manifest()
+    app.extensions["assets"] = manifest
+    app.extensions["assets_files"] = frozenset(manifest.values())
+    app.add_template_global(asset_url)
+    app.register_blueprint(bp)
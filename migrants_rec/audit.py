@@ -0,0 +1,107 @@
+"""Audit trail: one ``field_changes`` row per field changed by an update of a migrant.
+
+Migrant.version is the mapper's version_id_col, so every ORM update bumps
+it and only succeeds while the row still has the version that was loaded.
+A mapper event writes the fields the update actually changed, with their
+old and new values, under the new version number. Together they let the
+edit page tell what someone else changed since a form was opened (see
+:func:`changes_since`), and the record's history page list who changed
+what, without keeping copies of whole rows.
+"""
+
+from datetime import date, datetime
+
+from flask import Blueprint, current_app, has_request_context, render_template, request
+from flask_login import current_user, login_required
+from sqlalchemy import event, inspect, text
+
+from models import db, FieldChange, Migrant, User
+from pagination import paginate_keyset
+
+bp = Blueprint("audit", __name__)
+
+# Not worth a row: the version itself, and the QR cache key qr.py stores when the code is shown
+IGNORED_FIELDS = ("version", "qr_code")
+
+_INSERT_SQL = text(
+    "INSERT INTO field_changes (migrant_id, version, field, old_value, new_value, user_id, changed_at) "
+    "VALUES (:migrant_id, :version, :field, :old_value, :new_value, :user_id, :changed_at)"
+)
+
+
+def as_text(value):
+    """How a column value is stored in the change log (and compared by the conflict view)."""
+    if value is None or value == "":
+        return None
+    return value.isoformat() if isinstance(value, date) else str(value)
+
+
+def _current_user_id():
+    if has_request_context() and current_user.is_authenticated:
+        return current_user.id
+    return None
+
+
+# ORM hook: changes are written on the flush connection, inside the update's own transaction.
+@event.listens_for(Migrant, "after_update")
+def _after_update(mapper, connection, target):
+    state = inspect(target)
+    rows = []
+    for attr in mapper.column_attrs:
+        if attr.key in IGNORED_FIELDS:
+            continue
+        history = state.attrs[attr.key].history  # Does not load deferred columns
+        if not history.has_changes():
+            continue
+        # An attribute assigned without being loaded first has no old value to record
+        old = as_text(history.deleted[0]) if history.deleted else None
+        new = as_text(history.added[0]) if history.added else None
+        if old != new:
+            rows.append({"field": attr.key, "old_value": old, "new_value": new})
+    if rows:
+        common = {"migrant_id": target.id, "version": target.version, "user_id": _current_user_id(),
+                  "changed_at": datetime.now()}
+        connection.execute(_INSERT_SQL, [{**common, **row} for row in rows])
+
+
+def _change_rows(migrant_id):
+    return db.session.query(
+        FieldChange.id, FieldChange.version, FieldChange.field, FieldChange.old_value, FieldChange.new_value,
+        FieldChange.changed_at, User.username,
+    ).outerjoin(User, User.id == FieldChange.user_id).filter(FieldChange.migrant_id == migrant_id)
+
+
+def changes_since(migrant_id, version):
+    """The field changes made to a migrant after ``version``, oldest first, with the username behind each."""
+    return _change_rows(migrant_id).filter(FieldChange.version > version).order_by(
+        FieldChange.version, FieldChange.id).all()
+
+
+def format_cursor(cursor):
+    return f"{cursor[0]}.{cursor[1]}" if cursor else None
+
+
+def parse_cursor(value):
+    """Turn a "<version>.<id>" paging cursor back into (version, id); None if it is malformed."""
+    try:
+        version, change_id = value.split(".")
+        return int(version), int(change_id)
+    except (AttributeError, ValueError):
+        return None
+
+
+@bp.route("/view/<int:migrant_id>/changes")
+@login_required
+def change_history(migrant_id):
+    """Who changed which field of a record, and when, newest first."""
+    migrant = db.get_or_404(Migrant, migrant_id)
+    page = paginate_keyset(_change_rows(migrant_id), (FieldChange.version, FieldChange.id),
+                           after=parse_cursor(request.args.get("after")), before=parse_cursor(request.args.get("before")),
+                           per_page=current_app.config["CHANGES_PER_PAGE"])
+    return render_template("change_history.html", migrant=migrant, page=page, format_cursor=format_cursor,
+                           title=f"Change History: {migrant.name}")
+
+
+def init_app(app):
+    """Register the change history page on ``app``."""
+    app.register_blueprint(bp)
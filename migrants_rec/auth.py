@@ -0,0 +1,93 @@
+"""Login, logout and registration, plus the login manager and admin_required."""
+
+from functools import wraps
+
+from flask import Blueprint, flash, redirect, render_template, request, session, url_for
+from flask_login import LoginManager, current_user, login_user, logout_user
+
+from forms import LoginForm, RegistrationForm
+from models import db, User
+from user_cache import get_user_cache
+
+bp = Blueprint("auth", __name__)
+
+login_manager = LoginManager()
+login_manager.login_view = "auth.login"
+
+
+def admin_required(f):
+    """Decorator for routes that require admin access."""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        # The role is kept in the signed session (see load_user), so no query is needed here
+        if not current_user.is_authenticated or session.get('role') != 'admin':
+            flash('You need admin privileges to access this page.', 'danger')
+            return redirect(url_for('auth.login'))
+        return f(*args, **kwargs)
+    return decorated_function
+
+
+@login_manager.user_loader
+def load_user(user_id):
+    """Load user by ID for Flask-Login from the per-worker user cache."""
+    user = get_user_cache().get(int(user_id))
+    if user is not None and session.get('role') != user.role:
+        session['role'] = user.role  # Picks up role changes once the cache entry refreshes
+    return user
+
+
+@bp.route("/login", methods=["GET", "POST"])
+def login():
+    if current_user.is_authenticated:
+        return redirect(url_for("records.index"))
+    form = LoginForm()
+    if form.validate_on_submit():
+        # Hardcoded admin login for quick testing (as requested)
+        if form.username.data == "Admin" and form.password.data == "admin@123":
+            user = User.query.filter_by(username="Admin").first()
+            if not user:
+                # Create the Admin user if it doesn't exist
+                user = User(username="Admin", email="admin@example.com", role="admin")
+                user.set_password("admin@123")
+                db.session.add(user)
+                db.session.commit()
+            flash(f"Welcome back, {user.username}!", "success")
+            login_user(user)
+            session['role'] = user.role
+        else:
+            # Check database for registered user (healthcare workers)
+            user = User.query.filter_by(username=form.username.data).first()
+            if user is None or not user.check_password(form.password.data):
+                flash("Invalid username or password", "danger")
+                return redirect(url_for("auth.login"))
+            login_user(user)
+            session['role'] = user.role
+            flash(f"Welcome back, {user.username}!", "success")
+            
+        next_page = request.args.get("next")
+        if not next_page or not next_page.startswith("/"):
+            next_page = url_for("records.index")
+        return redirect(next_page)
+        
+    return render_template("login.html", form=form)
+
+
+@bp.route("/logout")
+def logout():
+    logout_user()
+    session.pop('role', None)
+    flash("You have been logged out.", "info")
+    return redirect(url_for("records.index"))
+
+
+@bp.route("/register", methods=["GET", "POST"])
+def register():
+    form = RegistrationForm()
+    if form.validate_on_submit():
+        user = User(username=form.username.data, email=form.email.data, role=form.role.data)
+        user.set_password(form.password.data)
+        db.session.add(user)
+        db.session.commit()
+        flash(f"User {form.username.data} has been registered!", "success")
+        return redirect(url_for("records.index"))
+    return render_template("register.html", form=form)
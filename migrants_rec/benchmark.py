@@ -0,0 +1,257 @@
+"""Benchmark the hot routes against a synthetic database of a given size.
+
+Seeds (or tops up) an SQLite database with synthetic_data, then drives each
+route through the Flask test client and reports latency percentiles, SQL
+queries per request and peak Python memory. Results are written as JSON so
+runs can be compared with --compare.
+
+Usage: python benchmark.py [--rows 100000] [--requests 50] [--db FILE] [--output FILE] [--compare OLD.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from sqlalchemy import event
+
+from app import create_app, init_db
+from config import Config, engine_options
+from models import db, Migrant, User
+from synthetic_data import generate_rows, seed_database
+
+PERCENTILES = (50, 90, 95, 99)
+WARMUP_REQUESTS = 3
+MEMORY_REQUESTS = 5
+BENCH_USER = ("bench_worker", "bench-password")
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    rank = max(1, -(-pct * len(sorted_values) // 100))
+    return sorted_values[rank - 1]
+
+
+def _form_data(values):
+    """Turn a synthetic row into the POST body the add form expects."""
+    data = {}
+    for name, value in values.items():
+        if value is None or value is False or name in ("bmi", "qr_code"):
+            continue
+        data[name] = "y" if value is True else str(value)
+    return data
+
+
+def build_scenarios(rows, rng):
+    """Return (name, description, make_request) for every benchmarked route.
+
+    ``make_request(client)`` issues one request and returns the response.
+    """
+    max_id = rows
+    new_rows = generate_rows(10**6, seed=rng.randrange(10**6), start=10**9)
+    qr_hot_id = max(1, max_id // 2)
+    qr_etag = {}
+
+    def index(client):
+        return client.get("/")
+
+    def index_deep(client):
+        return client.get(f"/?after={rng.randrange(1, max_id + 1)}")
+
+    def search_name(client):
+        return client.get("/?q=" + rng.choice(("Rahul", "Sunita Das", "Mondal", "Priya")) + "&by=name")
+
+    def search_all(client):
+        return client.get("/?q=" + rng.choice(("fever", "Malaria", "Hypertension", "Good")) + "&by=all")
+
+    def search_contact(client):
+        return client.get(f"/?q=9{rng.randrange(1000):03d}&by=contact")
+
+    def analytics(client):
+        return client.get("/analytics")
+
+    def follow_up_list(client):
+        return client.get("/follow-ups")
+
+    def qr_cold(client):
+        return client.get(f"/qrcode/{rng.randrange(1, max_id + 1)}")
+
+    def qr_warm(client):
+        return client.get(f"/qrcode/{qr_hot_id}")
+
+    def qr_revalidate(client):
+        if "etag" not in qr_etag:
+            qr_etag["etag"] = client.get(f"/qrcode/{qr_hot_id}").headers.get("ETag", "")
+        return client.get(f"/qrcode/{qr_hot_id}", headers={"If-None-Match": qr_etag["etag"]})
+
+    def add_migrant(client):
+        return client.post("/add", data=_form_data(next(new_rows)))
+
+    def login(client):
+        # A fresh client per login, so the request is never short-circuited as already authenticated
+        fresh = client.application.test_client()
+        return fresh.post("/login", data={"username": BENCH_USER[0], "password": BENCH_USER[1]})
+
+    return [
+        ("index", "GET / first page", index),
+        ("index_deep", "GET /?after=<random id>", index_deep),
+        ("search_name", "GET /?by=name", search_name),
+        ("search_all", "GET /?by=all", search_all),
+        ("search_contact", "GET /?by=contact prefix", search_contact),
+        ("analytics", "GET /analytics", analytics),
+        ("follow_ups", "GET /follow-ups due this week", follow_up_list),
+        ("qrcode_cold", "GET /qrcode/<random id>", qr_cold),
+        ("qrcode_warm", "GET /qrcode/<same id>", qr_warm),
+        ("qrcode_304", "GET /qrcode with If-None-Match", qr_revalidate),
+        ("add_migrant", "POST /add", add_migrant),
+        ("login", "POST /login (password check)", login),
+    ]
+
+
+def measure(client, make_request, requests, query_counter):
+    """Time ``requests`` calls of ``make_request``; returns the per-route result dict."""
+    for _ in range(WARMUP_REQUESTS):
+        make_request(client)
+    timings, queries, errors = [], [], 0
+    for _ in range(requests):
+        query_counter[0] = 0
+        started = time.perf_counter()
+        response = make_request(client)
+        timings.append((time.perf_counter() - started) * 1000)
+        queries.append(query_counter[0])
+        if response.status_code >= 400:
+            errors += 1
+    # tracemalloc slows everything down, so peak memory gets its own short pass
+    tracemalloc.start()
+    peak = 0
+    for _ in range(MEMORY_REQUESTS):
+        tracemalloc.reset_peak()
+        make_request(client)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+    tracemalloc.stop()
+    timings.sort()
+    result = {f"p{pct}_ms": round(percentile(timings, pct), 3) for pct in PERCENTILES}
+    result.update(
+        requests=requests,
+        mean_ms=round(sum(timings) / len(timings), 3),
+        max_ms=round(timings[-1], 3),
+        queries_per_request=round(sum(queries) / len(queries), 2),
+        max_queries=max(queries),
+        peak_memory_kib=round(peak / 1024, 1),
+        errors=errors,
+    )
+    return result
+
+
+def _git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def compare(old, new):
+    """Print p50/p95 and query-count changes between two result documents."""
+    print(f"\nCompared with {old['meta'].get('revision')} ({old['meta']['rows']} rows, {old['meta']['timestamp']}):")
+    print(f"{'route':<16}{'p50 ms':>20}{'p95 ms':>22}{'queries':>14}")
+    for name, result in new["routes"].items():
+        before = old["routes"].get(name)
+        if before is None:
+            print(f"{name:<16}{'(new)':>20}")
+            continue
+        cells = []
+        for key in ("p50_ms", "p95_ms"):
+            change = (result[key] - before[key]) / before[key] * 100 if before[key] else 0.0
+            cells.append(f"{before[key]:.1f} -> {result[key]:.1f} ({change:+.0f}%)")
+        print(f"{name:<16}{cells[0]:>20}{cells[1]:>22}"
+              f"{before['queries_per_request']:>7.1f} -> {result['queries_per_request']:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the hot routes.")
+    parser.add_argument("--rows", type=int, default=10000, help="Synthetic records in the database (10000, 100000, 1000000, ...)")
+    parser.add_argument("--requests", type=int, default=50, help="Timed requests per route")
+    parser.add_argument("--seed", type=int, default=42, help="Seed for the data and the request mix")
+    parser.add_argument("--db", help="SQLite file to use and keep (default: a throwaway file); topped up to --rows")
+    parser.add_argument("--output", help="Where to write the JSON results (default: benchmark-<rows>-<time>.json)")
+    parser.add_argument("--compare", metavar="OLD_JSON", help="Earlier results to compare against")
+    args = parser.parse_args()
+
+    db_path = os.path.abspath(args.db) if args.db else os.path.join(tempfile.mkdtemp(prefix="mhr-bench-"), "bench.db")
+
+    class BenchmarkConfig(Config):
+        SQLALCHEMY_DATABASE_URI = "sqlite:///" + db_path
+        SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
+        WTF_CSRF_ENABLED = False
+        # Keep rendered QR images away from the real cache directory
+        QR_CACHE_DIR = os.path.join(os.path.dirname(db_path), "qr_cache")
+
+    app = create_app(BenchmarkConfig)
+    with app.app_context():
+        init_db()
+        existing = db.session.query(Migrant.id).count()
+        if existing < args.rows:
+            print(f"Seeding {args.rows - existing} synthetic records into {db_path} ...")
+            started = time.perf_counter()
+            seed_database(args.rows - existing, seed=args.seed, start=existing)
+            print(f"  done in {time.perf_counter() - started:.1f}s")
+        if User.query.filter_by(username=BENCH_USER[0]).first() is None:
+            user = User(username=BENCH_USER[0], email="bench@example.com", role="healthcare_worker")
+            user.set_password(BENCH_USER[1])
+            db.session.add(user)
+            db.session.commit()
+        rows = db.session.query(Migrant.id).count()
+        engine = db.engine
+
+    query_counter = [0]
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        query_counter[0] += 1
+
+    client = app.test_client()
+    client.post("/login", data={"username": "Admin", "password": "admin@123"})
+    rng = random.Random(args.seed)
+    results = {}
+    for name, description, make_request in build_scenarios(rows, rng):
+        results[name] = dict(description=description, **measure(client, make_request, args.requests, query_counter))
+        r = results[name]
+        print(f"{name:<16} p50 {r['p50_ms']:8.2f} ms  p95 {r['p95_ms']:8.2f} ms  p99 {r['p99_ms']:8.2f} ms  "
+              f"{r['queries_per_request']:5.1f} queries  {r['peak_memory_kib']:9.1f} KiB peak"
+              + (f"  {r['errors']} errors" if r["errors"] else ""))
+
+    document = {
+        "meta": {
+            "rows": rows,
+            "requests": args.requests,
+            "seed": args.seed,
+            "revision": _git_revision(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+        },
+        "routes": results,
+    }
+    output = args.output or f"benchmark-{rows}-{datetime.now():%Y%m%d-%H%M%S}.json"
+    with open(output, "w", encoding="utf-8") as stream:
+        json.dump(document, stream, indent=2)
+    print(f"Results written to {output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as stream:
+            compare(json.load(stream), document)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
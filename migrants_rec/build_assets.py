@@ -0,0 +1,150 @@
+"""Build static/dist/: fingerprinted, minified and precompressed copies of the assets in assets.ASSETS.
+
+Our own CSS and JavaScript are minified; the vendored libraries under
+static/vendor/ are copied as shipped (they are minified builds). Each file
+is written as <name>.<hash>.<ext> with .gz and .br copies (.br needs the
+optional brotli package) and listed in static/dist/manifest.json. Files of
+earlier builds are removed. --fetch first downloads the pinned libraries
+that are not vendored yet; commit static/vendor/ and static/dist/ after it.
+With --check nothing is written, and the run fails if a library is not
+vendored or the committed build does not match its sources (use it in CI).
+
+Usage: python build_assets.py [--fetch] [--check]
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import sys
+import urllib.request
+
+from assets import ASSETS, DIST_DIR, MANIFEST_PATH, STATIC_DIR, load_manifest
+
+try:
+    import brotli
+except ImportError:  # Optional: only the gzip copies are written without it
+    brotli = None
+
+HASH_LENGTH = 12
+
+_CSS_COMMENT_RE = re.compile(r"/\*.*?\*/", re.DOTALL)
+_CSS_SPACE_RE = re.compile(r"\s*([{};,>])\s*")
+
+
+def minify_css(source):
+    """Drop comments and the whitespace around punctuation (our stylesheets use no quoted strings with those)."""
+    source = _CSS_COMMENT_RE.sub("", source)
+    source = _CSS_SPACE_RE.sub(r"\1", re.sub(r"\s+", " ", source))
+    source = re.sub(r":\s+", ":", source)  # Only after a colon: "a :hover" is a different selector
+    return source.replace(";}", "}").strip()
+
+
+def minify_js(source):
+    """Drop indentation, blank lines and whole-line // comments; statements and strings are left alone."""
+    lines = (line.strip() for line in source.splitlines())
+    return "\n".join(line for line in lines if line and not line.startswith("//")) + "\n"
+
+
+def built_name(source, data):
+    stem, ext = os.path.splitext(os.path.basename(source))
+    return f"{stem}.{hashlib.sha256(data).hexdigest()[:HASH_LENGTH]}{ext}"
+
+
+def build(name):
+    """Return (fingerprinted file name, contents) for asset ``name``, or None if its source is missing."""
+    source, upstream_url = ASSETS[name]
+    path = os.path.join(STATIC_DIR, source)
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as stream:
+        data = stream.read()
+    if upstream_url is None:  # Our own file
+        if source.endswith(".css"):
+            data = minify_css(data.decode("utf-8")).encode("utf-8")
+        elif source.endswith(".js"):
+            data = minify_js(data.decode("utf-8")).encode("utf-8")
+    return built_name(source, data), data
+
+
+def compressed(data):
+    """{suffix: bytes} of the precompressed copies of ``data``."""
+    copies = {".gz": gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        copies[".br"] = brotli.compress(data, quality=11)
+    return copies
+
+
+def fetch(name):
+    """Download the pinned library ``name`` into static/vendor/ unless it is already there."""
+    source, upstream_url = ASSETS[name]
+    path = os.path.join(STATIC_DIR, source)
+    if upstream_url is None or os.path.exists(path):
+        return False
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with urllib.request.urlopen(upstream_url, timeout=60) as response:
+        data = response.read()
+    write_file(path, data)
+    return True
+
+
+def write_file(path, data):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as stream:
+        stream.write(data)
+    os.replace(tmp_path, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fingerprint, minify and precompress the static assets.")
+    parser.add_argument("--fetch", action="store_true", help="Download the pinned libraries not vendored yet")
+    parser.add_argument("--check", action="store_true", help="Only verify; do not write anything")
+    args = parser.parse_args()
+
+    if args.fetch and not args.check:
+        for name in ASSETS:
+            if fetch(name):
+                print(f"{name}: fetched {ASSETS[name][1]}")
+
+    manifest, outputs, problems = {}, {}, 0
+    for name in ASSETS:
+        result = build(name)
+        if result is None:
+            print(f"{name}: {ASSETS[name][0]} is missing; run build_assets.py --fetch")
+            problems += 1
+            continue
+        filename, data = result
+        manifest[name] = filename
+        outputs[filename] = data
+        outputs.update((filename + suffix, copy) for suffix, copy in compressed(data).items())
+
+    if args.check:
+        if load_manifest() != manifest:
+            print("manifest.json is out of date; run build_assets.py")
+            problems += 1
+        for filename in manifest.values():
+            if not os.path.exists(os.path.join(DIST_DIR, filename)):
+                print(f"{filename} is missing; run build_assets.py")
+                problems += 1
+        return 1 if problems else 0
+
+    if problems:
+        return 1
+    os.makedirs(DIST_DIR, exist_ok=True)
+    for filename, data in outputs.items():
+        path = os.path.join(DIST_DIR, filename)
+        if not os.path.exists(path):
+            write_file(path, data)
+    write_file(MANIFEST_PATH, (json.dumps(manifest, indent=2, sort_keys=True) + "\n").encode("utf-8"))
+    for filename in sorted(os.listdir(DIST_DIR)):
+        if filename not in outputs and filename != os.path.basename(MANIFEST_PATH):
+            os.remove(os.path.join(DIST_DIR, filename))
+    for name, filename in manifest.items():
+        print(f"{name}: {filename} ({len(outputs[filename])} bytes, gzip {len(outputs[filename + '.gz'])})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+"""Compile locales/<lang>.po into gettext .mo catalogs and check template keys.
+
+Every ``t.<key>`` used in templates/*.html must exist in every catalog;
+the build fails otherwise. With --check nothing is written, and the run also
+fails if a committed .mo file does not match its .po source (use it in CI).
+
+Usage: python build_translations.py [--check]
+"""
+
+import argparse
+import ast
+import glob
+import os
+import re
+import struct
+import sys
+
+from config import Config
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+HEADER = "Content-Type: text/plain; charset=UTF-8\n"
+
+# t.key or t['key'] inside {{ ... }} / {% ... %}; JavaScript in the templates is ignored
+_JINJA_BLOCK_RE = re.compile(r"{{(.*?)}}|{%(.*?)%}", re.DOTALL)
+_KEY_RE = re.compile(r"(?<![\w.])t(?:\.([A-Za-z_]\w*)|\[\s*['\"](\w+)['\"]\s*\])")
+
+
+def read_po(path):
+    """Parse the msgid/msgstr pairs of a .po file (comments, contexts and plurals are not used here)."""
+    messages = {}
+    current = None
+    fields = {}
+
+    def flush():
+        if "msgid" in fields:
+            messages[fields["msgid"]] = fields.get("msgstr", "")
+
+    with open(path, encoding="utf-8") as stream:
+        for line_number, line in enumerate(stream, start=1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            keyword, _, rest = line.partition(" ")
+            if keyword in ("msgid", "msgstr"):
+                if keyword == "msgid":
+                    flush()
+                    fields = {}
+                current = keyword
+                fields[current] = ast.literal_eval(rest)
+            elif line.startswith('"') and current:
+                fields[current] += ast.literal_eval(line)
+            else:
+                raise ValueError(f"{path}:{line_number}: cannot parse {line!r}")
+    flush()
+    return messages
+
+
+def compile_mo(messages):
+    """Return ``messages`` as little-endian .mo bytes with keys sorted by their UTF-8 encoding."""
+    entries = sorted((key.encode("utf-8"), value.encode("utf-8")) for key, value in messages.items())
+    count = len(entries)
+    originals_offset = 28
+    translations_offset = originals_offset + 8 * count
+    data_offset = translations_offset + 8 * count
+    tables, blob = [[], []], bytearray()
+    for column in (0, 1):
+        for entry in entries:
+            tables[column].append((len(entry[column]), data_offset + len(blob)))
+            blob += entry[column] + b"\0"
+    header = struct.pack("<7I", 0x950412de, 0, count, originals_offset, translations_offset, 0, data_offset)
+    table_bytes = b"".join(struct.pack("<2I", length, offset) for table in tables for length, offset in table)
+    return header + table_bytes + bytes(blob)
+
+
+def write_mo(path, data):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as stream:
+        stream.write(data)
+    os.replace(tmp_path, path)
+
+
+def template_keys(templates_dir=TEMPLATES_DIR):
+    """Return {key: [template names]} for every translation key the templates use."""
+    keys = {}
+    for path in sorted(glob.glob(os.path.join(templates_dir, "*.html"))):
+        with open(path, encoding="utf-8") as stream:
+            source = stream.read()
+        for block in _JINJA_BLOCK_RE.finditer(source):
+            for match in _KEY_RE.finditer(block.group(1) or block.group(2)):
+                keys.setdefault(match.group(1) or match.group(2), []).append(os.path.basename(path))
+    return keys
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile translation catalogs and check template keys.")
+    parser.add_argument("--check", action="store_true", help="Only verify; do not write .mo files")
+    parser.add_argument("--dir", default=Config.TRANSLATIONS_DIR, help="Directory holding <lang>.po files")
+    args = parser.parse_args()
+
+    used = template_keys()
+    sources = sorted(glob.glob(os.path.join(args.dir, "*.po")))
+    if not sources:
+        print(f"No .po files in {args.dir}")
+        return 1
+    problems = 0
+    for po_path in sources:
+        lang = os.path.splitext(os.path.basename(po_path))[0]
+        mo_path = po_path[:-3] + ".mo"
+        messages = read_po(po_path)
+        messages.setdefault("", HEADER)
+        missing = sorted(key for key in used if key not in messages)
+        for key in missing:
+            print(f"{lang}: missing '{key}' (used in {', '.join(sorted(set(used[key])))})")
+        problems += len(missing)
+        compiled = compile_mo(messages)
+        if args.check:
+            current = open(mo_path, "rb").read() if os.path.exists(mo_path) else None
+            if current != compiled:
+                print(f"{lang}: {os.path.basename(mo_path)} is out of date; run build_translations.py")
+                problems += 1
+        else:
+            write_mo(mo_path, compiled)
+        print(f"{lang}: {len(messages) - 1} strings")
+    unused = sorted(set(read_po(sources[0])) - set(used) - {""})
+    if unused:
+        print(f"Not used by any template: {', '.join(unused)}")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
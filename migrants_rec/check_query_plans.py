@@ -0,0 +1,219 @@
+"""Fail if any query issued by the app's routes falls back to a full table scan.
+
+Drives every route through the Flask test client against a throwaway SQLite
+database, captures each SELECT/UPDATE/DELETE the app sends, and runs
+EXPLAIN QUERY PLAN on it with the same parameters.
+
+Usage: python check_query_plans.py
+"""
+
+import io
+import os
+import re
+import sys
+import tempfile
+from datetime import date, timedelta
+
+from sqlalchemy import event
+
+import jobs
+from app import create_app, init_db
+from config import Config, engine_options
+from importer import import_stream
+from models import db, Migrant
+
+# Tables that are read whole on purpose because they only hold a few rows.
+SMALL_TABLES = {"analytics_rollups"}
+
+# Routes whose full scans are intended, with the reason.
+ALLOWED_FULL_SCANS = {
+    "/export": "streams every consenting record by design",
+    "worker export": "the export job streams every consenting record by design",
+}
+
+SEED_CSV = ("name,age,gender,contact,nationality,occupation,health_condition,aadhaar_passport,data_sharing_consent,"
+            "healthcare_facility,work_location_district,follow_up_date\n") + "".join(
+    f"Worker {i},{18 + i % 50},{'Male' if i % 2 else 'Female'},98470{i:05d},Indian,Mason,Good,A{i:06d},true,"
+    f"PHC {i % 5},District {i % 3},{(date.today() + timedelta(days=i % 20 - 10)).isoformat() if i % 4 else ''}\n"
+    for i in range(200)
+)
+
+_SCAN_RE = re.compile(r"^SCAN (\w+)")
+_SUBQUERY_RE = re.compile(r"^(?:CO-ROUTINE|MATERIALIZE) (\w+)")
+_WHERE_RE = re.compile(r"\bWHERE\b")
+_CHEAP_SCAN_MARKERS = ("VIRTUAL TABLE", "USING INDEX", "USING COVERING INDEX", "USING INTEGER PRIMARY KEY")
+
+
+class PlanCheckConfig(Config):
+    SQLALCHEMY_DATABASE_URI = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="mhr-plans-"), "plans.db")
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
+    WTF_CSRF_ENABLED = False
+    FOLLOW_UP_SCHEDULER = False  # Its queries would be captured against whichever route ran first
+    JOB_RESULTS_DIR = os.path.join(os.path.dirname(SQLALCHEMY_DATABASE_URI[len("sqlite:///"):]), "jobs")
+
+
+def full_scans(connection, statement, parameters):
+    """Return the plan lines of ``statement`` that read a whole table."""
+    plan = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+    details = [row[-1] for row in plan]
+    # A bare rowid-order scan stopped by LIMIT (e.g. the first index page) is bounded, but only while
+    # nothing is filtered: a LIMIT behind a WHERE can still read the whole table to fill the page
+    upper = statement.upper()
+    bounded = (" LIMIT " in upper and not _WHERE_RE.search(upper)
+               and not any("TEMP B-TREE" in d for d in details))
+    # Scans of a FROM subquery's result are bounded by the subquery, whose own plan lines are checked
+    subqueries = {match.group(1) for match in map(_SUBQUERY_RE.match, details) if match}
+    scans = []
+    for detail in details:
+        match = _SCAN_RE.match(detail)
+        if not match or match.group(1) in SMALL_TABLES or match.group(1) in subqueries:
+            continue
+        if any(marker in detail for marker in _CHEAP_SCAN_MARKERS):
+            continue
+        if bounded and detail == f"SCAN {match.group(1)}":
+            continue
+        scans.append(detail)
+    return scans
+
+
+def run_next_job(client):
+    """Run the oldest queued job as `flask jobs-worker` would, then download its result."""
+    with client.application.app_context():
+        job = jobs.claim()
+        jobs.run(job)
+        job_id = job.id
+    return client.get(f"/jobs/{job_id}/download")
+
+
+def edit_record(client, migrant_id, data, version=None):
+    """POST the edit form of ``migrant_id`` as opened at ``version`` (default: the current one)."""
+    if version is None:
+        with client.application.app_context():
+            version = db.session.get(Migrant, migrant_id).version
+    return client.post(f"/edit/{migrant_id}", data={**data, "record_version": version})
+
+
+def run_routes(client):
+    """Yield (label, callable) pairs covering every route of the app."""
+    yield "/login", lambda: client.post("/login", data={"username": "Admin", "password": "admin@123"})
+    yield "/", lambda: client.get("/")
+    yield "/?after=", lambda: client.get("/?after=150&per_page=20")
+    yield "/?before=", lambda: client.get("/?before=50&per_page=20")
+    for by in ("all", "name", "gender", "health_condition", "contact", "id"):
+        yield f"/?by={by}", lambda by=by: client.get(f"/?q=1&by={by}")
+    yield "/?offset=", lambda: client.get("/?q=Worker&by=name&offset=20&per_page=10")
+    yield "/analytics", lambda: client.get("/analytics")
+    yield "/add", lambda: client.post("/add", data={"name": "Plan Check", "age": 30, "gender": "Male", "contact": "9000000000"})
+    yield "/add duplicate", lambda: client.post("/add", data={"name": "Worker Five", "age": 23, "gender": "Male", "contact": "+91 98470 00005"})
+    yield "/add confirmed", lambda: client.post("/add", data={"name": "Worker Five", "age": 23, "gender": "Male", "contact": "+91 98470 00005", "confirm_not_duplicate": "y"})
+    yield "/view", lambda: client.get("/view/10")
+    yield "/edit GET", lambda: client.get("/edit/10")
+    yield "/edit POST", lambda: edit_record(client, 10, {"name": "Plan Checked", "age": 31, "gender": "Male", "contact": "9000000001"})
+    for day in range(1, 4):
+        yield f"/edit POST visit {day}", lambda day=day: edit_record(client, 10, {
+            "name": "Plan Checked", "age": 31, "gender": "Male", "contact": "9000000001",
+            "last_checkup": (date.today() - timedelta(days=day)).isoformat(), "healthcare_facility": "PHC 0"})
+    yield "/view visits", lambda: client.get("/view/10")
+    yield "/view/<id>/visits", lambda: client.get(f"/view/10/visits?before={(date.today() - timedelta(days=1)).isoformat()}.2")
+    yield "/visits", lambda: client.get("/visits?facility=PHC+0")
+    yield "/visits after", lambda: client.get(f"/visits?facility=PHC+0&after={(date.today() - timedelta(days=1)).isoformat()}.2")
+    yield "/edit POST screening", lambda: edit_record(client, 11, {
+        "name": "Worker Ten", "age": 28, "gender": "Female", "contact": "9847000010", "work_location_district": "District 1",
+        "infectious_disease_screening": "Malaria positive, TB negative", "disease_alerts": "Dengue suspected"})
+    yield "/analytics surveillance", lambda: client.get("/analytics")
+    yield "/analytics/surveillance", lambda: client.get("/analytics/surveillance?level=pincode&condition=malaria")
+    yield "/analytics/surveillance alerts", lambda: client.get(f"/analytics/surveillance?alerts=1&end={date.today().isoformat()}")
+    yield "/edit POST contacts", lambda: edit_record(client, 12, {
+        "name": "Worker Eleven", "age": 29, "gender": "Male", "contact": "9847000011", "employer_name": "Builder Co",
+        "work_location_district": "District 2", "living_conditions": "Camp",
+        "contact_tracing_info": "#14; shares a room with ph 98470 00020, ID 30"})
+    yield "/view/<id>/contacts", lambda: client.get("/view/12/contacts?depth=3")
+    yield "/view/<id>/contacts reverse", lambda: client.get("/view/21/contacts")
+    yield "/api contacts", lambda: client.get("/api/v1/migrants/14/contacts?depth=2&limit=10")
+    yield "/edit POST unchanged", lambda: edit_record(client, 12, {"name": "Worker Eleven", "age": 29, "gender": "Male", "contact": "9847000011"})
+    yield "/edit POST conflict", lambda: edit_record(client, 10, {"name": "Plan Conflict", "age": 31, "gender": "Male", "contact": "9000000001"}, version=1)
+    yield "/view/<id>/changes", lambda: client.get("/view/10/changes")
+    yield "/view/<id>/changes after", lambda: client.get("/view/10/changes?after=3.5")
+    yield "/qrcode", lambda: client.get("/qrcode/10")
+    yield "/import", lambda: client.post(
+        "/import", data={"file": (io.BytesIO(b"name,age,gender,contact\nImported,22,Male,12345\n"), "x.csv")},
+        content_type="multipart/form-data")
+    yield "/id-cards", lambda: client.get("/id-cards?ids=1-3,20")
+    yield "/id-cards search", lambda: client.get("/id-cards?q=Worker&by=name")
+    yield "/export", lambda: client.get("/export?columns=id,name")
+    yield "/export POST", lambda: client.post("/export?q=Worker&by=name", data={"columns": "id,name"})
+    yield "worker export", lambda: run_next_job(client)
+    yield "/id-cards POST", lambda: client.post("/id-cards", data={"ids": "1-30"})
+    yield "worker id-cards", lambda: run_next_job(client)
+    yield "/jobs", lambda: client.get("/jobs")
+    yield "/jobs/<id>", lambda: client.get("/jobs/1")
+    yield "/jobs/<id>/status", lambda: client.get("/jobs/1/status")
+    yield "/api list", lambda: client.get("/api/v1/migrants?per_page=20&after=100&fields=name,age")
+    yield "/api search", lambda: client.get("/api/v1/migrants?q=Worker&sort=relevance")
+    yield "/api detail", lambda: client.get("/api/v1/migrants/10")
+    yield "/api POST", lambda: client.post("/api/v1/migrants", json={"name": "Api Check", "age": 40, "gender": "Female", "contact": "9000000002"})
+    yield "/api PATCH", lambda: client.patch("/api/v1/migrants/10", json={"occupation": "Carpenter"})
+    yield "/follow-ups", lambda: client.get("/follow-ups")
+    yield "/follow-ups facility", lambda: client.get("/follow-ups?window=overdue&facility=PHC+1&scope=facility")
+    yield "/follow-ups district", lambda: client.get(
+        f"/follow-ups?window=week&district=District+2&scope=district&after={date.today().isoformat()}.10")
+    yield "/follow-ups before", lambda: client.get(f"/follow-ups?facility=PHC+2&before={date.today().isoformat()}.100")
+    yield "/sync", lambda: client.get("/sync?since=150")
+    yield "/sync district", lambda: client.get("/sync?since=100&district=District+1")
+    yield "/sync POST", lambda: client.post("/sync", json={"changes": [
+        {"id": 20, "base_seq": 10**6, "data": {"occupation": "Painter"}},
+        {"data": {"name": "Sync Check", "age": 25, "gender": "Male", "contact": "9000000003"}},
+    ]})
+    yield "/duplicates", lambda: client.get("/duplicates")
+    yield "/duplicates after", lambda: client.get("/duplicates?after=0.9.5")
+    yield "/duplicates review", lambda: client.get("/duplicates/1")
+    yield "/duplicates scan", lambda: client.post("/duplicates/scan")
+    yield "worker duplicates", lambda: run_next_job(client)
+    yield "/duplicates merge", lambda: client.post("/duplicates/1", data={"survivor": 6, "merge": "Merge", "field_name": "202"})
+    yield "/metrics", lambda: client.get("/metrics")
+    yield "/language", lambda: client.get("/language/ml")
+    yield "/logout", lambda: client.get("/logout")
+
+
+def main():
+    app = create_app(PlanCheckConfig)
+    with app.app_context():
+        init_db()
+        import_stream(io.StringIO(SEED_CSV), "csv")
+        engine = db.engine
+    captured = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+            captured.append((statement, parameters))
+
+    failures = []
+    checked = 0
+    client = app.test_client()
+    for label, request_route in run_routes(client):
+        captured.clear()
+        response = request_route()
+        response.get_data()  # Run streamed bodies (export, sync) so their queries are captured too
+        response.close()
+        if response.status_code >= 500:
+            failures.append((label, f"HTTP {response.status_code}", ""))
+            continue
+        queries = list(captured)
+        with engine.connect() as connection:
+            for statement, parameters in queries:
+                if "sqlite_master" in statement:
+                    continue
+                checked += 1
+                scans = full_scans(connection, statement, parameters)
+                if scans and label not in ALLOWED_FULL_SCANS:
+                    failures.append((label, "; ".join(scans), " ".join(statement.split())))
+
+    for label, problem, statement in failures:
+        print(f"FULL SCAN in {label}: {problem}\n    {statement}")
+    print(f"Checked {checked} queries; {len(failures)} full scans.")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
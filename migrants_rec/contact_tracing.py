@@ -0,0 +1,273 @@
+"""Contact tracing: a graph of the contacts named in contact_tracing_info, walked breadth-first.
+
+Each record's contact_tracing_info is read as a list of contact entries
+(";", "," or one per line). An entry names another record by its number
+("#123", "ID 123") and/or a person by phone number; every reference is an
+edge in ``contact_edges``, kept in step by mapper events like the dedupe
+keys. Phone references are matched to records through the dedupe phone
+keys when the graph is walked, so the edge index is probed from both ends:
+the contacts a record names, and the records naming it.
+
+A trace is a breadth-first walk from one record, bounded by depth and by
+the number of contacts returned, so a highly connected case cannot make a
+request read the whole table. Contacts are grouped by work district,
+employer and living conditions, and the case's own group (everyone in the
+same camp, named or not) is counted through ``ix_migrants_cohort``.
+"""
+
+import re
+
+import click
+from flask import Blueprint, abort, current_app, jsonify, render_template, request
+from flask_login import login_required
+from sqlalchemy import event, inspect, text
+
+from api import api_login_required
+from dedupe import phone_digits
+from models import db, ContactEdge, DedupeKey, Migrant, migrants_bulk_inserted
+
+bp = Blueprint("contact_tracing", __name__)
+
+SOURCE_FIELDS = ("contact_tracing_info", "contact")
+GROUP_FIELDS = ("work_location_district", "employer_name", "living_conditions")
+CONTACT_COLUMNS = ("id", "name", "contact", "health_condition") + GROUP_FIELDS
+IN_BATCH = 500  # Ids per IN (...) probe, below SQLite's bound-parameter limit
+
+_ID_RE = re.compile(r"(?:#|\b(?:id|record)\s*(?:no\.?)?\s*[:#]?\s*)(\d{1,9})\b", re.IGNORECASE)
+_PHONE_RE = re.compile(r"\+?\d[\d\s-]{5,}\d")
+
+_INSERT_SQL = text("INSERT INTO contact_edges (migrant_id, contact_key) VALUES (:migrant_id, :contact_key) "
+                   "ON CONFLICT DO NOTHING")
+_DELETE_SQL = text("DELETE FROM contact_edges WHERE migrant_id = :migrant_id")
+
+
+def contact_keys(values, migrant_id=None):
+    """Return the set of contact keys ("id:<n>", "phone:<digits>") named in a record's column ``values``."""
+    info = values.get("contact_tracing_info") or ""
+    keys = {f"id:{int(match.group(1))}" for match in _ID_RE.finditer(info)}
+    for match in _PHONE_RE.finditer(_ID_RE.sub(" ", info)):
+        phone = phone_digits(match.group())
+        if phone:
+            keys.add(f"phone:{phone}")
+    # A record listing its own number or phone is not a contact
+    keys.discard(f"id:{migrant_id}")
+    keys.discard(f"phone:{phone_digits(values.get('contact'))}")
+    return keys
+
+
+def _edge_rows(migrant_id, values):
+    return [{"migrant_id": migrant_id, "contact_key": key} for key in sorted(contact_keys(values, migrant_id))]
+
+
+# ORM hooks: edges change on the flush connection, inside the record's own transaction.
+@event.listens_for(Migrant, "after_insert")
+def _after_insert(mapper, connection, target):
+    rows = _edge_rows(target.id, {field: getattr(target, field) for field in SOURCE_FIELDS})
+    if rows:
+        connection.execute(_INSERT_SQL, rows)
+
+
+@event.listens_for(Migrant, "after_update")
+def _after_update(mapper, connection, target):
+    state = inspect(target)
+    if not any(state.attrs[field].history.has_changes() for field in SOURCE_FIELDS):
+        return  # Checked without loading deferred columns
+    connection.execute(_DELETE_SQL, {"migrant_id": target.id})
+    rows = _edge_rows(target.id, {field: getattr(target, field) for field in SOURCE_FIELDS})
+    if rows:
+        connection.execute(_INSERT_SQL, rows)
+
+
+@event.listens_for(Migrant, "before_delete")
+def _before_delete(mapper, connection, target):
+    connection.execute(_DELETE_SQL, {"migrant_id": target.id})
+
+
+@migrants_bulk_inserted.connect
+def _after_bulk_insert(sender, connection, rows):
+    edges = [edge for row in rows for edge in _edge_rows(row["id"], row)]
+    if edges:
+        connection.execute(_INSERT_SQL, edges)
+
+
+def backfill(connection, batch_size=1000):
+    """Read every record's contact_tracing_info into ``contact_edges`` on ``connection``; returns the number of edges.
+
+    Also run by the alembic revision that creates the table.
+    """
+    rows = connection.execute(
+        db.select(Migrant.id, *[getattr(Migrant, field) for field in SOURCE_FIELDS])
+        .where(Migrant.contact_tracing_info.isnot(None))
+        .execution_options(yield_per=batch_size)
+    )
+    written = 0
+    for batch in rows.partitions():
+        edges = [edge for row in batch for edge in _edge_rows(row.id, row._asdict())]
+        if edges:
+            connection.execute(_INSERT_SQL, edges)
+            written += len(edges)
+    return written
+
+
+def rebuild(batch_size=1000):
+    """Re-read every record's contact_tracing_info into ``contact_edges``; returns the number of edges."""
+    db.session.query(ContactEdge).delete()
+    written = backfill(db.session.connection(), batch_size)
+    db.session.commit()
+    return written
+
+
+def ensure_built():
+    """Backfill the edges when the table is empty but some record has contact tracing info."""
+    if db.session.query(ContactEdge.migrant_id).first() is None and db.session.query(Migrant.id).filter(
+        Migrant.contact_tracing_info.isnot(None)
+    ).first() is not None:
+        rebuild()
+
+
+def _batches(values):
+    values = list(values)
+    for start in range(0, len(values), IN_BATCH):
+        yield values[start:start + IN_BATCH]
+
+
+def _phone_owners(phones):
+    """{phone digits: [migrant ids]} for the records whose contact number is one of ``phones``."""
+    owners = {}
+    for batch in _batches(phones):
+        for key, migrant_id in db.session.query(DedupeKey.key, DedupeKey.migrant_id).filter(
+            DedupeKey.kind == "phone", DedupeKey.key.in_(batch)
+        ):
+            owners.setdefault(key, []).append(migrant_id)
+    return owners
+
+
+def neighbours(ids):
+    """{neighbour id: the id in ``ids`` it was reached from} over the edges in both directions."""
+    found = {}
+    for batch in _batches(ids):
+        # Contacts these records name
+        named = db.session.query(ContactEdge.migrant_id, ContactEdge.contact_key).filter(
+            ContactEdge.migrant_id.in_(batch)).all()
+        owners = _phone_owners({key[len("phone:"):] for _, key in named if key.startswith("phone:")})
+        for source, key in named:
+            kind, value = key.split(":", 1)
+            for target in (owners.get(value, []) if kind == "phone" else [int(value)]):
+                found.setdefault(target, source)
+        # Records naming these by number or phone
+        own_keys = {f"id:{migrant_id}": migrant_id for migrant_id in batch}
+        own_keys.update((f"phone:{key}", migrant_id) for key, migrant_id in db.session.query(
+            DedupeKey.key, DedupeKey.migrant_id).filter(DedupeKey.migrant_id.in_(batch), DedupeKey.kind == "phone"))
+        for source, key in db.session.query(ContactEdge.migrant_id, ContactEdge.contact_key).filter(
+            ContactEdge.contact_key.in_(list(own_keys))
+        ):
+            found.setdefault(source, own_keys[key])
+    return found
+
+
+def _contact_rows(ids):
+    rows = {}
+    for batch in _batches(ids):
+        for row in db.session.query(*[getattr(Migrant, column) for column in CONTACT_COLUMNS]).filter(
+            Migrant.id.in_(batch)
+        ):
+            rows[row.id] = row._asdict()
+    return rows
+
+
+def _group_key(row):
+    return tuple(row[field] or "" for field in GROUP_FIELDS)
+
+
+def cohort(row, sample_size):
+    """Records sharing the case's district, employer and living conditions: their count and the first few."""
+    if not row["work_location_district"] or not row["employer_name"]:
+        return None  # Too broad to be a camp
+    query = db.session.query(Migrant.id).filter(
+        *[getattr(Migrant, field) == row[field] for field in GROUP_FIELDS], Migrant.id != row["id"]
+    )
+    return {
+        **{field: row[field] for field in GROUP_FIELDS},
+        "count": query.count(),
+        "sample": [migrant_id for migrant_id, in query.order_by(Migrant.id).limit(sample_size)],
+    }
+
+
+def trace(migrant_id, depth=None, limit=None):
+    """The exposure set of a record: contacts up to ``depth`` hops away, at most ``limit`` of them.
+
+    Returns None if the record does not exist. Contacts are listed by hop
+    and id with the record they were reached from; ``truncated`` is set
+    when ``limit`` cut the walk short.
+    """
+    config = current_app.config
+    depth = max(1, min(depth or config["CONTACT_TRACE_DEFAULT_DEPTH"], config["CONTACT_TRACE_MAX_DEPTH"]))
+    limit = max(1, min(limit or config["CONTACT_TRACE_MAX_CONTACTS"], config["CONTACT_TRACE_MAX_CONTACTS"]))
+    case_row = _contact_rows([migrant_id]).get(migrant_id)
+    if case_row is None:
+        return None
+    seen, contacts = {migrant_id}, []
+    frontier, truncated = [migrant_id], False
+    for hop in range(1, depth + 1):
+        found = neighbours(frontier)
+        # Named records that no longer exist drop out here
+        rows = _contact_rows(sorted(set(found) - seen))
+        frontier = sorted(rows)
+        room = limit - len(contacts)
+        if len(frontier) > room:
+            frontier, truncated = frontier[:room], True
+        seen.update(frontier)
+        contacts.extend({**rows[contact_id], "hop": hop, "via": found[contact_id]} for contact_id in frontier)
+        if truncated or not frontier:
+            break
+    groups = {}
+    for contact in contacts:
+        groups.setdefault(_group_key(contact), []).append(contact["id"])
+    return {
+        "case": case_row,
+        "depth": depth,
+        "limit": limit,
+        "truncated": truncated,
+        "contacts": contacts,
+        "groups": [
+            {**dict(zip(GROUP_FIELDS, key)), "same_as_case": key == _group_key(case_row), "ids": ids}
+            for key, ids in sorted(groups.items(), key=lambda item: (-len(item[1]), item[0]))
+        ],
+        "cohort": cohort(case_row, config["CONTACT_TRACE_COHORT_SAMPLE"]),
+    }
+
+
+def _int_arg(name):
+    value = request.args.get(name, "")
+    return int(value) if value.isdigit() else None
+
+
+@bp.route("/view/<int:migrant_id>/contacts")
+@login_required
+def contact_trace(migrant_id):
+    """The record's exposure set, grouped by workplace and camp."""
+    result = trace(migrant_id, _int_arg("depth"), _int_arg("limit"))
+    if result is None:
+        abort(404)
+    return render_template("contact_trace.html", trace=result, max_depth=current_app.config["CONTACT_TRACE_MAX_DEPTH"],
+                           title=f"Contacts of {result['case']['name']}")
+
+
+@bp.route("/api/v1/migrants/<int:migrant_id>/contacts")
+@api_login_required
+def contact_trace_json(migrant_id):
+    """The exposure set as JSON: ?depth=&limit=, both capped by the configured maximums."""
+    result = trace(migrant_id, _int_arg("depth"), _int_arg("limit"))
+    if result is None:
+        return jsonify(error="Migrant not found"), 404
+    return jsonify(data=result)
+
+
+def init_app(app):
+    """Register the tracing routes and the ``rebuild-contacts`` command on ``app``."""
+    app.register_blueprint(bp)
+
+    @app.cli.command("rebuild-contacts")
+    def rebuild_contacts_command():
+        """Re-read contact_tracing_info of every record into the contact graph."""
+        click.echo(f"Wrote {rebuild()} contact edges.")
@@ -1,9 +1,11 @@
-from app import app, db, User
+from app import create_app, init_db
+from models import db, User
 
 def main():
+    app = create_app()
     with app.app_context():
         # Ensure tables exist
-        db.create_all()
+        init_db()
         username = "admin"
         email = "admin@example.com"
         password = "Admin@123"
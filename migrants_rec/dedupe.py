@@ -0,0 +1,420 @@
+"""Likely-duplicate detection: blocking keys, pair scoring and a merge workflow.
+
+Comparing every record with every other is quadratic, so each migrant gets
+a handful of blocking keys in ``dedupe_keys`` (a phonetic code of the name,
+the last digits of the phone number, date of birth and state of origin
+combined with the first name's code). Only records sharing a key are
+scored. The keys are kept in step by mapper events, like the follow-up
+queue, so the add form can look up candidates with a few index probes; the
+``find-duplicates`` command walks the blocks in key order and stores the
+pairs above the threshold in ``duplicate_candidates`` for review.
+"""
+
+import re
+import unicodedata
+from difflib import SequenceMatcher
+
+import click
+from flask import Blueprint, abort, current_app, flash, redirect, render_template, request, url_for
+from flask_login import current_user, login_required
+from sqlalchemy import event, inspect, text
+
+from api import WRITABLE_FIELDS
+from auth import admin_required
+from forms import JobForm, MergeForm
+from jobs import handler, submit
+from models import db, compute_bmi, DedupeKey, DuplicateCandidate, Migrant, migrants_bulk_inserted
+from pagination import paginate_keyset
+from visits import reassign as reassign_visits
+
+bp = Blueprint("dedupe", __name__, url_prefix="/duplicates")
+
+KEY_FIELDS = ("name", "contact", "date_of_birth", "state_of_origin")
+SCORE_FIELDS = KEY_FIELDS + ("age", "gender", "aadhaar_passport")
+
+MAX_BLOCK_SIZE = 50  # Blocks larger than this ("same common surname") are too unselective to compare
+MIN_PHONE_DIGITS = 7
+PAIRS_PER_BATCH = 2000
+
+_SOUNDEX_CODES = {letter: str(code) for code, letters in enumerate(
+    ("aeiouyhw", "bfpv", "cgjkqsxz", "dt", "l", "mn", "r")) for letter in letters}
+
+_INSERT_SQL = text(
+    "INSERT INTO dedupe_keys (kind, key, migrant_id) VALUES (:kind, :key, :migrant_id) ON CONFLICT DO NOTHING"
+)
+_DELETE_SQL = text("DELETE FROM dedupe_keys WHERE migrant_id = :migrant_id")
+_DELETE_CANDIDATES_SQL = text(
+    "DELETE FROM duplicate_candidates WHERE (migrant_id = :migrant_id OR other_id = :migrant_id) AND status != 'merged'"
+)
+_UPSERT_CANDIDATE_SQL = text(
+    "INSERT INTO duplicate_candidates (migrant_id, other_id, score, reasons, status) "
+    "VALUES (:migrant_id, :other_id, :score, :reasons, 'open') "
+    "ON CONFLICT (migrant_id, other_id) DO UPDATE SET score = excluded.score, reasons = excluded.reasons"
+)
+
+
+def name_tokens(name):
+    """Lower-case ASCII words of a name, accents and punctuation removed."""
+    ascii_name = unicodedata.normalize("NFKD", name or "").encode("ascii", "ignore").decode("ascii")
+    return re.findall(r"[a-z]+", ascii_name.lower())
+
+
+def soundex(word):
+    """American Soundex code of a lower-case ASCII word ("" for an empty word)."""
+    if not word:
+        return ""
+    code, previous = word[0].upper(), _SOUNDEX_CODES.get(word[0])
+    for letter in word[1:]:
+        digit = _SOUNDEX_CODES.get(letter)
+        if digit is not None and digit != "0" and digit != previous:
+            code += digit
+        if letter not in "hw":  # H and W do not separate letters with the same code
+            previous = digit
+    return (code + "000")[:4]
+
+
+def phone_digits(contact):
+    """The last ten digits of a phone number, or None if it has too few to be meaningful."""
+    digits = re.sub(r"\D", "", contact or "")[-10:]
+    return digits if len(digits) >= MIN_PHONE_DIGITS else None
+
+
+def blocking_keys(values):
+    """Return the set of (kind, key) blocks a migrant with column ``values`` belongs to."""
+    tokens = name_tokens(values.get("name"))
+    keys = set()
+    if tokens:
+        first = soundex(tokens[0])
+        # Sorted so that "Sunita Das" and "Das Sunita" share a block
+        keys.add(("name", " ".join(sorted(soundex(token) for token in tokens))))
+        if values.get("date_of_birth"):
+            keys.add(("dob", f"{values['date_of_birth'].isoformat()} {first}"))
+        state = (values.get("state_of_origin") or "").strip().lower()
+        if state:
+            keys.add(("origin", f"{state} {first}"))
+    phone = phone_digits(values.get("contact"))
+    if phone:
+        keys.add(("phone", phone))
+    return keys
+
+
+def score_pair(a, b):
+    """Score how likely migrants ``a`` and ``b`` (mappings of SCORE_FIELDS) are one person.
+
+    Returns (score between 0 and 1, list of short reasons).
+    """
+    if a.get("aadhaar_passport") and b.get("aadhaar_passport"):
+        if a["aadhaar_passport"].strip().lower() == b["aadhaar_passport"].strip().lower():
+            return 1.0, ["same ID document"]
+        return 0.0, ["different ID documents"]
+    name_a, name_b = " ".join(sorted(name_tokens(a.get("name")))), " ".join(sorted(name_tokens(b.get("name"))))
+    similarity = SequenceMatcher(None, name_a, name_b).ratio() if name_a and name_b else 0.0
+    score, reasons = 0.5 * similarity, [f"name {similarity:.0%} alike"]
+    phone_a, phone_b = phone_digits(a.get("contact")), phone_digits(b.get("contact"))
+    if phone_a and phone_a == phone_b:
+        score += 0.25
+        reasons.append("same phone")
+    if a.get("date_of_birth") and b.get("date_of_birth"):
+        if a["date_of_birth"] == b["date_of_birth"]:
+            score += 0.15
+            reasons.append("same date of birth")
+        else:
+            score -= 0.15
+    elif a.get("age") is not None and b.get("age") is not None:
+        if abs(a["age"] - b["age"]) <= 1:
+            score += 0.1
+            reasons.append("same age")
+        elif abs(a["age"] - b["age"]) > 5:
+            score -= 0.15
+    state_a, state_b = (a.get("state_of_origin") or "").strip().lower(), (b.get("state_of_origin") or "").strip().lower()
+    if state_a and state_a == state_b:
+        score += 0.05
+        reasons.append("same state")
+    if a.get("gender") and b.get("gender") and a["gender"] != b["gender"]:
+        score -= 0.3
+    return max(0.0, min(1.0, score)), reasons
+
+
+def _key_rows(migrant_id, values):
+    return [{"kind": kind, "key": key, "migrant_id": migrant_id} for kind, key in blocking_keys(values)]
+
+
+# ORM hooks: keys change on the flush connection, inside the record's own transaction.
+@event.listens_for(Migrant, "after_insert")
+def _after_insert(mapper, connection, target):
+    connection.execute(_DELETE_CANDIDATES_SQL, {"migrant_id": target.id})  # Left over from a reused id
+    rows = _key_rows(target.id, {field: getattr(target, field) for field in KEY_FIELDS})
+    if rows:
+        connection.execute(_INSERT_SQL, rows)
+
+
+@event.listens_for(Migrant, "after_update")
+def _after_update(mapper, connection, target):
+    state = inspect(target)
+    if not any(state.attrs[field].history.has_changes() for field in KEY_FIELDS):
+        return  # Checked without loading deferred columns
+    connection.execute(_DELETE_SQL, {"migrant_id": target.id})
+    rows = _key_rows(target.id, {field: getattr(target, field) for field in KEY_FIELDS})
+    if rows:
+        connection.execute(_INSERT_SQL, rows)
+
+
+@event.listens_for(Migrant, "before_delete")
+def _before_delete(mapper, connection, target):
+    connection.execute(_DELETE_SQL, {"migrant_id": target.id})
+    connection.execute(_DELETE_CANDIDATES_SQL, {"migrant_id": target.id})
+
+
+@migrants_bulk_inserted.connect
+def _after_bulk_insert(sender, connection, rows):
+    keys = [key for row in rows for key in _key_rows(row["id"], row)]
+    if keys:
+        connection.execute(_INSERT_SQL, keys)
+
+
+def backfill(connection, batch_size=1000):
+    """Write the blocking keys of every migrant on ``connection``; returns the number of keys written.
+
+    Also run by the alembic revision that creates ``dedupe_keys``.
+    """
+    rows = connection.execute(
+        db.select(Migrant.id, *[getattr(Migrant, field) for field in KEY_FIELDS]).execution_options(yield_per=batch_size)
+    )
+    written = 0
+    for batch in rows.partitions():
+        keys = [key for row in batch for key in _key_rows(row.id, row._asdict())]
+        if keys:
+            connection.execute(_INSERT_SQL, keys)
+            written += len(keys)
+    return written
+
+
+def rebuild(batch_size=1000):
+    """Recompute every blocking key from ``migrants``; returns the number of keys written."""
+    db.session.query(DedupeKey).delete()
+    written = backfill(db.session.connection(), batch_size)
+    db.session.commit()
+    return written
+
+
+def ensure_built():
+    """Backfill the blocking keys when the table is empty but migrants exist."""
+    if db.session.query(DedupeKey.migrant_id).first() is None and db.session.query(Migrant.id).first() is not None:
+        rebuild()
+
+
+def _score_rows(ids):
+    rows = db.session.query(Migrant.id, *[getattr(Migrant, field) for field in SCORE_FIELDS]).filter(Migrant.id.in_(ids))
+    return {row.id: row._asdict() for row in rows}
+
+
+def find_candidates(values, exclude_id=None, limit=5):
+    """Likely duplicates of a (new) migrant with column ``values``, best first.
+
+    Returns [(score, reasons, row), ...] for the existing records scoring at
+    least DEDUPE_THRESHOLD; each block is probed through the primary key and
+    read no further than MAX_BLOCK_SIZE rows.
+    """
+    ids = set()
+    for kind, key in blocking_keys(values):
+        ids.update(db.session.scalars(
+            db.select(DedupeKey.migrant_id).where(DedupeKey.kind == kind, DedupeKey.key == key).limit(MAX_BLOCK_SIZE)
+        ))
+    ids.discard(exclude_id)
+    if not ids:
+        return []
+    threshold = current_app.config["DEDUPE_THRESHOLD"]
+    candidates = []
+    for row in _score_rows(ids).values():
+        score, reasons = score_pair(values, row)
+        if score >= threshold:
+            candidates.append((score, reasons, row))
+    candidates.sort(key=lambda candidate: (-candidate[0], candidate[2]["id"]))
+    return candidates[:limit]
+
+
+def record_candidates(migrant_id, candidates):
+    """Queue (score, reasons, row) ``candidates`` of ``migrant_id`` for review."""
+    params = [
+        {"migrant_id": min(migrant_id, row["id"]), "other_id": max(migrant_id, row["id"]),
+         "score": score, "reasons": ", ".join(reasons)[:200]}
+        for score, reasons, row in candidates
+    ]
+    if params:
+        db.session.execute(_UPSERT_CANDIDATE_SQL, params)
+
+
+def _blocks(batch_size):
+    """Yield the migrant ids of each block with 2..MAX_BLOCK_SIZE members; counts the larger ones."""
+    rows = db.session.execute(
+        db.select(DedupeKey.kind, DedupeKey.key, DedupeKey.migrant_id)
+        .order_by(DedupeKey.kind, DedupeKey.key).execution_options(yield_per=batch_size)
+    )
+    current, members = None, []
+    for kind, key, migrant_id in rows:
+        if (kind, key) != current:
+            yield members
+            current, members = (kind, key), []
+        members.append(migrant_id)
+    yield members
+
+
+def find_duplicates(batch_size=1000):
+    """Score every pair sharing a block and queue those above the threshold.
+
+    Returns (pairs compared, candidates queued, oversized blocks skipped).
+    Dismissed pairs keep their status.
+    """
+    threshold = current_app.config["DEDUPE_THRESHOLD"]
+    pairs, skipped = set(), 0
+    for members in _blocks(batch_size):
+        if len(members) > MAX_BLOCK_SIZE:
+            skipped += 1
+            continue
+        members.sort()
+        pairs.update((a, b) for i, a in enumerate(members) for b in members[i + 1:])
+    # Scored after the block walk has closed its cursor, in id order so each batch loads nearby rows
+    pairs, queued = sorted(pairs), 0
+    for start in range(0, len(pairs), PAIRS_PER_BATCH):
+        batch = pairs[start:start + PAIRS_PER_BATCH]
+        rows = _score_rows({migrant_id for pair in batch for migrant_id in pair})
+        params = []
+        for a, b in batch:
+            score, reasons = score_pair(rows[a], rows[b])
+            if score >= threshold:
+                params.append({"migrant_id": a, "other_id": b, "score": score, "reasons": ", ".join(reasons)[:200]})
+        if params:
+            db.session.execute(_UPSERT_CANDIDATE_SQL, params)
+            queued += len(params)
+    db.session.commit()
+    return len(pairs), queued, skipped
+
+
+@handler("find_duplicates")
+def find_duplicates_job(context, params):
+    """Background run of :func:`find_duplicates`."""
+    compared, queued, skipped = find_duplicates()
+    return f"Compared {compared} pairs; {queued} likely duplicates queued; {skipped} oversized blocks skipped."
+
+
+def merge(survivor, duplicate, choices):
+    """Fold ``duplicate`` into ``survivor`` and delete it.
+
+    ``choices`` maps field names to "other" for fields where the duplicate's
+    value should win; elsewhere the survivor keeps its own value, or takes
+    the duplicate's when it has none. The caller commits.
+    """
+    values = {}
+    for field in WRITABLE_FIELDS:
+        mine, theirs = getattr(survivor, field), getattr(duplicate, field)
+        if choices.get(field) == "other" or (mine in (None, "") and theirs not in (None, "")):
+            values[field] = theirs
+    reassign_visits(duplicate.id, survivor.id)
+    db.session.delete(duplicate)
+    db.session.flush()  # Frees unique values such as aadhaar_passport before the survivor takes them
+    for field, value in values.items():
+        setattr(survivor, field, value)
+    survivor.bmi = compute_bmi(survivor.height, survivor.weight)
+
+
+def format_cursor(cursor):
+    return f"{cursor[0]!r}.{cursor[1]}" if cursor else None
+
+
+def parse_cursor(value):
+    """Turn a "<score>.<id>" paging cursor back into (score, id); None if it is malformed."""
+    try:
+        score, candidate_id = value.rsplit(".", 1)
+        return float(score), int(candidate_id)
+    except (AttributeError, ValueError):
+        return None
+
+
+@bp.route("")
+@login_required
+@admin_required
+def duplicate_list():
+    query = db.session.query(
+        DuplicateCandidate.id, DuplicateCandidate.score, DuplicateCandidate.reasons,
+        DuplicateCandidate.migrant_id, DuplicateCandidate.other_id,
+    ).filter(DuplicateCandidate.status == "open")
+    page = paginate_keyset(
+        query, (DuplicateCandidate.score, DuplicateCandidate.id),
+        after=parse_cursor(request.args.get("after")),
+        before=parse_cursor(request.args.get("before")),
+        per_page=current_app.config["DUPLICATES_PER_PAGE"],
+    )
+    ids = {migrant_id for item in page.items for migrant_id in (item.migrant_id, item.other_id)}
+    names = dict(db.session.query(Migrant.id, Migrant.name).filter(Migrant.id.in_(ids))) if ids else {}
+    return render_template(
+        "duplicates.html", page=page, candidates=page.items, names=names, job_form=JobForm(),
+        format_cursor=format_cursor, title="Possible Duplicates"
+    )
+
+
+@bp.route("/scan", methods=["POST"])
+@login_required
+@admin_required
+def scan():
+    """Queue a full duplicate scan as a background job."""
+    if not JobForm().validate_on_submit():
+        abort(400, "The form has expired; reload the page and try again.")
+    return redirect(url_for("jobs.job_status", job_id=submit("find_duplicates", user_id=current_user.id).id))
+
+
+@bp.route("/<int:candidate_id>", methods=["GET", "POST"])
+@login_required
+@admin_required
+def review(candidate_id):
+    """Compare a candidate pair side by side, then merge it or dismiss it."""
+    candidate = DuplicateCandidate.query.get_or_404(candidate_id)
+    if candidate.status != "open":
+        flash("This pair has already been reviewed.", "info")
+        return redirect(url_for("dedupe.duplicate_list"))
+    records = {migrant.id: migrant for migrant in
+               Migrant.with_groups().filter(Migrant.id.in_((candidate.migrant_id, candidate.other_id)))}
+    if len(records) != 2:
+        abort(404)
+    form = MergeForm()
+    form.survivor.choices = [(migrant_id, f"#{migrant_id} {records[migrant_id].name}") for migrant_id in sorted(records)]
+    if form.validate_on_submit():
+        if form.dismiss.data:
+            candidate.status = "dismissed"
+            db.session.commit()
+            flash("Marked as different people.", "success")
+            return redirect(url_for("dedupe.duplicate_list"))
+        survivor = records[form.survivor.data]
+        duplicate = records[candidate.other_id if survivor.id == candidate.migrant_id else candidate.migrant_id]
+        # field_<name> holds the id of the record whose value to keep
+        choices = {field: "other" for field in WRITABLE_FIELDS
+                   if request.form.get(f"field_{field}") == str(duplicate.id)}
+        candidate.status = "merged"
+        db.session.flush()  # Before the duplicate's delete clears its open candidates
+        merge(survivor, duplicate, choices)
+        db.session.commit()
+        flash(f"Merged record #{duplicate.id} into #{survivor.id}.", "success")
+        return redirect(url_for("records.view_migrant", migrant_id=survivor.id))
+    left, right = records[candidate.migrant_id], records[candidate.other_id]
+    fields = [(field, getattr(left, field), getattr(right, field)) for field in WRITABLE_FIELDS]
+    return render_template(
+        "duplicate_review.html", form=form, candidate=candidate, left=left, right=right,
+        fields=fields, title="Review Duplicate"
+    )
+
+
+def init_app(app):
+    """Register the duplicate review pages and the ``find-duplicates`` / ``rebuild-dedupe-keys`` commands."""
+    app.register_blueprint(bp)
+
+    @app.cli.command("find-duplicates")
+    def find_duplicates_command():
+        """Compare records that share a blocking key and queue likely duplicates for review."""
+        compared, queued, skipped = find_duplicates()
+        click.echo(f"Compared {compared} pairs; {queued} likely duplicates queued.")
+        if skipped:
+            click.echo(f"Skipped {skipped} blocks with more than {MAX_BLOCK_SIZE} records.")
+
+    @app.cli.command("rebuild-dedupe-keys")
+    def rebuild_dedupe_keys_command():
+        """Recompute the duplicate-detection blocking keys from the migrants table."""
+        click.echo(f"Wrote {rebuild()} blocking keys.")
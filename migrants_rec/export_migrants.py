@@ -0,0 +1,34 @@
+"""Export consenting migrant records as CSV or NDJSON.
+
+Usage: python export_migrants.py [-o FILE] [--format csv|ndjson] [--columns id,name,...] [--q TERM --by FIELD]
+"""
+
+import argparse
+import sys
+
+from app import create_app
+from exporter import FORMATS, resolve_columns, stream_export
+
+def main():
+    parser = argparse.ArgumentParser(description="Export migrant records.")
+    parser.add_argument("-o", "--output", help="Output file (default: stdout)")
+    parser.add_argument("--format", choices=FORMATS, default="csv", help="Output format")
+    parser.add_argument("--columns", help="Comma-separated columns to export (default: all)")
+    parser.add_argument("--q", help="Search term, as on the index page")
+    parser.add_argument("--by", default="all", help="Search field, as on the index page")
+    args = parser.parse_args()
+    try:
+        columns = resolve_columns(args.columns)
+    except ValueError as e:
+        parser.error(str(e))
+    out = open(args.output, "w", encoding="utf-8", newline="") if args.output else sys.stdout
+    try:
+        with create_app().app_context():
+            for chunk in stream_export(args.format, columns, args.q, args.by):
+                out.write(chunk)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Streaming CSV/NDJSON export of migrant records."""
+
+import csv
+import io
+import json
+from datetime import date
+
+from sqlalchemy import func
+
+from jobs import handler
+from models import db, Migrant
+from search import apply_search
+
+FORMATS = ("csv", "ndjson")
+MIMETYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+DEFAULT_CHUNK_SIZE = 1000
+
+# Every Migrant column except internal bookkeeping ones can be exported
+EXPORTABLE_COLUMNS = tuple(name for name in Migrant.__table__.columns.keys() if name != "qr_code")
+
+
+def resolve_columns(names=None):
+    """Validate a list (or comma-separated string) of column names; default is all exportable columns."""
+    if not names:
+        return list(EXPORTABLE_COLUMNS)
+    if isinstance(names, str):
+        names = [name.strip() for name in names.split(",") if name.strip()]
+    unknown = [name for name in names if name not in EXPORTABLE_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown export columns: {', '.join(unknown)}")
+    return list(dict.fromkeys(names))
+
+
+def export_statement(columns, search_term=None, filter_by=None):
+    """SELECT only ``columns`` of consenting migrants, filtered like the index page."""
+    statement = db.select(*[getattr(Migrant, name) for name in columns]).where(
+        Migrant.data_sharing_consent.is_(True)
+    )
+    if search_term:
+        statement = apply_search(statement, search_term, filter_by)
+    return statement.order_by(Migrant.id)
+
+
+def plain_value(value):
+    """Convert a column value to something json/csv can write (dates become ISO strings)."""
+    return value.isoformat() if isinstance(value, date) else value
+
+
+def _csv_chunks(partitions, columns):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for rows in partitions:
+        writer.writerows([plain_value(value) for value in row] for row in rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def _ndjson_chunks(partitions, columns):
+    for rows in partitions:
+        yield "".join(
+            json.dumps({name: plain_value(value) for name, value in zip(columns, row)}, ensure_ascii=False) + "\n"
+            for row in rows
+        )
+
+
+def stream_export(fmt, columns, search_term=None, filter_by=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield the export as text chunks, fetching ``chunk_size`` rows at a time.
+
+    ``yield_per`` keeps at most one chunk of rows in memory (and uses a
+    server-side cursor on PostgreSQL), so memory stays flat whatever the table size.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    statement = export_statement(columns, search_term, filter_by).execution_options(yield_per=chunk_size)
+    partitions = db.session.execute(statement).partitions()
+    chunks = _csv_chunks if fmt == "csv" else _ndjson_chunks
+    yield from chunks(partitions, columns)
+
+
+@handler("export")
+def export_job(context, params):
+    """Background export to a result file; ``params`` are format, columns, q and by as on /export."""
+    fmt = params.get("format", "csv")
+    columns = resolve_columns(params.get("columns"))
+    search_term, filter_by = params.get("q"), params.get("by")
+    total = db.session.scalar(
+        db.select(func.count()).select_from(export_statement(columns, search_term, filter_by).subquery())
+    )
+    done = 0
+    with context.result(f"migrants-{date.today().isoformat()}.{fmt}", MIMETYPES[fmt]) as stream:
+        for chunk in stream_export(fmt, columns, search_term, filter_by):
+            stream.write(chunk.encode("utf-8"))
+            done = min(total, done + DEFAULT_CHUNK_SIZE)
+            context.progress(done, total)
+    return f"Exported {total} records."
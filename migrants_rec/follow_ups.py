@@ -0,0 +1,288 @@
+"""Follow-up due lists: an indexed queue of outstanding follow-ups and daily per-facility/district counts.
+
+A migrant is in the ``follow_ups`` queue while they have a follow_up_date
+and no check-up on or after it. The queue is kept in step with the
+migrants table by mapper events, like the analytics rollups, so listing
+who is due at a facility is a range scan on (facility, due_date).
+A background thread materialises the day's due/overdue counts into
+``follow_up_summaries`` shortly after midnight.
+"""
+
+import logging
+import threading
+from datetime import date, datetime, time, timedelta
+
+import click
+from flask import Blueprint, current_app, render_template, request
+from flask_login import login_required
+from sqlalchemy import case, event, func, inspect, text
+
+from models import db, FollowUp, FollowUpSummary, Migrant, migrants_bulk_inserted
+from pagination import paginate_keyset
+
+logger = logging.getLogger(__name__)
+
+bp = Blueprint("follow_ups", __name__)
+
+SOURCE_FIELDS = ("follow_up_date", "last_checkup", "healthcare_facility", "work_location_district")
+
+# scope -> queue column the counts are grouped by
+SCOPES = {
+    "facility": FollowUp.healthcare_facility,
+    "district": FollowUp.work_location_district,
+}
+
+# window -> function of the day giving the inclusive (first, last) due dates; None is open-ended
+WINDOWS = {
+    "overdue": lambda day: (None, day - timedelta(days=1)),
+    "today": lambda day: (day, day),
+    "week": lambda day: (day, day + timedelta(days=6)),
+    "due": lambda day: (None, day + timedelta(days=6)),
+}
+
+REFRESH_AFTER_MIDNIGHT = timedelta(minutes=5)
+RETRY_SECONDS = 300
+
+_UPSERT_SQL = text(
+    "INSERT INTO follow_ups (migrant_id, due_date, healthcare_facility, work_location_district) "
+    "VALUES (:migrant_id, :due_date, :healthcare_facility, :work_location_district) "
+    "ON CONFLICT (migrant_id) DO UPDATE SET due_date = excluded.due_date, "
+    "healthcare_facility = excluded.healthcare_facility, work_location_district = excluded.work_location_district"
+)
+_DELETE_SQL = text("DELETE FROM follow_ups WHERE migrant_id = :migrant_id")
+
+
+def queue_entry(migrant_id, values):
+    """Return the follow_ups row for a migrant with column ``values``, or None if nothing is due."""
+    due = values.get("follow_up_date")
+    if due is None:
+        return None
+    checked = values.get("last_checkup")
+    if checked is not None and checked >= due:
+        return None  # Seen on or after the due date: the follow-up has happened
+    return {
+        "migrant_id": migrant_id,
+        "due_date": due,
+        "healthcare_facility": values.get("healthcare_facility") or "",
+        "work_location_district": values.get("work_location_district") or "",
+    }
+
+
+def _current_values(target):
+    return {field: getattr(target, field) for field in SOURCE_FIELDS}
+
+
+# ORM hooks: the queue changes on the flush connection, inside the record's own transaction.
+@event.listens_for(Migrant, "after_insert")
+def _after_insert(mapper, connection, target):
+    entry = queue_entry(target.id, _current_values(target))
+    if entry is not None:
+        connection.execute(_UPSERT_SQL, entry)
+
+
+@event.listens_for(Migrant, "after_update")
+def _after_update(mapper, connection, target):
+    state = inspect(target)
+    if not any(state.attrs[field].history.has_changes() for field in SOURCE_FIELDS):
+        return  # Checked without loading deferred columns
+    entry = queue_entry(target.id, _current_values(target))
+    if entry is None:
+        connection.execute(_DELETE_SQL, {"migrant_id": target.id})
+    else:
+        connection.execute(_UPSERT_SQL, entry)
+
+
+@event.listens_for(Migrant, "before_delete")
+def _before_delete(mapper, connection, target):
+    connection.execute(_DELETE_SQL, {"migrant_id": target.id})
+
+
+@migrants_bulk_inserted.connect
+def _after_bulk_insert(sender, connection, rows):
+    entries = [entry for entry in (queue_entry(row["id"], row) for row in rows) if entry is not None]
+    if entries:
+        connection.execute(_UPSERT_SQL, entries)
+
+
+def rebuild(batch_size=1000):
+    """Recompute the whole queue from ``migrants``; returns the number of follow-ups queued."""
+    db.session.query(FollowUp).delete()
+    rows = db.session.execute(
+        db.select(Migrant.id, *[getattr(Migrant, field) for field in SOURCE_FIELDS])
+        .where(Migrant.follow_up_date.isnot(None))
+        .execution_options(yield_per=batch_size)
+    )
+    queued = 0
+    for batch in rows.partitions():
+        entries = [entry for entry in (queue_entry(row.id, row._asdict()) for row in batch) if entry is not None]
+        if entries:
+            db.session.execute(_UPSERT_SQL, entries)
+            queued += len(entries)
+    db.session.commit()
+    return queued
+
+
+def ensure_built():
+    """Backfill the queue when it is empty but migrants already have follow-up dates."""
+    if db.session.query(FollowUp.migrant_id).first() is None \
+            and db.session.query(Migrant.id).filter(Migrant.follow_up_date.isnot(None)).first() is not None:
+        rebuild()
+    if latest_summary_day() != date.today():
+        materialise()
+
+
+def materialise(day=None):
+    """Replace the summaries for ``day`` (default today) with fresh counts; returns the rows written."""
+    day = day or date.today()
+    week_end = day + timedelta(days=6)
+    summaries = []
+    for scope, column in SCOPES.items():
+        # One pass over the (value, due_date) index, skipping follow-ups due after this week
+        rows = db.session.query(
+            column,
+            func.sum(case((FollowUp.due_date < day, 1), else_=0)),
+            func.sum(case((FollowUp.due_date == day, 1), else_=0)),
+            func.sum(case((FollowUp.due_date >= day, 1), else_=0)),
+        ).filter(FollowUp.due_date <= week_end).group_by(column).all()
+        summaries.extend(
+            FollowUpSummary(day=day, scope=scope, value=value, overdue=overdue,
+                            due_today=due_today, due_this_week=due_this_week)
+            for value, overdue, due_today, due_this_week in rows
+        )
+    db.session.query(FollowUpSummary).filter(FollowUpSummary.day == day).delete()
+    keep_days = current_app.config["FOLLOW_UP_SUMMARY_DAYS"]
+    db.session.query(FollowUpSummary).filter(FollowUpSummary.day < day - timedelta(days=keep_days)).delete()
+    db.session.add_all(summaries)
+    db.session.commit()
+    return len(summaries)
+
+
+def latest_summary_day(day=None):
+    """The most recent day (up to ``day``, default today) with materialised summaries, or None."""
+    return db.session.query(func.max(FollowUpSummary.day)).filter(FollowUpSummary.day <= (day or date.today())).scalar()
+
+
+def load_summary(day, scope):
+    """Summaries of one scope for ``day``, busiest first."""
+    return FollowUpSummary.query.filter_by(day=day, scope=scope).order_by(
+        (FollowUpSummary.overdue + FollowUpSummary.due_this_week).desc(), FollowUpSummary.value
+    ).all()
+
+
+def due_query(day, window, facility=None, district=None):
+    """Query for queued follow-ups in ``window`` relative to ``day``, with the migrant's list columns."""
+    first, last = WINDOWS[window](day)
+    query = db.session.query(
+        FollowUp.due_date, FollowUp.migrant_id, FollowUp.healthcare_facility, FollowUp.work_location_district,
+        Migrant.name, Migrant.age, Migrant.gender, Migrant.contact,
+    ).join(Migrant, Migrant.id == FollowUp.migrant_id)
+    if facility is not None:
+        query = query.filter(FollowUp.healthcare_facility == facility)
+    if district is not None:
+        query = query.filter(FollowUp.work_location_district == district)
+    if first is not None:
+        query = query.filter(FollowUp.due_date >= first)
+    return query.filter(FollowUp.due_date <= last)
+
+
+def format_cursor(cursor):
+    return f"{cursor[0].isoformat()}.{cursor[1]}" if cursor else None
+
+
+def parse_cursor(value):
+    """Turn a "YYYY-MM-DD.<id>" paging cursor back into (date, id); None if it is malformed."""
+    try:
+        due, migrant_id = value.split(".")
+        return date.fromisoformat(due), int(migrant_id)
+    except (AttributeError, ValueError):
+        return None
+
+
+@bp.route("/follow-ups")
+@login_required
+def follow_up_list():
+    window = request.args.get("window", "due")
+    if window not in WINDOWS:
+        window = "due"
+    scope = request.args.get("scope", "facility")
+    if scope not in SCOPES:
+        scope = "facility"
+    facility = request.args.get("facility") or None
+    district = request.args.get("district") or None
+    today = date.today()
+    page = paginate_keyset(
+        due_query(today, window, facility, district), (FollowUp.due_date, FollowUp.migrant_id),
+        after=parse_cursor(request.args.get("after")),
+        before=parse_cursor(request.args.get("before")),
+        per_page=current_app.config["FOLLOW_UPS_PER_PAGE"],
+        descending=False,
+    )
+    summary_day = latest_summary_day(today)
+    summary = load_summary(summary_day, scope) if summary_day else []
+    return render_template(
+        "follow_ups.html", page=page, follow_ups=page.items, window=window, scope=scope,
+        facility=facility, district=district, today=today, summary=summary, summary_day=summary_day,
+        format_cursor=format_cursor, title="Follow-ups"
+    )
+
+
+class Scheduler:
+    """Daemon thread that materialises each day's summaries shortly after midnight.
+
+    The summaries table doubles as the job store: on start (and after a
+    missed night) the thread catches up if today has no rows yet. Every
+    worker runs one; a day that is already materialised is left alone.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="follow-up-scheduler", daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            delay = RETRY_SECONDS
+            try:
+                with self.app.app_context():
+                    if latest_summary_day() != date.today():
+                        logger.info("Materialised %d follow-up summaries", materialise())
+                    db.session.remove()
+                tomorrow = datetime.combine(date.today() + timedelta(days=1), time())
+                delay = (tomorrow + REFRESH_AFTER_MIDNIGHT - datetime.now()).total_seconds()
+            except Exception:
+                logger.exception("Follow-up summary refresh failed; retrying in %d s", RETRY_SECONDS)
+            self._stop.wait(max(delay, 1))
+
+
+def _start_scheduler():
+    current_app.extensions["follow_up_scheduler"].start()
+
+
+def init_app(app):
+    """Register the follow-up page and CLI commands; start the scheduler with the first request."""
+    app.register_blueprint(bp)
+    if app.config["FOLLOW_UP_SCHEDULER"]:
+        # Started lazily so CLI commands and forking servers do not inherit a running thread
+        app.extensions["follow_up_scheduler"] = Scheduler(app)
+        app.before_request(_start_scheduler)
+
+    @app.cli.command("rebuild-follow-ups")
+    def rebuild_follow_ups_command():
+        """Recompute the follow-up queue from the migrants table."""
+        click.echo(f"Queued {rebuild()} follow-ups.")
+
+    @app.cli.command("refresh-follow-ups")
+    @click.option("--day", type=click.DateTime(formats=["%Y-%m-%d"]), help="Day to materialise (default today)")
+    def refresh_follow_ups_command(day):
+        """Materialise the due/overdue counts per facility and district (for cron instead of the scheduler)."""
+        click.echo(f"Wrote {materialise(day.date() if day else None)} follow-up summaries.")
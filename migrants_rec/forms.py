@@ -1,9 +1,10 @@
 """Form definitions for the Migrant Health Records application."""
 
 from flask_wtf import FlaskForm
+from flask_wtf.file import FileAllowed, FileField, FileRequired
 from wtforms import (
     StringField, IntegerField, SubmitField,
-    SelectField, PasswordField, FloatField, BooleanField, DateField
+    SelectField, PasswordField, FloatField, BooleanField, DateField, HiddenField
 )
 from wtforms.validators import DataRequired, Length, Email, EqualTo, Optional
 
@@ -26,11 +27,16 @@ class SearchForm(FlaskForm):
     """Form for searching migrant records."""
     search_term = StringField("Search", validators=[Length(max=100)])
     filter_by = SelectField("Filter By", choices=[
-        ("name", "Name"), ("gender", "Gender"), ("health_condition", "Health Condition"),
+        ("all", "All Fields"), ("name", "Name"), ("gender", "Gender"), ("health_condition", "Health Condition"),
         ("contact", "Contact"), ("id", "ID")
     ])
     submit = SubmitField("Search")
 
+class ImportForm(FlaskForm):
+    """Form for bulk-importing migrant records from a file."""
+    file = FileField("CSV or NDJSON File", validators=[FileRequired(), FileAllowed(["csv", "ndjson", "jsonl", "json"])])
+    submit = SubmitField("Import")
+
 class MigrantForm(FlaskForm):
     """Form for adding and editing migrant records."""
 
@@ -90,5 +96,25 @@ class MigrantForm(FlaskForm):
     contact_tracing_info = StringField("Contact Tracing Info", validators=[Optional(), Length(max=500)])
     referral_notes = StringField("Referral Notes", validators=[Optional(), Length(max=500)])
     follow_up_date = DateField("Follow-up Due Date", format='%Y-%m-%d', validators=[Optional()])
+
+    # Set after the likely-duplicate warning on the add form
+    confirm_not_duplicate = BooleanField("This is a different person; save anyway")
+
+    # Migrant.version the edit form was opened at; a newer saved version means someone else edited it
+    record_version = HiddenField()
     
-    submit = SubmitField("Save")
\ No newline at end of file
+    submit = SubmitField("Save")
+
+class JobForm(FlaskForm):
+    """Carries only the CSRF token, for buttons that queue a background job."""
+    submit = SubmitField("Run in background")
+
+class MergeForm(FlaskForm):
+    """Form for merging (or dismissing) a pair of likely duplicate records.
+
+    Which record's value to keep for each differing field is posted as
+    ``field_<name>`` radio buttons alongside this form.
+    """
+    survivor = SelectField("Keep record", coerce=int, validators=[DataRequired()])
+    merge = SubmitField("Merge")
+    dismiss = SubmitField("Not a duplicate")
@@ -0,0 +1,124 @@
+"""Interface language: the per-session language choice and the ``t`` strings in templates.
+
+Strings live in ``locales/<lang>.po`` and are compiled to gettext ``.mo``
+files by build_translations.py. A catalog is memory-mapped on first use, so
+all workers share its pages, and lookups binary-search the sorted key table.
+"""
+
+import mmap
+import os
+import struct
+import threading
+
+from flask import Blueprint, current_app, redirect, request, session, url_for
+
+bp = Blueprint("i18n", __name__)
+
+MO_MAGIC = 0x950412de
+
+_catalogs = {}
+_lock = threading.Lock()
+
+
+class Catalog:
+    """Read-only view of one compiled ``.mo`` catalog.
+
+    Templates read strings as attributes (``t.app_name``); keys missing here
+    come from ``fallback`` (the default language), and finally the key itself.
+    """
+
+    def __init__(self, path, fallback=None):
+        with open(path, "rb") as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, = struct.unpack_from("<I", self._data, 0)
+        self._order = "<" if magic == MO_MAGIC else ">"
+        _, self._count, self._originals, self._translations = struct.unpack_from(self._order + "4I", self._data, 4)
+        self._cache = {}
+        self.fallback = fallback
+
+    def _entry(self, table, index):
+        length, offset = struct.unpack_from(self._order + "2I", self._data, table + 8 * index)
+        return self._data[offset:offset + length]
+
+    def _find(self, key):
+        target = key.encode("utf-8")
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if self._entry(self._originals, middle) < target:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self._count and self._entry(self._originals, low) == target:
+            return self._entry(self._translations, low).decode("utf-8")
+        return None
+
+    def get(self, key, default=None):
+        """Return the string for ``key`` from this catalog or its fallback, else ``default``."""
+        value = self._cache.get(key)
+        if value is None:
+            value = self._find(key)
+            if value is None:
+                return self.fallback.get(key, default) if self.fallback is not None else default
+            self._cache[key] = value
+        return value
+
+    def __getattr__(self, key):
+        if key.startswith("_"):
+            raise AttributeError(key)
+        return self.get(key, key)
+
+    __getitem__ = __getattr__
+
+    def __contains__(self, key):
+        return self._find(key) is not None
+
+    def keys(self):
+        """Every key in this catalog (without the fallback's), in sorted order."""
+        return [self._entry(self._originals, i).decode("utf-8") for i in range(self._count) if self._entry(self._originals, i)]
+
+
+def available_languages():
+    """Language codes with a compiled catalog in TRANSLATIONS_DIR."""
+    directory = current_app.config["TRANSLATIONS_DIR"]
+    return sorted(name[:-3] for name in os.listdir(directory) if name.endswith(".mo"))
+
+
+def _load(directory, lang, default):
+    """Load (or reuse) the Catalog for ``lang``; the caller holds ``_lock``."""
+    key = (directory, lang)
+    if key not in _catalogs:
+        fallback = _load(directory, default, default) if lang != default else None
+        _catalogs[key] = Catalog(os.path.join(directory, f"{lang}.mo"), fallback)
+    return _catalogs[key]
+
+
+def get_catalog(lang):
+    """Return the Catalog for ``lang`` (the default language's if there is none), loaded once per worker."""
+    directory = current_app.config["TRANSLATIONS_DIR"]
+    catalog = _catalogs.get((directory, lang))
+    if catalog is None:
+        default = current_app.config["DEFAULT_LANGUAGE"]
+        source = lang if lang in available_languages() else default
+        with _lock:
+            catalog = _catalogs[(directory, lang)] = _load(directory, source, default)
+    return catalog
+
+
+def inject_translations():
+    return dict(t=get_catalog(session.get('language', current_app.config['DEFAULT_LANGUAGE'])))
+
+
+@bp.route("/language/<lang_code>")
+def change_language(lang_code):
+    if lang_code in available_languages():
+        session['language'] = lang_code
+    else:
+        session['language'] = current_app.config['DEFAULT_LANGUAGE']
+    return redirect(request.referrer or url_for('records.index'))
+
+
+def init_app(app):
+    """Register the language route and the ``t`` template context on ``app``."""
+    app.register_blueprint(bp)
+    app.context_processor(inject_translations)
@@ -0,0 +1,333 @@
+"""Printable A4 sheets of QR ID cards, rendered in a process pool and streamed as PDF.
+
+Cards reuse PNGs from the QR cache; only the misses are encoded, in
+parallel worker processes so the web worker's own CPU stays free. The
+PDF is written page by page as cards become ready: each QR PNG's
+compressed data is copied into the PDF unchanged (PDF and PNG share the
+same Flate/predictor encoding), so nothing is decoded or resampled.
+"""
+
+import io
+import multiprocessing
+import struct
+import threading
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+
+import click
+from flask import Blueprint, Response, abort, current_app, redirect, request, stream_with_context, url_for
+from flask_login import current_user, login_required
+from sqlalchemy import bindparam, func, update
+
+from auth import admin_required
+from forms import JobForm
+from jobs import handler, submit, worker_stopping
+from models import db, Migrant
+from qr_cache import ENCODED_FIELDS, get_qr_cache, payload_key, qr_payload, render_png
+from search import apply_search
+
+bp = Blueprint("id_cards", __name__)
+
+# A4 in PDF points, and CR80 (85.6 x 54 mm) cards laid out 2 x 5 per page
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842
+CARD_WIDTH, CARD_HEIGHT = 243, 153
+COLUMNS, ROWS = 2, 5
+CARDS_PER_PAGE = COLUMNS * ROWS
+MARGIN_X = (PAGE_WIDTH - COLUMNS * CARD_WIDTH) / 2
+MARGIN_Y = (PAGE_HEIGHT - ROWS * CARD_HEIGHT) / 2
+QR_SIZE = 110
+NAME_LENGTH = 20  # Characters of the name that fit beside the QR code
+
+# Renders smaller than this are done in-process; starting work in the pool costs more
+MIN_POOL_BATCH = 8
+BATCH_SIZE = 200
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool(processes=None):
+    """Return this process's QR rendering pool, started on first use.
+
+    "spawn" children start clean instead of inheriting the web worker's
+    threads and open database connections.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+@worker_stopping.connect
+def shutdown_pool(sender=None, **kwargs):
+    """Stop this process's rendering pool, if it was started."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
+
+
+def select_statement(ids=None, search_term=None, filter_by=None, limit=None):
+    """SELECT the QR fields of the chosen migrants: an ID list, or the index page's q/by filter."""
+    statement = db.select(*[getattr(Migrant, field) for field in ENCODED_FIELDS], Migrant.qr_code)
+    if ids is not None:
+        statement = statement.where(Migrant.id.in_(ids))
+    elif search_term:
+        statement = apply_search(statement, search_term, filter_by)
+    statement = statement.order_by(Migrant.id)
+    return statement.limit(limit) if limit else statement
+
+
+def card_images(rows, view_url, cache, processes=None):
+    """Yield (row, png) for ``rows``, rendering cache misses in the process pool one batch at a time.
+
+    The new QR cache keys are recorded once ``rows`` is exhausted: committing
+    mid-stream would close a server-side cursor (PostgreSQL) still being read.
+    """
+    batch, stale = [], []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            yield from _render_batch(batch, view_url, cache, processes, stale)
+            batch = []
+    if batch:
+        yield from _render_batch(batch, view_url, cache, processes, stale)
+    if stale:
+        # Core UPDATE: recording the cache key is bookkeeping, not a record change
+        db.session.execute(
+            update(Migrant.__table__).where(Migrant.__table__.c.id == bindparam("migrant_id"))
+            .values(qr_code=bindparam("key")),
+            stale
+        )
+        db.session.commit()
+
+
+def _render_batch(rows, view_url, cache, processes, stale):
+    payloads = [qr_payload(row, view_url(row.id)) for row in rows]
+    keys = [payload_key(payload) for payload in payloads]
+    images = [cache.get(key) for key in keys]
+    missing = [i for i, png in enumerate(images) if png is None]
+    if missing:
+        todo = [payloads[i] for i in missing]
+        if len(todo) >= MIN_POOL_BATCH:
+            rendered = get_pool(processes).map(render_png, todo, chunksize=max(1, len(todo) // 32))
+        else:
+            rendered = map(render_png, todo)
+        for i, png in zip(missing, rendered):
+            cache.put(keys[i], png)
+            images[i] = png
+    stale.extend({"migrant_id": row.id, "key": key} for row, key in zip(rows, keys) if row.qr_code != key)
+    yield from zip(rows, images)
+
+
+def _png_image(png):
+    """(width, height, PDF image dictionary entries, data) for a PNG, copying its IDAT stream when possible."""
+    width, height, depth, color_type, _, _, interlace = struct.unpack(">IIBBBBB", png[16:29])
+    if color_type == 0 and interlace == 0:
+        chunks, position = [], 8
+        while position < len(png):
+            length, kind = struct.unpack(">I4s", png[position:position + 8])
+            if kind == b"IDAT":
+                chunks.append(png[position + 8:position + 8 + length])
+            position += 12 + length
+        entries = (f"/ColorSpace /DeviceGray /BitsPerComponent {depth} /Filter /FlateDecode "
+                   f"/DecodeParms << /Predictor 15 /Colors 1 /BitsPerComponent {depth} /Columns {width} >>")
+        return width, height, entries, b"".join(chunks)
+    # Anything else (palette, alpha, interlaced) is decoded once with Pillow
+    from PIL import Image
+    image = Image.open(io.BytesIO(png)).convert("L")
+    return image.width, image.height, "/ColorSpace /DeviceGray /BitsPerComponent 8 /Filter /FlateDecode", \
+        zlib.compress(image.tobytes())
+
+
+def _pdf_text(value):
+    """Escape a string for a PDF literal; characters outside Latin-1 (the base fonts' range) become '?'."""
+    text = str(value).encode("latin-1", "replace").decode("latin-1")
+    return "(" + text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") + ")"
+
+
+class SheetWriter:
+    """Incremental PDF writer: every method returns the bytes to send next.
+
+    Objects 1-4 (catalog, page tree, fonts) are reserved up front; the page
+    tree and catalog are written last, once the page count is known.
+    """
+
+    CATALOG, PAGES, FONT, BOLD_FONT = 1, 2, 3, 4
+
+    def __init__(self, title):
+        self.title = title
+        self.offset = 0
+        self.offsets = {}
+        self.next_id = 5
+        self.page_ids = []
+
+    def _allocate(self):
+        self.next_id += 1
+        return self.next_id - 1
+
+    def _object(self, object_id, body, stream=None):
+        data = f"{object_id} 0 obj\n".encode() + body.encode("latin-1")
+        if stream is not None:
+            data += b"\nstream\n" + stream + b"\nendstream"
+        data += b"\nendobj\n"
+        self.offsets[object_id] = self.offset
+        self.offset += len(data)
+        return data
+
+    def start(self):
+        header = b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n"
+        self.offset = len(header)
+        return header + self._object(self.FONT, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>") \
+            + self._object(self.BOLD_FONT, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>")
+
+    def page(self, cards):
+        """One sheet of up to CARDS_PER_PAGE (row, png) cards."""
+        out = []
+        images, ops = [], []
+        for index, (row, png) in enumerate(cards):
+            column, line = index % COLUMNS, index // COLUMNS
+            x = MARGIN_X + column * CARD_WIDTH
+            y = PAGE_HEIGHT - MARGIN_Y - (line + 1) * CARD_HEIGHT
+            width, height, entries, data = _png_image(png)
+            image_id = self._allocate()
+            out.append(self._object(
+                image_id, f"<< /Type /XObject /Subtype /Image /Width {width} /Height {height} {entries} /Length {len(data)} >>", data
+            ))
+            images.append(f"/Q{index} {image_id} 0 R")
+            name = row.name if len(row.name) <= NAME_LENGTH else row.name[:NAME_LENGTH - 1] + "..."
+            text_x = x + QR_SIZE + 12
+            ops.append(
+                f"0.6 G 0.5 w {x + 4:.1f} {y + 4:.1f} {CARD_WIDTH - 8} {CARD_HEIGHT - 8} re S "
+                f"q {QR_SIZE} 0 0 {QR_SIZE} {x + 8:.1f} {y + (CARD_HEIGHT - QR_SIZE) / 2:.1f} cm /Q{index} Do Q "
+                f"BT 0 g /F1 7 Tf {text_x:.1f} {y + CARD_HEIGHT - 26:.1f} Td {_pdf_text(self.title)} Tj ET "
+                f"BT /F2 9 Tf {text_x:.1f} {y + CARD_HEIGHT - 52:.1f} Td {_pdf_text(name)} Tj ET "
+                f"BT /F1 9 Tf {text_x:.1f} {y + CARD_HEIGHT - 72:.1f} Td {_pdf_text(f'ID: {row.id}')} Tj "
+                f"0 -16 Td {_pdf_text('Blood group: ' + (row.blood_group or '-'))} Tj ET"
+            )
+        content = zlib.compress("\n".join(ops).encode("latin-1"))
+        content_id, page_id = self._allocate(), self._allocate()
+        out.append(self._object(content_id, f"<< /Length {len(content)} /Filter /FlateDecode >>", content))
+        out.append(self._object(page_id, (
+            f"<< /Type /Page /Parent {self.PAGES} 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+            f"/Resources << /Font << /F1 {self.FONT} 0 R /F2 {self.BOLD_FONT} 0 R >> "
+            f"/XObject << {' '.join(images)} >> >> /Contents {content_id} 0 R >>"
+        )))
+        self.page_ids.append(page_id)
+        return b"".join(out)
+
+    def finish(self):
+        kids = " ".join(f"{page_id} 0 R" for page_id in self.page_ids)
+        out = self._object(self.PAGES, f"<< /Type /Pages /Kids [{kids}] /Count {len(self.page_ids)} >>")
+        out += self._object(self.CATALOG, f"<< /Type /Catalog /Pages {self.PAGES} 0 R >>")
+        xref = [f"xref\n0 {self.next_id}\n", "0000000000 65535 f \n"]
+        xref += [f"{self.offsets[i]:010d} 00000 n \n" for i in range(1, self.next_id)]
+        xref.append(f"trailer\n<< /Size {self.next_id} /Root {self.CATALOG} 0 R >>\nstartxref\n{self.offset}\n%%EOF\n")
+        return out + "".join(xref).encode()
+
+
+def render_sheets(cards, title="Migrant Health Records"):
+    """Yield the PDF for an iterable of (row, png) cards, one page at a time."""
+    writer = SheetWriter(title)
+    yield writer.start()
+    page = []
+    for card in cards:
+        page.append(card)
+        if len(page) == CARDS_PER_PAGE:
+            yield writer.page(page)
+            page = []
+    if page or not writer.page_ids:
+        yield writer.page(page)
+    yield writer.finish()
+
+
+def _view_url(migrant_id):
+    return url_for("records.view_migrant", migrant_id=migrant_id, _external=True)
+
+
+def generate(ids=None, search_term=None, filter_by=None):
+    """Yield the ID-card PDF for the chosen migrants; runs inside a request context (for the QR URLs)."""
+    config = current_app.config
+    statement = select_statement(ids, search_term, filter_by, config["ID_CARD_MAX"]).execution_options(yield_per=BATCH_SIZE)
+    rows = db.session.execute(statement)
+    yield from render_sheets(card_images(rows, _view_url, get_qr_cache(), config["ID_CARD_PROCESSES"]))
+
+
+def parse_ids(value, limit):
+    """Parse "1,2,5-9" into a list of at most ``limit`` ids; raises ValueError on anything else."""
+    ids = []
+    for part in filter(None, (piece.strip() for piece in (value or "").split(","))):
+        first, _, last = part.partition("-")
+        first, last = int(first), int(last) if last else int(first)
+        if last - first + 1 + len(ids) > limit:
+            raise ValueError(f"At most {limit} cards per run")
+        ids.extend(range(first, last + 1))
+    return ids
+
+
+@handler("id_cards")
+def id_cards_job(context, params):
+    """Background ID-card run; ``params`` are ids, q and by as on /id-cards, plus base_url for the QR links."""
+    config = current_app.config
+    ids, search_term, filter_by = params.get("ids"), params.get("q"), params.get("by")
+    count = db.session.scalar(db.select(func.count()).select_from(
+        select_statement(ids, search_term, filter_by, config["ID_CARD_MAX"]).subquery()
+    ))
+    pages = max(1, -(-count // CARDS_PER_PAGE))
+    with current_app.test_request_context(base_url=params.get("base_url") or config["PUBLIC_BASE_URL"]):
+        with context.result(f"id-cards-{date.today().isoformat()}.pdf", "application/pdf") as stream:
+            # The PDF header comes first, then one chunk per page
+            for page, chunk in enumerate(generate(ids, search_term, filter_by)):
+                stream.write(chunk)
+                context.progress(min(page, pages), pages)
+    return f"{count} ID cards on {pages} pages."
+
+
+@bp.route("/id-cards", methods=["GET", "POST"])
+@login_required
+@admin_required
+def id_cards():
+    """Stream ID-card sheets for ?ids=1,2,5-9, or for the index page's ?q=&by= filter.
+
+    A POST queues the same run as a background job and redirects to its page.
+    """
+    try:
+        ids = parse_ids(request.values.get("ids"), current_app.config["ID_CARD_MAX"]) or None
+    except ValueError as e:
+        abort(400, f"Bad ids (expected e.g. 1,2,5-9): {e}")
+    if request.method == "POST":
+        if not JobForm().validate_on_submit():
+            abort(400, "The form has expired; reload the page and try again.")
+        params = {"ids": ids, "q": request.values.get("q"), "by": request.values.get("by"), "base_url": request.host_url}
+        return redirect(url_for("jobs.job_status", job_id=submit("id_cards", params, current_user.id).id))
+    filename = f"id-cards-{date.today().isoformat()}.pdf"
+    return Response(
+        stream_with_context(generate(ids, request.args.get("q"), request.args.get("by"))),
+        mimetype="application/pdf",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+def init_app(app):
+    """Register the ID-card route and the ``id-cards`` CLI command on ``app``."""
+    app.register_blueprint(bp)
+
+    @app.cli.command("id-cards")
+    @click.option("--ids", help="Migrant ids, e.g. 1,2,5-9")
+    @click.option("--q", "search_term", help="Search term, as on the index page")
+    @click.option("--by", "filter_by", default="all", show_default=True, help="Search field, as on the index page")
+    @click.option("--base-url", default=lambda: app.config["PUBLIC_BASE_URL"], show_default="PUBLIC_BASE_URL",
+                  help="Site address encoded in the QR links")
+    @click.option("--output", "-o", type=click.File("wb"), required=True, help="PDF file to write ('-' for stdout)")
+    def id_cards_command(ids, search_term, filter_by, base_url, output):
+        """Write printable QR ID-card sheets (A4 PDF) for the chosen migrants."""
+        try:
+            id_list = parse_ids(ids, app.config["ID_CARD_MAX"]) or None
+        except ValueError as e:
+            raise click.BadParameter(f"expected e.g. 1,2,5-9: {e}", param_hint="--ids")
+        with app.test_request_context(base_url=base_url):
+            for chunk in generate(id_list, search_term, filter_by):
+                output.write(chunk)
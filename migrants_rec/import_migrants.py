@@ -0,0 +1,28 @@
+"""Bulk-import migrant records from a CSV or NDJSON file.
+
+Usage: python import_migrants.py FILE [--format csv|ndjson] [--batch-size N]
+"""
+
+import argparse
+import time
+
+from app import create_app
+from importer import DEFAULT_BATCH_SIZE, FORMATS, guess_format, import_stream
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-import migrant records.")
+    parser.add_argument("path", help="CSV or NDJSON file to import")
+    parser.add_argument("--format", choices=FORMATS, help="File format (default: from the file extension)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Rows per transaction")
+    args = parser.parse_args()
+    fmt = args.format or guess_format(args.path)
+    started = time.perf_counter()
+    with create_app().app_context(), open(args.path, encoding="utf-8-sig", newline="") as stream:
+        result = import_stream(stream, fmt, batch_size=args.batch_size)
+    elapsed = time.perf_counter() - started
+    print(f"Imported {result.inserted} records in {elapsed:.1f}s; {result.failed} rows rejected.")
+    for line_number, message in result.errors:
+        print(f"  line {line_number}: {message}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""Streaming bulk import of migrant records from CSV or NDJSON files."""
+
+import csv
+import json
+
+from sqlalchemy import insert
+from werkzeug.datastructures import MultiDict
+
+from forms import MigrantForm
+from models import db, Migrant, compute_bmi, migrants_bulk_inserted
+
+FORMATS = ("csv", "ndjson")
+DEFAULT_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+
+_FALSE_STRINGS = {"0", "false", "no", "n", "off"}
+
+
+def guess_format(filename):
+    """Return "ndjson" for .ndjson/.jsonl/.json files and "csv" otherwise."""
+    return "ndjson" if filename.lower().endswith((".ndjson", ".jsonl", ".json")) else "csv"
+
+
+def read_rows(stream, fmt):
+    """Yield (line_number, row_dict) pairs from a text stream without loading it whole."""
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+    elif fmt == "ndjson":
+        for line_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                yield line_number, ValueError(f"Invalid JSON: {e}")
+                continue
+            yield line_number, row if isinstance(row, dict) else ValueError("Expected a JSON object")
+    else:
+        raise ValueError(f"Unsupported import format: {fmt}")
+
+
+class RowValidator:
+    """Validate plain dict rows with the field rules declared on MigrantForm.
+
+    One form instance is reused for every row, and only the fields a row
+    supplies (plus the required ones) are processed, which keeps validation
+    to a fraction of the cost of building a MigrantForm per row.
+    """
+
+    def __init__(self):
+        self.form = MigrantForm(formdata=None, meta={"csrf": False})
+        columns = set(Migrant.__table__.columns.keys())
+        self.fields = [name for name in self.form._fields if name in columns]
+        self.required = {
+            name for name in self.fields
+            if any(getattr(v, "field_flags", {}).get("required") for v in self.form[name].validators)
+        }
+
+    def _normalise(self, row):
+        data = MultiDict()
+        for key, value in row.items():
+            if key not in self.form._fields or value is None:
+                continue
+            if isinstance(value, bool):
+                value = "y" if value else ""
+            value = str(value).strip()
+            if key == "data_sharing_consent" and value.lower() in _FALSE_STRINGS:
+                value = ""
+            if value:
+                data[key] = value
+        return data
+
+    def __call__(self, row):
+        """Return (values, errors): column values ready to insert, or field errors."""
+        formdata = self._normalise(row)
+        values, errors = {}, {}
+        for name in self.fields:
+            if name not in formdata and name not in self.required:
+                values[name] = False if name == "data_sharing_consent" else None
+                continue
+            field = self.form[name]
+            field.process(formdata)
+            if field.validate(self.form):
+                values[name] = field.data if field.data != "" else None
+            else:
+                errors[name] = field.errors
+        if errors:
+            return None, errors
+        values["bmi"] = compute_bmi(values.get("height"), values.get("weight"))
+        return values, None
+
+
+class ImportResult:
+    """Summary of an import run: counts plus the first MAX_REPORTED_ERRORS row errors."""
+
+    def __init__(self):
+        self.inserted = 0
+        self.failed = 0
+        self.errors = []
+
+    def add_error(self, line_number, message):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line_number, message))
+
+
+def _format_errors(errors):
+    return "; ".join(f"{name}: {', '.join(messages)}" for name, messages in errors.items())
+
+
+def _insert_rows(batch):
+    """Insert (line_number, values) pairs in one executemany and return the values with ids."""
+    rows = [values for _, values in batch]
+    statement = insert(Migrant.__table__).returning(Migrant.__table__.c.id, sort_by_parameter_order=True)
+    ids = db.session.execute(statement, rows).scalars().all()
+    for values, new_id in zip(rows, ids):
+        values["id"] = new_id
+    migrants_bulk_inserted.send(Migrant, connection=db.session.connection(), rows=rows)
+    return rows
+
+
+def insert_batch(batch, result, seen_ids):
+    """Insert one batch in its own transaction, recording duplicate or failing rows on ``result``.
+
+    ``seen_ids`` holds the Aadhaar/passport numbers already taken earlier in the file.
+    """
+    numbers = [values["aadhaar_passport"] for _, values in batch if values["aadhaar_passport"]]
+    if numbers:
+        existing = db.session.query(Migrant.aadhaar_passport).filter(Migrant.aadhaar_passport.in_(numbers))
+        seen_ids.update(number for number, in existing)
+    accepted = []
+    for line_number, values in batch:
+        number = values["aadhaar_passport"]
+        if number and number in seen_ids:
+            result.add_error(line_number, f"Duplicate aadhaar_passport {number}")
+            continue
+        if number:
+            seen_ids.add(number)
+        accepted.append((line_number, values))
+    if not accepted:
+        return
+    try:
+        _insert_rows(accepted)
+        db.session.commit()
+        result.inserted += len(accepted)
+        return
+    except Exception:
+        db.session.rollback()
+    # Something in the batch still failed (e.g. a concurrent insert); isolate it row by row
+    for line_number, values in accepted:
+        values.pop("id", None)
+        try:
+            with db.session.begin_nested():
+                _insert_rows([(line_number, values)])
+            result.inserted += 1
+        except Exception as e:
+            result.add_error(line_number, str(getattr(e, "orig", e)))
+    db.session.commit()
+
+
+def import_stream(stream, fmt, batch_size=DEFAULT_BATCH_SIZE):
+    """Validate and insert every row of ``stream``; returns an ImportResult.
+
+    Must run inside an application context.
+    """
+    validate = RowValidator()
+    result = ImportResult()
+    seen_ids = set()
+    batch = []
+    for line_number, row in read_rows(stream, fmt):
+        if isinstance(row, Exception):
+            result.add_error(line_number, str(row))
+            continue
+        values, errors = validate(row)
+        if errors:
+            result.add_error(line_number, _format_errors(errors))
+            continue
+        batch.append((line_number, values))
+        if len(batch) >= batch_size:
+            insert_batch(batch, result, seen_ids)
+            batch = []
+    if batch:
+        insert_batch(batch, result, seen_ids)
+    return result
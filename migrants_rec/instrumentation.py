@@ -0,0 +1,211 @@
+"""Per-request latency, SQL and template timing, exposed in Prometheus text format.
+
+Everything is kept in process memory behind one lock, and a request costs a
+few dictionary updates, so it is cheap enough to leave on in production.
+Each gunicorn worker keeps (and reports) its own numbers.
+"""
+
+import logging
+import threading
+import time
+from bisect import bisect_left
+
+from flask import Blueprint, Response, before_render_template, current_app, g, has_request_context, request, template_rendered
+from flask_login import login_required
+from sqlalchemy import event
+
+from auth import admin_required
+from models import db
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SLOW_QUERY_LOG_LENGTH = 1000
+
+bp = Blueprint("instrumentation", __name__)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}" if pairs else ""
+
+
+class Counter:
+    """Monotonic counter keyed by a tuple of label values."""
+
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values = {}
+
+    def inc(self, labels, amount=1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        for labels, value in sorted(self._values.items()):
+            yield f"{self.name}{_labels(self.labelnames, labels)} {value}"
+
+
+class Histogram:
+    """Fixed-bucket histogram; buckets are stored per bucket and made cumulative on render."""
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, buckets, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        self.labelnames = labelnames
+        self._series = {}
+
+    def observe(self, labels, value):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def samples(self):
+        for labels, (counts, total, count) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += bucket_count
+                yield f"{self.name}_bucket{_labels(self.labelnames, labels, [('le', bound)])} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labelnames, labels)} {total:.6f}"
+            yield f"{self.name}_count{_labels(self.labelnames, labels)} {count}"
+
+
+class Metrics:
+    """The app's metric families, updated once per request under a single lock."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = Counter("http_requests_total", "Requests handled", ("endpoint", "method", "status"))
+        self.latency = Histogram("http_request_duration_seconds", "Time spent handling a request",
+                                 LATENCY_BUCKETS, ("endpoint", "method"))
+        self.queries = Histogram("http_request_db_queries", "SQL statements executed per request",
+                                 QUERY_COUNT_BUCKETS, ("endpoint",))
+        self.db_time = Histogram("http_request_db_duration_seconds", "Time spent in SQL per request",
+                                 LATENCY_BUCKETS, ("endpoint",))
+        self.template_time = Histogram("http_request_template_duration_seconds", "Time spent rendering templates per request",
+                                       LATENCY_BUCKETS, ("endpoint",))
+        self.slow_queries = Counter("db_slow_queries_total", "SQL statements slower than SLOW_QUERY_MS", ("endpoint",))
+        self.families = (self.requests, self.latency, self.queries, self.db_time, self.template_time, self.slow_queries)
+
+    def record_request(self, endpoint, method, status, seconds, query_count, db_seconds, template_seconds):
+        with self._lock:
+            self.requests.inc((endpoint, method, str(status)))
+            self.latency.observe((endpoint, method), seconds)
+            self.queries.observe((endpoint,), query_count)
+            self.db_time.observe((endpoint,), db_seconds)
+            if template_seconds:
+                self.template_time.observe((endpoint,), template_seconds)
+
+    def record_slow_query(self, endpoint):
+        with self._lock:
+            self.slow_queries.inc((endpoint,))
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        with self._lock:
+            for family in self.families:
+                lines.append(f"# HELP {family.name} {family.documentation}")
+                lines.append(f"# TYPE {family.name} {family.kind}")
+                lines.extend(family.samples())
+        return "\n".join(lines) + "\n"
+
+
+def get_metrics():
+    """Return the Metrics registry of the current app."""
+    return current_app.extensions["metrics"]
+
+
+def _endpoint():
+    # Unmatched URLs share one label, so 404 scans cannot blow up the series count
+    return request.endpoint or "unmatched"
+
+
+def _start_request():
+    g.metrics_started = time.perf_counter()
+    g.sql_count = 0
+    g.sql_seconds = 0.0
+    g.template_seconds = 0.0
+
+
+def _finish_request(response):
+    started = g.pop("metrics_started", None)
+    if started is not None:
+        current_app.extensions["metrics"].record_request(
+            _endpoint(), request.method, response.status_code, time.perf_counter() - started,
+            g.get("sql_count", 0), g.get("sql_seconds", 0.0), g.get("template_seconds", 0.0)
+        )
+    return response
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context.metrics_started = time.perf_counter()
+
+
+def _query_timer(metrics, slow_query_seconds):
+    """Build the after_cursor_execute listener that times statements for ``metrics``."""
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context.metrics_started
+        in_request = has_request_context() and "metrics_started" in g
+        if in_request:
+            g.sql_count += 1
+            g.sql_seconds += elapsed
+        if elapsed >= slow_query_seconds:
+            endpoint = _endpoint() if has_request_context() else "-"
+            # Parameters are left out on purpose: they hold patient data
+            logger.warning("Slow query (%.1f ms) in %s: %s", elapsed * 1000, endpoint,
+                           " ".join(statement.split())[:SLOW_QUERY_LOG_LENGTH])
+            if in_request:
+                metrics.record_slow_query(endpoint)
+    return _after_cursor_execute
+
+
+def _before_render(sender, template, context, **extra):
+    if "metrics_started" in g:
+        g.setdefault("template_started", []).append(time.perf_counter())
+
+
+def _after_render(sender, template, context, **extra):
+    stack = g.get("template_started")
+    if stack:
+        started = stack.pop()
+        # Nested renders (includes of whole templates) are only counted at the outer level
+        if not stack:
+            g.template_seconds += time.perf_counter() - started
+
+
+@bp.route("/metrics")
+@login_required
+@admin_required
+def metrics():
+    return Response(get_metrics().render(), mimetype="text/plain; version=0.0.4")
+
+
+def init_app(app):
+    """Start collecting metrics for ``app`` if METRICS_ENABLED is set."""
+    if not app.config.get("METRICS_ENABLED", True):
+        return
+    metrics = app.extensions["metrics"] = Metrics()
+    app.register_blueprint(bp)
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    before_render_template.connect(_before_render, app)
+    template_rendered.connect(_after_render, app)
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _query_timer(metrics, app.config["SLOW_QUERY_MS"] / 1000))
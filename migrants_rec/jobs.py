@@ -0,0 +1,297 @@
+"""Background jobs: a queue in the ``jobs`` table worked off by `flask jobs-worker` processes.
+
+Heavy work (exports, ID-card sheets, duplicate scans) is submitted from a
+request with :func:`submit`, which only inserts a row; the admin is sent to
+the job's page, which polls its progress. Worker processes claim queued
+jobs with a conditional UPDATE, so several can share one SQLite database,
+and write results to JOB_RESULTS_DIR. Results are deleted once they expire.
+
+Feature modules register what a job kind does with :func:`handler`, like
+they subscribe to ``migrants_bulk_inserted``; the worker builds the full
+app, so every handler is registered there.
+"""
+
+import json
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import time
+import types
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import click
+from blinker import Namespace
+from flask import Blueprint, abort, current_app, jsonify, render_template, send_file, url_for
+from flask_login import login_required
+from sqlalchemy import update
+
+from auth import admin_required
+from models import db, Job
+
+logger = logging.getLogger(__name__)
+
+bp = Blueprint("jobs", __name__, url_prefix="/jobs")
+
+# kind -> function(context, params) returning a short message for the admin
+HANDLERS = {}
+
+# Sent in a worker process before it exits, e.g. to stop process pools a handler started
+_signals = Namespace()
+worker_stopping = _signals.signal("job-worker-stopping")
+
+PROGRESS_INTERVAL = 1.0  # Seconds between progress writes from a running job
+MAINTENANCE_INTERVAL = 60  # Seconds between stale-job and expiry sweeps in each worker
+
+
+def handler(kind):
+    """Register the decorated function as the handler of jobs of ``kind``."""
+    def register(function):
+        HANDLERS[kind] = function
+        return function
+    return register
+
+
+def submit(kind, params=None, user_id=None):
+    """Queue a job of ``kind`` with JSON-serialisable ``params``; returns the committed Job."""
+    if kind not in HANDLERS:
+        raise ValueError(f"Unknown job kind: {kind}")
+    job = Job(kind=kind, params=json.dumps(params or {}), user_id=user_id, created_at=datetime.now())
+    db.session.add(job)
+    db.session.commit()
+    return job
+
+
+class JobContext:
+    """Handed to a job handler: progress reporting and the result file."""
+
+    def __init__(self, job, results_dir):
+        self.job = job
+        self.results_dir = results_dir
+        self.done, self.total = 0, None
+        self._last_write = 0.0
+
+    def progress(self, done, total=None):
+        """Record ``done`` of ``total`` units, written at most once per PROGRESS_INTERVAL.
+
+        The write uses its own short transaction, leaving the handler's
+        session (and any cursor it is streaming) alone; on SQLite, do not
+        report progress while the session holds uncommitted writes.
+        """
+        self.done, self.total = done, total
+        now = time.monotonic()
+        if now - self._last_write < PROGRESS_INTERVAL:
+            return
+        self._last_write = now
+        with db.engine.begin() as connection:
+            connection.execute(update(Job).where(Job.id == self.job.id).values(
+                progress=done, total=total, heartbeat_at=datetime.now()
+            ))
+
+    @contextmanager
+    def result(self, name, mimetype):
+        """Open the job's result file for binary writing; it only appears once the block completes."""
+        os.makedirs(self.results_dir, exist_ok=True)
+        filename = f"{self.job.id}-{uuid.uuid4().hex}"
+        path = os.path.join(self.results_dir, filename)
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, "wb") as stream:
+                yield stream
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self.job.result_file, self.job.result_name, self.job.result_mimetype = filename, name, mimetype
+
+
+def result_path(job):
+    return os.path.join(current_app.config["JOB_RESULTS_DIR"], job.result_file) if job.result_file else None
+
+
+def _worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"[:60]
+
+
+def claim(worker=None):
+    """Take the oldest queued job for this process and mark it running; None if the queue is empty."""
+    while True:
+        job_id = db.session.scalar(db.select(Job.id).where(Job.status == "queued").order_by(Job.id).limit(1))
+        if job_id is None:
+            db.session.commit()
+            return None
+        now = datetime.now()
+        claimed = db.session.execute(update(Job).where(Job.id == job_id, Job.status == "queued").values(
+            status="running", worker=worker or _worker_name(), started_at=now, heartbeat_at=now
+        )).rowcount
+        db.session.commit()
+        if claimed:
+            return db.session.get(Job, job_id)
+        # Another worker got there first; try the next one
+
+
+def run(job):
+    """Run a claimed job to completion, recording its outcome on the row."""
+    context = JobContext(job, current_app.config["JOB_RESULTS_DIR"])
+    try:
+        message = HANDLERS[job.kind](context, json.loads(job.params))
+    except Exception as e:
+        logger.exception("Job %d (%s) failed", job.id, job.kind)
+        db.session.rollback()
+        job.status, job.message = "failed", str(e)[:255] or type(e).__name__
+    else:
+        job.status, job.message = "done", (message or "")[:255]
+        job.total = context.total
+        job.progress = context.total if context.total is not None else context.done
+    now = datetime.now()
+    job.finished_at = job.heartbeat_at = now
+    job.expires_at = now + timedelta(seconds=current_app.config["JOB_RESULT_TTL"])
+    db.session.commit()
+
+
+def fail_stale():
+    """Mark running jobs whose worker stopped reporting as failed; returns how many."""
+    cutoff = datetime.now() - timedelta(seconds=current_app.config["JOB_STALE_SECONDS"])
+    count = db.session.execute(update(Job).where(Job.status == "running", Job.heartbeat_at < cutoff).values(
+        status="failed", message="The worker stopped while running this job", finished_at=datetime.now(),
+        expires_at=datetime.now() + timedelta(seconds=current_app.config["JOB_RESULT_TTL"]),
+    )).rowcount
+    db.session.commit()
+    return count
+
+
+def purge_expired(now=None):
+    """Delete the result files of expired jobs and mark them expired; returns how many."""
+    expired = Job.query.filter(Job.expires_at < (now or datetime.now()), Job.status.in_(("done", "failed"))).all()
+    for job in expired:
+        path = result_path(job)
+        if path and os.path.exists(path):
+            os.remove(path)
+        job.status, job.result_file = "expired", None
+    db.session.commit()
+    return len(expired)
+
+
+def work(stop, poll_seconds):
+    """Claim and run jobs until ``stop`` is set, sweeping stale and expired jobs now and then."""
+    worker = _worker_name()
+    next_maintenance = 0.0
+    while not stop.is_set():
+        if time.monotonic() >= next_maintenance:
+            fail_stale()
+            purge_expired()
+            next_maintenance = time.monotonic() + MAINTENANCE_INTERVAL
+        job = claim(worker)
+        if job is None:
+            stop.wait(poll_seconds)
+            continue
+        logger.info("Running job %d (%s)", job.id, job.kind)
+        run(job)
+        db.session.remove()
+
+
+def _worker_main(config, stop, poll_seconds):
+    # Ctrl-C reaches the whole process group; the parent sets ``stop`` so the current job can finish
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    logging.basicConfig(format="%(asctime)s %(processName)s %(levelname)s %(message)s")
+    logger.setLevel(logging.INFO)
+    from app import create_app  # Imported here: this module is imported by app
+
+    app = create_app(config)
+    with app.app_context():
+        try:
+            work(stop, poll_seconds)
+        finally:
+            worker_stopping.send(app)
+
+
+def serialize_job(job):
+    data = {
+        "id": job.id, "kind": job.kind, "status": job.status, "progress": job.progress, "total": job.total,
+        "message": job.message, "created_at": job.created_at.isoformat(timespec="seconds"),
+        "finished_at": job.finished_at.isoformat(timespec="seconds") if job.finished_at else None,
+        "expires_at": job.expires_at.isoformat(timespec="seconds") if job.expires_at else None,
+    }
+    if job.status == "done" and job.result_file:
+        data["download_url"] = url_for("jobs.download", job_id=job.id)
+    return data
+
+
+@bp.route("")
+@login_required
+@admin_required
+def job_list():
+    jobs = Job.query.order_by(Job.id.desc()).limit(current_app.config["JOBS_PER_PAGE"]).all()
+    return render_template("jobs.html", jobs=jobs, title="Background Jobs")
+
+
+@bp.route("/<int:job_id>")
+@login_required
+@admin_required
+def job_status(job_id):
+    """The job's page; it polls the status endpoint until the job finishes."""
+    job = db.get_or_404(Job, job_id)
+    return render_template("job.html", job=job, status=serialize_job(job), title=f"Job {job.id}")
+
+
+@bp.route("/<int:job_id>/status")
+@login_required
+@admin_required
+def job_status_json(job_id):
+    response = jsonify(serialize_job(db.get_or_404(Job, job_id)))
+    response.cache_control.no_store = True
+    return response
+
+
+@bp.route("/<int:job_id>/download")
+@login_required
+@admin_required
+def download(job_id):
+    job = db.get_or_404(Job, job_id)
+    if job.status == "expired":
+        abort(410, "This result has expired; run the job again.")
+    path = result_path(job)
+    if job.status != "done" or path is None or not os.path.exists(path):
+        abort(404)
+    return send_file(path, mimetype=job.result_mimetype, as_attachment=True, download_name=job.result_name)
+
+
+def init_app(app):
+    """Register the job pages and the ``jobs-worker`` / ``purge-jobs`` commands on ``app``."""
+    app.register_blueprint(bp)
+
+    @app.cli.command("jobs-worker")
+    @click.option("--processes", "-p", default=lambda: app.config["JOB_WORKERS"], show_default="JOB_WORKERS",
+                  type=click.IntRange(min=1), help="Worker processes to start")
+    @click.option("--poll", default=2.0, show_default=True, help="Seconds between queue checks when idle")
+    def jobs_worker_command(processes, poll):
+        """Run queued background jobs until interrupted (Ctrl-C or SIGTERM finishes the current jobs first)."""
+        # Spawned workers start clean and build their own app from a copy of this one's settings
+        config = types.SimpleNamespace(**{key: value for key, value in app.config.items() if key.isupper()})
+        context = multiprocessing.get_context("spawn")
+        stop = context.Event()
+        workers = [
+            context.Process(target=_worker_main, args=(config, stop, poll), name=f"job-worker-{i + 1}")
+            for i in range(processes)
+        ]
+        signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+        for process in workers:
+            process.start()
+        click.echo(f"Started {processes} job worker(s); Ctrl-C to stop.")
+        try:
+            for process in workers:
+                while process.is_alive():
+                    process.join(1)
+        except KeyboardInterrupt:
+            click.echo("Stopping after the current jobs...")
+            stop.set()
+            for process in workers:
+                process.join()
+
+    @app.cli.command("purge-jobs")
+    def purge_jobs_command():
+        """Delete expired job results and fail jobs whose worker has gone away."""
+        click.echo(f"Expired {purge_expired()} job results; {fail_stale()} stale jobs failed.")
@@ -0,0 +1,36 @@
+"""make visits append only
+
+Replaces the unique (migrant_id, visit_date) constraint with a plain index:
+a second visit on the same day, or a corrected entry, is a new row rather
+than an update of the stored one. Downgrading fails while a migrant has
+more than one visit on a day.
+
+Revision ID: 0a6d3e9b5f14
+Revises: 7f4a9d1c6e30
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0a6d3e9b5f14'
+down_revision = '7f4a9d1c6e30'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if 'ix_visits_migrant_date' in {index['name'] for index in inspector.get_indexes('visits')}:
+        return  # Already created by `flask init-db`
+    with op.batch_alter_table('visits') as batch_op:
+        batch_op.drop_constraint('uq_visits_migrant_date', type_='unique')
+        batch_op.create_index('ix_visits_migrant_date', ['migrant_id', 'visit_date'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('visits') as batch_op:
+        batch_op.drop_index('ix_visits_migrant_date')
+        batch_op.create_unique_constraint('uq_visits_migrant_date', ['migrant_id', 'visit_date'])
@@ -0,0 +1,53 @@
+"""add visits
+
+Append-only visit history; the visit columns on migrants keep describing
+the latest visit. Existing records are backfilled with their latest visit
+(records without a last_checkup date have none to copy). Databases where
+`flask init-db` already created the table are left as they are.
+
+Revision ID: 3c7d2a91f4b6
+Revises: d1b7f5a2c396
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c7d2a91f4b6'
+down_revision = 'd1b7f5a2c396'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if 'visits' in sa.inspect(op.get_bind()).get_table_names():
+        return  # Already created (and backfilled) by `flask init-db`
+    op.create_table('visits',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('migrant_id', sa.Integer(), nullable=False),
+    sa.Column('visit_date', sa.Date(), nullable=False),
+    sa.Column('healthcare_facility', sa.String(length=100), nullable=True),
+    sa.Column('doctor_name', sa.String(length=100), nullable=True),
+    sa.Column('vital_signs', sa.Text(), nullable=True),
+    sa.Column('symptoms', sa.Text(), nullable=True),
+    sa.Column('diagnosis', sa.Text(), nullable=True),
+    sa.Column('prescriptions', sa.Text(), nullable=True),
+    sa.Column('lab_results', sa.Text(), nullable=True),
+    sa.ForeignKeyConstraint(['migrant_id'], ['migrants.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('migrant_id', 'visit_date', name='uq_visits_migrant_date')
+    )
+    op.create_index('ix_visits_facility_date', 'visits', ['healthcare_facility', 'visit_date'], unique=False)
+    op.execute(
+        "INSERT INTO visits (migrant_id, visit_date, healthcare_facility, doctor_name, vital_signs, symptoms, "
+        "diagnosis, prescriptions, lab_results) "
+        "SELECT id, last_checkup, healthcare_facility, doctor_name, vital_signs, symptoms, diagnosis, "
+        "prescriptions, lab_results FROM migrants WHERE last_checkup IS NOT NULL ORDER BY id"
+    )
+
+
+def downgrade():
+    op.drop_index('ix_visits_facility_date', table_name='visits')
+    op.drop_table('visits')
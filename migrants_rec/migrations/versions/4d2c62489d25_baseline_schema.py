@@ -0,0 +1,100 @@
+"""baseline schema
+
+Tables as created by db.create_all() before migrations were introduced;
+existing databases already have them, so each table is only created if missing.
+
+Revision ID: 4d2c62489d25
+Revises: 
+Create Date: 2026-10-18 13:56:25.236057
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4d2c62489d25'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+    if 'analytics_rollups' not in existing:
+        op.create_table('analytics_rollups',
+        sa.Column('dimension', sa.String(length=30), nullable=False),
+        sa.Column('value', sa.String(length=200), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('dimension', 'value')
+        )
+    if 'migrants' not in existing:
+        op.create_table('migrants',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('date_of_birth', sa.Date(), nullable=True),
+        sa.Column('age', sa.Integer(), nullable=False),
+        sa.Column('gender', sa.String(length=10), nullable=False),
+        sa.Column('nationality', sa.String(length=50), nullable=True),
+        sa.Column('state_of_origin', sa.String(length=50), nullable=True),
+        sa.Column('contact', sa.String(length=20), nullable=False),
+        sa.Column('emergency_contact_name', sa.String(length=100), nullable=True),
+        sa.Column('emergency_contact_number', sa.String(length=20), nullable=True),
+        sa.Column('aadhaar_passport', sa.String(length=50), nullable=True),
+        sa.Column('preferred_language', sa.String(length=30), nullable=True),
+        sa.Column('literacy_level', sa.String(length=30), nullable=True),
+        sa.Column('data_sharing_consent', sa.Boolean(), nullable=True),
+        sa.Column('occupation', sa.String(length=100), nullable=True),
+        sa.Column('employer_name', sa.String(length=100), nullable=True),
+        sa.Column('employer_contact', sa.String(length=20), nullable=True),
+        sa.Column('work_location_district', sa.String(length=50), nullable=True),
+        sa.Column('work_location_pincode', sa.String(length=10), nullable=True),
+        sa.Column('duration_of_stay', sa.String(length=50), nullable=True),
+        sa.Column('living_conditions', sa.String(length=50), nullable=True),
+        sa.Column('allergies', sa.Text(), nullable=True),
+        sa.Column('past_medical_conditions', sa.Text(), nullable=True),
+        sa.Column('past_surgical_history', sa.Text(), nullable=True),
+        sa.Column('family_history', sa.Text(), nullable=True),
+        sa.Column('immunization_status', sa.Text(), nullable=True),
+        sa.Column('height', sa.Float(), nullable=True),
+        sa.Column('weight', sa.Float(), nullable=True),
+        sa.Column('bmi', sa.Float(), nullable=True),
+        sa.Column('blood_group', sa.String(length=5), nullable=True),
+        sa.Column('vital_signs', sa.Text(), nullable=True),
+        sa.Column('current_medications', sa.Text(), nullable=True),
+        sa.Column('ongoing_treatment', sa.Text(), nullable=True),
+        sa.Column('infectious_disease_screening', sa.Text(), nullable=True),
+        sa.Column('health_condition', sa.String(length=200), nullable=True),
+        sa.Column('last_checkup', sa.Date(), nullable=True),
+        sa.Column('healthcare_facility', sa.String(length=100), nullable=True),
+        sa.Column('doctor_name', sa.String(length=100), nullable=True),
+        sa.Column('symptoms', sa.Text(), nullable=True),
+        sa.Column('diagnosis', sa.Text(), nullable=True),
+        sa.Column('prescriptions', sa.Text(), nullable=True),
+        sa.Column('lab_results', sa.Text(), nullable=True),
+        sa.Column('vaccination_records', sa.Text(), nullable=True),
+        sa.Column('disease_alerts', sa.Text(), nullable=True),
+        sa.Column('contact_tracing_info', sa.Text(), nullable=True),
+        sa.Column('referral_notes', sa.Text(), nullable=True),
+        sa.Column('follow_up_date', sa.Date(), nullable=True),
+        sa.Column('qr_code', sa.String(length=255), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('aadhaar_passport')
+        )
+    if 'users' not in existing:
+        op.create_table('users',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('username', sa.String(length=64), nullable=False),
+        sa.Column('email', sa.String(length=120), nullable=False),
+        sa.Column('password_hash', sa.String(length=128), nullable=True),
+        sa.Column('role', sa.String(length=20), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('email'),
+        sa.UniqueConstraint('username')
+        )
+
+
+def downgrade():
+    op.drop_table('users')
+    op.drop_table('migrants')
+    op.drop_table('analytics_rollups')
@@ -0,0 +1,30 @@
+"""add migrants cohort index
+
+Contact tracing groups workers by work district, employer and living
+conditions; this index answers "everyone in the same camp" with a range
+read instead of a scan of migrants. The contact_edges table itself is
+derived from contact_tracing_info and is created by `flask init-db`.
+
+Revision ID: 5e8b0c4d2a17
+Revises: f2d9b4c6a8e3
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e8b0c4d2a17'
+down_revision = 'f2d9b4c6a8e3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_migrants_cohort', 'migrants', ['work_location_district', 'employer_name', 'living_conditions'],
+                    unique=False, if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_migrants_cohort', table_name='migrants', if_exists=True)
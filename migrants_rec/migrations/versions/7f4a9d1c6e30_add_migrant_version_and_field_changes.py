@@ -0,0 +1,48 @@
+"""add migrant version and field changes
+
+migrants.version is the optimistic-locking counter checked by every ORM
+update; existing rows start at 1. field_changes is the per-field audit
+trail. Databases where `flask init-db` already created them are left as
+they are.
+
+Revision ID: 7f4a9d1c6e30
+Revises: 5e8b0c4d2a17
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7f4a9d1c6e30'
+down_revision = '5e8b0c4d2a17'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if 'version' not in {column['name'] for column in inspector.get_columns('migrants')}:
+        op.add_column('migrants', sa.Column('version', sa.Integer(), nullable=False, server_default='1'))
+    if 'field_changes' in inspector.get_table_names():
+        return  # Already created by `flask init-db`
+    op.create_table('field_changes',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('migrant_id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('field', sa.String(length=50), nullable=False),
+    sa.Column('old_value', sa.Text(), nullable=True),
+    sa.Column('new_value', sa.Text(), nullable=True),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('changed_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_field_changes_migrant_version', 'field_changes', ['migrant_id', 'version'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_field_changes_migrant_version', table_name='field_changes')
+    op.drop_table('field_changes')
+    with op.batch_alter_table('migrants') as batch_op:
+        batch_op.drop_column('version')
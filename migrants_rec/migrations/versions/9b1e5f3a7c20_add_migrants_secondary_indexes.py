@@ -0,0 +1,41 @@
+"""add secondary indexes on migrants
+
+Indexes the columns the app filters, groups and sorts by. Existing
+databases only ever had the primary key and the aadhaar_passport unique
+index, because db.create_all() never adds indexes to an existing table.
+
+Revision ID: 9b1e5f3a7c20
+Revises: 4d2c62489d25
+Create Date: 2026-10-18 14:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9b1e5f3a7c20'
+down_revision = '4d2c62489d25'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_migrants_name', ['name']),
+    ('ix_migrants_contact', ['contact']),
+    ('ix_migrants_age', ['age']),
+    ('ix_migrants_nationality', ['nationality']),
+    ('ix_migrants_occupation', ['occupation']),
+    ('ix_migrants_health_condition', ['health_condition']),
+    ('ix_migrants_follow_up_date', ['follow_up_date']),
+    ('ix_migrants_gender_age', ['gender', 'age']),
+]
+
+
+def upgrade():
+    for name, columns in INDEXES:
+        op.create_index(name, 'migrants', columns, unique=False, if_not_exists=True)
+
+
+def downgrade():
+    for name, _ in reversed(INDEXES):
+        op.drop_index(name, table_name='migrants', if_exists=True)
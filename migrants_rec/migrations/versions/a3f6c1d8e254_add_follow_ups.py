@@ -0,0 +1,63 @@
+"""add follow ups
+
+follow_ups is the queue of outstanding follow-ups (see follow_ups.py),
+backfilled here from the migrants whose follow-up date is still ahead of
+their last checkup. follow_up_summaries is filled by the scheduler or
+`flask refresh-follow-ups`. Databases where `flask init-db` already
+created the tables are left as they are.
+
+Revision ID: a3f6c1d8e254
+Revises: 9b1e5f3a7c20
+Create Date: 2026-10-18 14:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3f6c1d8e254'
+down_revision = '9b1e5f3a7c20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+    if 'follow_up_summaries' not in existing:
+        op.create_table('follow_up_summaries',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('scope', sa.String(length=20), nullable=False),
+        sa.Column('value', sa.String(length=100), nullable=False),
+        sa.Column('overdue', sa.Integer(), nullable=False),
+        sa.Column('due_today', sa.Integer(), nullable=False),
+        sa.Column('due_this_week', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('day', 'scope', 'value')
+        )
+    if 'follow_ups' in existing:
+        return  # Already created (and backfilled) by `flask init-db`
+    op.create_table('follow_ups',
+    sa.Column('migrant_id', sa.Integer(), nullable=False),
+    sa.Column('due_date', sa.Date(), nullable=False),
+    sa.Column('healthcare_facility', sa.String(length=100), nullable=False),
+    sa.Column('work_location_district', sa.String(length=50), nullable=False),
+    sa.ForeignKeyConstraint(['migrant_id'], ['migrants.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('migrant_id')
+    )
+    op.create_index('ix_follow_ups_due', 'follow_ups', ['due_date', 'migrant_id'], unique=False)
+    op.create_index('ix_follow_ups_facility_due', 'follow_ups', ['healthcare_facility', 'due_date', 'migrant_id'], unique=False)
+    op.create_index('ix_follow_ups_district_due', 'follow_ups', ['work_location_district', 'due_date', 'migrant_id'], unique=False)
+    op.execute(
+        "INSERT INTO follow_ups (migrant_id, due_date, healthcare_facility, work_location_district) "
+        "SELECT id, follow_up_date, COALESCE(healthcare_facility, ''), COALESCE(work_location_district, '') "
+        "FROM migrants WHERE follow_up_date IS NOT NULL "
+        "AND (last_checkup IS NULL OR last_checkup < follow_up_date) ORDER BY id"
+    )
+
+
+def downgrade():
+    op.drop_index('ix_follow_ups_district_due', table_name='follow_ups')
+    op.drop_index('ix_follow_ups_facility_due', table_name='follow_ups')
+    op.drop_index('ix_follow_ups_due', table_name='follow_ups')
+    op.drop_table('follow_ups')
+    op.drop_table('follow_up_summaries')
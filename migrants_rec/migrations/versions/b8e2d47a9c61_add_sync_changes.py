@@ -0,0 +1,45 @@
+"""add sync changes
+
+sync_changes is the change log behind /sync (see sync.py); every existing
+migrant gets a sequence number here, as sync.ensure_built() would do.
+Databases where `flask init-db` already created the table are left as
+they are.
+
+Revision ID: b8e2d47a9c61
+Revises: a3f6c1d8e254
+Create Date: 2026-10-18 14:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b8e2d47a9c61'
+down_revision = 'a3f6c1d8e254'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if 'sync_changes' in sa.inspect(op.get_bind()).get_table_names():
+        return  # Already created (and backfilled) by `flask init-db`
+    op.create_table('sync_changes',
+    sa.Column('seq', sa.Integer(), nullable=False),
+    sa.Column('migrant_id', sa.Integer(), nullable=False),
+    sa.Column('district', sa.String(length=50), nullable=False),
+    sa.Column('deleted', sa.Boolean(), nullable=False),
+    sa.PrimaryKeyConstraint('seq'),
+    sa.UniqueConstraint('migrant_id', 'district', name='uq_sync_changes_migrant_district'),
+    sqlite_autoincrement=True
+    )
+    op.create_index('ix_sync_changes_district_seq', 'sync_changes', ['district', 'seq'], unique=False)
+    op.execute(
+        "INSERT INTO sync_changes (migrant_id, district, deleted) "
+        "SELECT id, COALESCE(work_location_district, ''), false FROM migrants ORDER BY id"
+    )
+
+
+def downgrade():
+    op.drop_index('ix_sync_changes_district_seq', table_name='sync_changes')
+    op.drop_table('sync_changes')
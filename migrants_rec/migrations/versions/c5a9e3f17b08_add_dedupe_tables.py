@@ -0,0 +1,58 @@
+"""add dedupe tables
+
+dedupe_keys holds the blocking keys of every migrant (see dedupe.py) and
+duplicate_candidates the pairs awaiting review. The keys are normalised in
+Python, so the backfill calls dedupe.backfill(); candidates are found by
+`flask find-duplicates` or the scan job. Databases where `flask init-db`
+already created the tables are left as they are.
+
+Revision ID: c5a9e3f17b08
+Revises: b8e2d47a9c61
+Create Date: 2026-10-18 14:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from dedupe import backfill
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5a9e3f17b08'
+down_revision = 'b8e2d47a9c61'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+    if 'dedupe_keys' not in existing:
+        op.create_table('dedupe_keys',
+        sa.Column('kind', sa.String(length=10), nullable=False),
+        sa.Column('key', sa.String(length=120), nullable=False),
+        sa.Column('migrant_id', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('kind', 'key', 'migrant_id')
+        )
+        op.create_index('ix_dedupe_keys_migrant_id', 'dedupe_keys', ['migrant_id'], unique=False)
+        backfill(op.get_bind())
+    if 'duplicate_candidates' not in existing:
+        op.create_table('duplicate_candidates',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('migrant_id', sa.Integer(), nullable=False),
+        sa.Column('other_id', sa.Integer(), nullable=False),
+        sa.Column('score', sa.Float(), nullable=False),
+        sa.Column('reasons', sa.String(length=200), nullable=False),
+        sa.Column('status', sa.String(length=10), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('migrant_id', 'other_id', name='uq_duplicate_candidates_pair')
+        )
+        op.create_index('ix_duplicate_candidates_status_score', 'duplicate_candidates', ['status', 'score', 'id'], unique=False)
+        op.create_index('ix_duplicate_candidates_other_id', 'duplicate_candidates', ['other_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_duplicate_candidates_other_id', table_name='duplicate_candidates')
+    op.drop_index('ix_duplicate_candidates_status_score', table_name='duplicate_candidates')
+    op.drop_table('duplicate_candidates')
+    op.drop_index('ix_dedupe_keys_migrant_id', table_name='dedupe_keys')
+    op.drop_table('dedupe_keys')
@@ -0,0 +1,54 @@
+"""add jobs
+
+jobs is the background job queue read by `flask jobs-worker` (see
+jobs.py). Databases where `flask init-db` already created the table are
+left as they are.
+
+Revision ID: d1b7f5a2c396
+Revises: c5a9e3f17b08
+Create Date: 2026-10-18 14:50:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd1b7f5a2c396'
+down_revision = 'c5a9e3f17b08'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if 'jobs' in sa.inspect(op.get_bind()).get_table_names():
+        return  # Already created by `flask init-db`
+    op.create_table('jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(length=30), nullable=False),
+    sa.Column('params', sa.Text(), nullable=False),
+    sa.Column('status', sa.String(length=10), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('progress', sa.Integer(), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=True),
+    sa.Column('message', sa.String(length=255), nullable=True),
+    sa.Column('result_file', sa.String(length=100), nullable=True),
+    sa.Column('result_name', sa.String(length=100), nullable=True),
+    sa.Column('result_mimetype', sa.String(length=100), nullable=True),
+    sa.Column('worker', sa.String(length=60), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('heartbeat_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.Column('expires_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_jobs_status_id', 'jobs', ['status', 'id'], unique=False)
+    op.create_index('ix_jobs_expires_at', 'jobs', ['expires_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_jobs_expires_at', table_name='jobs')
+    op.drop_index('ix_jobs_status_id', table_name='jobs')
+    op.drop_table('jobs')
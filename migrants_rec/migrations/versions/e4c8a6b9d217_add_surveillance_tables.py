@@ -0,0 +1,53 @@
+"""add surveillance tables
+
+surveillance_cases records each coded condition once per migrant and
+surveillance_counts the cases per day and place (see surveillance.py).
+Conditions are coded in Python, so the backfill calls
+surveillance.backfill(). Databases where `flask init-db` already created
+the tables are left as they are.
+
+Revision ID: e4c8a6b9d217
+Revises: 3c7d2a91f4b6
+Create Date: 2026-10-18 15:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from surveillance import backfill
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4c8a6b9d217'
+down_revision = '3c7d2a91f4b6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+    if 'surveillance_cases' in existing:
+        return  # Already created (and backfilled) by `flask init-db`
+    op.create_table('surveillance_cases',
+    sa.Column('migrant_id', sa.Integer(), nullable=False),
+    sa.Column('condition', sa.String(length=30), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('district', sa.String(length=50), nullable=False),
+    sa.Column('pincode', sa.String(length=10), nullable=False),
+    sa.PrimaryKeyConstraint('migrant_id', 'condition')
+    )
+    if 'surveillance_counts' not in existing:
+        op.create_table('surveillance_counts',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('condition', sa.String(length=30), nullable=False),
+        sa.Column('district', sa.String(length=50), nullable=False),
+        sa.Column('pincode', sa.String(length=10), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('day', 'condition', 'district', 'pincode')
+        )
+    backfill(op.get_bind())
+
+
+def downgrade():
+    op.drop_table('surveillance_counts')
+    op.drop_table('surveillance_cases')
@@ -0,0 +1,40 @@
+"""add contact edges
+
+contact_edges is the contact graph read from contact_tracing_info (see
+contact_tracing.py). References are parsed in Python, so the backfill
+calls contact_tracing.backfill(). Databases where `flask init-db` already
+created the table are left as they are.
+
+Revision ID: f2d9b4c6a8e3
+Revises: e4c8a6b9d217
+Create Date: 2026-10-18 15:50:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from contact_tracing import backfill
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2d9b4c6a8e3'
+down_revision = 'e4c8a6b9d217'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if 'contact_edges' in sa.inspect(op.get_bind()).get_table_names():
+        return  # Already created (and backfilled) by `flask init-db`
+    op.create_table('contact_edges',
+    sa.Column('migrant_id', sa.Integer(), nullable=False),
+    sa.Column('contact_key', sa.String(length=30), nullable=False),
+    sa.PrimaryKeyConstraint('migrant_id', 'contact_key')
+    )
+    op.create_index('ix_contact_edges_contact_key', 'contact_edges', ['contact_key', 'migrant_id'], unique=False)
+    backfill(op.get_bind())
+
+
+def downgrade():
+    op.drop_index('ix_contact_edges_contact_key', table_name='contact_edges')
+    op.drop_table('contact_edges')
@@ -1,10 +1,44 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
+from sqlalchemy import event
+from sqlalchemy.orm import deferred, undefer_group
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import date
+from blinker import Namespace
 
 db = SQLAlchemy()
 
+# Core-level bulk writes skip ORM flush events; subsystems that mirror
+# migrant rows (search index, rollups, ...) also listen to this signal.
+# Receivers get (connection, rows) where each row is a dict of column values including "id".
+_signals = Namespace()
+migrants_bulk_inserted = _signals.signal("migrants-bulk-inserted")
+
+
+def init_engine(app):
+    """Apply SQLITE_PRAGMAS from ``app.config`` to every new SQLite connection.
+
+    Must run inside an app context before the first query, so that pooled
+    connections are all configured the same way.
+    """
+    pragmas = app.config.get("SQLITE_PRAGMAS") or {}
+    if db.engine.dialect.name != "sqlite" or not pragmas:
+        return
+
+    @event.listens_for(db.engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+        cursor.close()
+
+
+def compute_bmi(height, weight):
+    """Return BMI rounded to 2 places, or None if height/weight are missing."""
+    if height and weight and height > 0:
+        return round(weight / ((height/100) ** 2), 2)
+    return None
+
 class User(db.Model, UserMixin):
     __tablename__ = "users"
     id = db.Column(db.Integer, primary_key=True)
@@ -27,69 +61,307 @@ class User(db.Model, UserMixin):
 
 class Migrant(db.Model):
     __tablename__ = "migrants"
+
+    # Columns shown on the index listing; everything else sits in deferred
+    # groups that load on first access or via with_groups() on detail pages.
+    LIST_COLUMNS = ("id", "name", "age", "gender", "contact", "health_condition")
+    COLUMN_GROUPS = ("personal", "work", "history", "current_status", "visit", "surveillance")
+
+    # Single-column indexes are declared with index=True on the columns below
+    __table_args__ = (
+        db.Index("ix_migrants_gender_age", "gender", "age"),
+        db.Index("ix_migrants_cohort", "work_location_district", "employer_name", "living_conditions"),
+    )
+
     # 1. Personal Information
     id = db.Column(db.Integer, primary_key=True)
-    name = db.Column(db.String(100), nullable=False)
-    date_of_birth = db.Column(db.Date, nullable=True) 
-    age = db.Column(db.Integer, nullable=False)
+    name = db.Column(db.String(100), nullable=False, index=True)
+    date_of_birth = deferred(db.Column(db.Date, nullable=True), group="personal")
+    age = db.Column(db.Integer, nullable=False, index=True)
     gender = db.Column(db.String(10), nullable=False)
-    nationality = db.Column(db.String(50), nullable=True)
-    state_of_origin = db.Column(db.String(50), nullable=True)
-    contact = db.Column(db.String(20), nullable=False)
-    emergency_contact_name = db.Column(db.String(100), nullable=True)
-    emergency_contact_number = db.Column(db.String(20), nullable=True)
-    aadhaar_passport = db.Column(db.String(50), nullable=True, unique=True)
-    preferred_language = db.Column(db.String(30), nullable=True)
-    literacy_level = db.Column(db.String(30), nullable=True)
-    data_sharing_consent = db.Column(db.Boolean, default=False)
+    nationality = deferred(db.Column(db.String(50), nullable=True, index=True), group="personal", active_history=True)
+    state_of_origin = deferred(db.Column(db.String(50), nullable=True), group="personal")
+    contact = db.Column(db.String(20), nullable=False, index=True)
+    emergency_contact_name = deferred(db.Column(db.String(100), nullable=True), group="personal")
+    emergency_contact_number = deferred(db.Column(db.String(20), nullable=True), group="personal")
+    aadhaar_passport = deferred(db.Column(db.String(50), nullable=True, unique=True), group="personal")
+    preferred_language = deferred(db.Column(db.String(30), nullable=True), group="personal")
+    literacy_level = deferred(db.Column(db.String(30), nullable=True), group="personal")
+    data_sharing_consent = deferred(db.Column(db.Boolean, default=False), group="personal")
     
     # 2. Work Information
-    occupation = db.Column(db.String(100), nullable=True)
-    employer_name = db.Column(db.String(100), nullable=True)
-    employer_contact = db.Column(db.String(20), nullable=True)
-    work_location_district = db.Column(db.String(50), nullable=True)
-    work_location_pincode = db.Column(db.String(10), nullable=True)
-    duration_of_stay = db.Column(db.String(50), nullable=True)
-    living_conditions = db.Column(db.String(50), nullable=True)
+    occupation = deferred(db.Column(db.String(100), nullable=True, index=True), group="work", active_history=True)
+    employer_name = deferred(db.Column(db.String(100), nullable=True), group="work")
+    employer_contact = deferred(db.Column(db.String(20), nullable=True), group="work")
+    work_location_district = deferred(db.Column(db.String(50), nullable=True), group="work")
+    work_location_pincode = deferred(db.Column(db.String(10), nullable=True), group="work")
+    duration_of_stay = deferred(db.Column(db.String(50), nullable=True), group="work")
+    living_conditions = deferred(db.Column(db.String(50), nullable=True), group="work")
     
     # 3. Health History
-    allergies = db.Column(db.Text, nullable=True)
-    past_medical_conditions = db.Column(db.Text, nullable=True)
-    past_surgical_history = db.Column(db.Text, nullable=True)
-    family_history = db.Column(db.Text, nullable=True)
-    immunization_status = db.Column(db.Text, nullable=True)
+    allergies = deferred(db.Column(db.Text, nullable=True), group="history")
+    past_medical_conditions = deferred(db.Column(db.Text, nullable=True), group="history")
+    past_surgical_history = deferred(db.Column(db.Text, nullable=True), group="history")
+    family_history = deferred(db.Column(db.Text, nullable=True), group="history")
+    immunization_status = deferred(db.Column(db.Text, nullable=True), group="history")
     
     # 4. Current Health Status
-    height = db.Column(db.Float, nullable=True)
-    weight = db.Column(db.Float, nullable=True)
-    bmi = db.Column(db.Float, nullable=True)
+    height = deferred(db.Column(db.Float, nullable=True), group="current_status")
+    weight = deferred(db.Column(db.Float, nullable=True), group="current_status")
+    bmi = deferred(db.Column(db.Float, nullable=True), group="current_status")
     blood_group = db.Column(db.String(5), nullable=True)
-    vital_signs = db.Column(db.Text, nullable=True)
-    current_medications = db.Column(db.Text, nullable=True)
-    ongoing_treatment = db.Column(db.Text, nullable=True)
-    infectious_disease_screening = db.Column(db.Text, nullable=True)
-    health_condition = db.Column(db.String(200), nullable=True)
+    vital_signs = deferred(db.Column(db.Text, nullable=True), group="current_status")
+    current_medications = deferred(db.Column(db.Text, nullable=True), group="current_status")
+    ongoing_treatment = deferred(db.Column(db.Text, nullable=True), group="current_status")
+    infectious_disease_screening = deferred(db.Column(db.Text, nullable=True), group="current_status")
+    health_condition = db.Column(db.String(200), nullable=True, index=True)
     
     # 5. Visit & Medical Records
-    last_checkup = db.Column(db.Date, nullable=True)
+    last_checkup = deferred(db.Column(db.Date, nullable=True), group="visit")
+    healthcare_facility = deferred(db.Column(db.String(100), nullable=True), group="visit")
+    doctor_name = deferred(db.Column(db.String(100), nullable=True), group="visit")
+    symptoms = deferred(db.Column(db.Text, nullable=True), group="visit")
+    diagnosis = deferred(db.Column(db.Text, nullable=True), group="visit")
+    prescriptions = deferred(db.Column(db.Text, nullable=True), group="visit")
+    lab_results = deferred(db.Column(db.Text, nullable=True), group="visit")
+    vaccination_records = deferred(db.Column(db.Text, nullable=True), group="visit")
+    
+    # 7. Public Health / Surveillance
+    disease_alerts = deferred(db.Column(db.Text, nullable=True), group="surveillance")
+    contact_tracing_info = deferred(db.Column(db.Text, nullable=True), group="surveillance")
+    referral_notes = deferred(db.Column(db.Text, nullable=True), group="surveillance")
+    follow_up_date = deferred(db.Column(db.Date, nullable=True, index=True), group="surveillance")
+    qr_code = db.Column(db.String(255), nullable=True)
+
+    # Bumped by every ORM update and checked in its WHERE clause (optimistic locking, see audit.py)
+    version = db.Column(db.Integer, nullable=False, default=1, server_default="1")
+    __mapper_args__ = {"version_id_col": version}
+
+    @classmethod
+    def list_query(cls):
+        """Query for lightweight (id, name, age, ...) rows of LIST_COLUMNS, no model hydration."""
+        return db.session.query(*[getattr(cls, column) for column in cls.LIST_COLUMNS])
+
+    @classmethod
+    def with_groups(cls, *groups):
+        """Migrant query that loads the given deferred groups (all of them by default) up front."""
+        return cls.query.options(*[undefer_group(group) for group in groups or cls.COLUMN_GROUPS])
+
+    def calculate_bmi(self):
+        """Calculate BMI if height and weight are available."""
+        bmi = compute_bmi(self.height, self.weight)
+        if bmi is not None:
+            self.bmi = bmi
+        return bmi
+
+class AnalyticsRollup(db.Model):
+    """Pre-aggregated migrant counts for one analytics dimension value."""
+    __tablename__ = "analytics_rollups"
+    dimension = db.Column(db.String(30), primary_key=True)
+    value = db.Column(db.String(200), primary_key=True)  # "" stands for a missing value
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<AnalyticsRollup {self.dimension}={self.value!r}: {self.count}>"
+
+
+class Visit(db.Model):
+    """One clinic visit of a migrant. The visit columns on Migrant hold the latest one (see visits.py)."""
+    __tablename__ = "visits"
+    __table_args__ = (
+        db.Index("ix_visits_migrant_date", "migrant_id", "visit_date"),
+        db.Index("ix_visits_facility_date", "healthcare_facility", "visit_date"),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    migrant_id = db.Column(db.Integer, db.ForeignKey("migrants.id", ondelete="CASCADE"), nullable=False)
+    visit_date = db.Column(db.Date, nullable=False)
     healthcare_facility = db.Column(db.String(100), nullable=True)
     doctor_name = db.Column(db.String(100), nullable=True)
+    vital_signs = db.Column(db.Text, nullable=True)
     symptoms = db.Column(db.Text, nullable=True)
     diagnosis = db.Column(db.Text, nullable=True)
     prescriptions = db.Column(db.Text, nullable=True)
     lab_results = db.Column(db.Text, nullable=True)
-    vaccination_records = db.Column(db.Text, nullable=True)
-    
-    # 7. Public Health / Surveillance
-    disease_alerts = db.Column(db.Text, nullable=True)
-    contact_tracing_info = db.Column(db.Text, nullable=True)
-    referral_notes = db.Column(db.Text, nullable=True)
-    follow_up_date = db.Column(db.Date, nullable=True)
-    qr_code = db.Column(db.String(255), nullable=True)
 
-    def calculate_bmi(self):
-        """Calculate BMI if height and weight are available."""
-        if self.height and self.weight and self.height > 0:
-            self.bmi = round(self.weight / ((self.height/100) ** 2), 2)
-            return self.bmi
-        return None
\ No newline at end of file
+    def __repr__(self):
+        return f"<Visit {self.migrant_id} {self.visit_date}>"
+
+
+class SurveillanceCase(db.Model):
+    """A coded condition counted for a migrant: the day and place it was first recorded (see surveillance.py)."""
+    __tablename__ = "surveillance_cases"
+    migrant_id = db.Column(db.Integer, primary_key=True)
+    condition = db.Column(db.String(30), primary_key=True)
+    day = db.Column(db.Date, nullable=False)
+    district = db.Column(db.String(50), nullable=False, default="")
+    pincode = db.Column(db.String(10), nullable=False, default="")
+
+    def __repr__(self):
+        return f"<SurveillanceCase {self.migrant_id} {self.condition} {self.day}>"
+
+
+class SurveillanceCount(db.Model):
+    """Cases of one condition first recorded on one day in one district and pincode."""
+    __tablename__ = "surveillance_counts"
+    day = db.Column(db.Date, primary_key=True)
+    condition = db.Column(db.String(30), primary_key=True)
+    district = db.Column(db.String(50), primary_key=True)
+    pincode = db.Column(db.String(10), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<SurveillanceCount {self.day} {self.condition} {self.district}/{self.pincode}={self.count}>"
+
+
+class ContactEdge(db.Model):
+    """A contact named in a migrant's contact_tracing_info (see contact_tracing.py).
+
+    ``contact_key`` is "id:<migrant id>" or "phone:<last ten digits>"; phones
+    are resolved to migrants when the graph is traversed, so a contact
+    registered later is linked without touching this row.
+    """
+    __tablename__ = "contact_edges"
+    __table_args__ = (
+        db.Index("ix_contact_edges_contact_key", "contact_key", "migrant_id"),
+    )
+    migrant_id = db.Column(db.Integer, primary_key=True)
+    contact_key = db.Column(db.String(30), primary_key=True)
+
+    def __repr__(self):
+        return f"<ContactEdge {self.migrant_id} -> {self.contact_key}>"
+
+
+class FieldChange(db.Model):
+    """One field of a migrant changed by one update: the audit trail (see audit.py)."""
+    __tablename__ = "field_changes"
+    __table_args__ = (
+        db.Index("ix_field_changes_migrant_version", "migrant_id", "version"),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    migrant_id = db.Column(db.Integer, nullable=False)
+    version = db.Column(db.Integer, nullable=False)  # The migrant's version after the change
+    field = db.Column(db.String(50), nullable=False)
+    old_value = db.Column(db.Text, nullable=True)
+    new_value = db.Column(db.Text, nullable=True)
+    user_id = db.Column(db.Integer, nullable=True)  # None for changes made outside a login (CLI, jobs)
+    changed_at = db.Column(db.DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"<FieldChange {self.migrant_id} v{self.version} {self.field}>"
+
+
+class FollowUp(db.Model):
+    """One migrant whose follow-up is still outstanding (see follow_ups.py).
+
+    Facility and district are copied from the migrant so that "who is due
+    at X between two dates" is a range scan on one index.
+    """
+    __tablename__ = "follow_ups"
+    __table_args__ = (
+        db.Index("ix_follow_ups_due", "due_date", "migrant_id"),
+        db.Index("ix_follow_ups_facility_due", "healthcare_facility", "due_date", "migrant_id"),
+        db.Index("ix_follow_ups_district_due", "work_location_district", "due_date", "migrant_id"),
+    )
+    migrant_id = db.Column(db.Integer, db.ForeignKey("migrants.id", ondelete="CASCADE"), primary_key=True)
+    due_date = db.Column(db.Date, nullable=False)
+    healthcare_facility = db.Column(db.String(100), nullable=False, default="")  # "" stands for a missing value
+    work_location_district = db.Column(db.String(50), nullable=False, default="")
+
+    def __repr__(self):
+        return f"<FollowUp migrant={self.migrant_id} due={self.due_date}>"
+
+
+class FollowUpSummary(db.Model):
+    """Due and overdue counts for one facility or district, materialised once a day."""
+    __tablename__ = "follow_up_summaries"
+    day = db.Column(db.Date, primary_key=True)
+    scope = db.Column(db.String(20), primary_key=True)  # "facility" or "district"
+    value = db.Column(db.String(100), primary_key=True)  # "" stands for a missing value
+    overdue = db.Column(db.Integer, nullable=False, default=0)
+    due_today = db.Column(db.Integer, nullable=False, default=0)
+    due_this_week = db.Column(db.Integer, nullable=False, default=0)  # Today and the six days after
+
+    def __repr__(self):
+        return f"<FollowUpSummary {self.day} {self.scope}={self.value!r}>"
+
+
+class SyncChange(db.Model):
+    """Latest change to one migrant, numbered by a sequence that only grows (see sync.py).
+
+    A record has one live row, replaced on every change, so ``seq > n``
+    returns each record changed since ``n`` once. When a record leaves a
+    district (or is deleted) a ``deleted`` row for that district tells the
+    district's offline copies to drop it. AUTOINCREMENT stops SQLite from
+    reusing the sequence numbers of replaced rows.
+    """
+    __tablename__ = "sync_changes"
+    __table_args__ = (
+        db.UniqueConstraint("migrant_id", "district", name="uq_sync_changes_migrant_district"),
+        db.Index("ix_sync_changes_district_seq", "district", "seq"),
+        {"sqlite_autoincrement": True},
+    )
+    seq = db.Column(db.Integer, primary_key=True)
+    migrant_id = db.Column(db.Integer, nullable=False)
+    district = db.Column(db.String(50), nullable=False, default="")  # work_location_district; "" if missing
+    deleted = db.Column(db.Boolean, nullable=False, default=False)
+
+    def __repr__(self):
+        return f"<SyncChange {self.seq} migrant={self.migrant_id}{' deleted' if self.deleted else ''}>"
+
+
+class DedupeKey(db.Model):
+    """One blocking key of a migrant (see dedupe.py); records sharing a key are compared."""
+    __tablename__ = "dedupe_keys"
+    kind = db.Column(db.String(10), primary_key=True)  # "name", "phone", "dob" or "origin"
+    key = db.Column(db.String(120), primary_key=True)
+    migrant_id = db.Column(db.Integer, primary_key=True, index=True)
+
+    def __repr__(self):
+        return f"<DedupeKey {self.kind}={self.key!r} migrant={self.migrant_id}>"
+
+
+class DuplicateCandidate(db.Model):
+    """A pair of migrants that probably describe the same person, awaiting review."""
+    __tablename__ = "duplicate_candidates"
+    __table_args__ = (
+        db.UniqueConstraint("migrant_id", "other_id", name="uq_duplicate_candidates_pair"),
+        db.Index("ix_duplicate_candidates_status_score", "status", "score", "id"),
+        db.Index("ix_duplicate_candidates_other_id", "other_id"),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    migrant_id = db.Column(db.Integer, nullable=False)  # The lower id of the pair
+    other_id = db.Column(db.Integer, nullable=False)
+    score = db.Column(db.Float, nullable=False)
+    reasons = db.Column(db.String(200), nullable=False, default="")
+    status = db.Column(db.String(10), nullable=False, default="open")  # "open", "dismissed" or "merged"
+
+    def __repr__(self):
+        return f"<DuplicateCandidate {self.migrant_id}~{self.other_id} {self.score:.2f} {self.status}>"
+
+
+class Job(db.Model):
+    """A unit of background work (export, ID cards, ...) run by `flask jobs-worker` (see jobs.py)."""
+    __tablename__ = "jobs"
+    __table_args__ = (
+        db.Index("ix_jobs_status_id", "status", "id"),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(30), nullable=False)
+    params = db.Column(db.Text, nullable=False, default="{}")  # JSON
+    status = db.Column(db.String(10), nullable=False, default="queued")  # queued, running, done, failed or expired
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    progress = db.Column(db.Integer, nullable=False, default=0)
+    total = db.Column(db.Integer, nullable=True)  # None while the amount of work is unknown
+    message = db.Column(db.String(255), nullable=True)
+    result_file = db.Column(db.String(100), nullable=True)  # Name inside JOB_RESULTS_DIR
+    result_name = db.Column(db.String(100), nullable=True)  # Download file name
+    result_mimetype = db.Column(db.String(100), nullable=True)
+    worker = db.Column(db.String(60), nullable=True)  # host:pid of the process running it
+    created_at = db.Column(db.DateTime, nullable=False)
+    started_at = db.Column(db.DateTime, nullable=True)
+    heartbeat_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    expires_at = db.Column(db.DateTime, nullable=True, index=True)
+
+    def __repr__(self):
+        return f"<Job {self.id} {self.kind} {self.status}>"
@@ -0,0 +1,70 @@
+"""Keyset (cursor) pagination helpers for the Migrant Health Records application."""
+
+from sqlalchemy import tuple_
+
+
+class KeysetPage:
+    """One page of results plus the cursors needed to reach its neighbours."""
+
+    def __init__(self, items, per_page, next_cursor=None, prev_cursor=None):
+        self.items = items
+        self.per_page = per_page
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self):
+        return self.prev_cursor is not None
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+def paginate_keyset(query, key_column, after=None, before=None, per_page=50, descending=True):
+    """Return a KeysetPage of ``query`` ordered by ``key_column``.
+
+    ``after`` continues past the last key of the previous page and ``before``
+    walks back from the first key of the current one. Each call is a bounded
+    range scan on ``key_column`` (normally the primary key) instead of an
+    OFFSET or a full load, so deep pages cost the same as the first one.
+
+    ``key_column`` may also be a tuple of columns (e.g. ``(due_date, id)``)
+    for a composite key; cursors are then tuples of the same length.
+    """
+    columns = tuple(key_column) if isinstance(key_column, (tuple, list)) else (key_column,)
+    key = tuple_(*columns) if len(columns) > 1 else columns[0]
+
+    def cursor(row):
+        values = tuple(getattr(row, column.key) for column in columns)
+        return values if len(columns) > 1 else values[0]
+
+    def bound(value):
+        return tuple_(*value) if len(columns) > 1 else value
+
+    forward = [column.desc() if descending else column.asc() for column in columns]
+    backward = [column.asc() if descending else column.desc() for column in columns]
+
+    if before is not None:
+        query = query.filter(key > bound(before) if descending else key < bound(before))
+        rows = query.order_by(*backward).limit(per_page + 1).all()
+        has_prev = len(rows) > per_page
+        rows = rows[:per_page][::-1]
+        has_next = True
+    else:
+        if after is not None:
+            query = query.filter(key < bound(after) if descending else key > bound(after))
+        rows = query.order_by(*forward).limit(per_page + 1).all()
+        has_next = len(rows) > per_page
+        rows = rows[:per_page]
+        has_prev = after is not None
+
+    next_cursor = cursor(rows[-1]) if rows and has_next else None
+    prev_cursor = cursor(rows[0]) if rows and has_prev else None
+    return KeysetPage(rows, per_page, next_cursor=next_cursor, prev_cursor=prev_cursor)
@@ -0,0 +1,35 @@
+"""QR code images for migrant records, served from the QR cache."""
+
+import io
+
+from flask import Blueprint, current_app, request, send_file, url_for
+from flask_login import login_required
+from sqlalchemy import update
+
+from models import db, Migrant
+from qr_cache import get_qr_cache, payload_key as qr_payload_key, qr_payload
+
+bp = Blueprint("qr", __name__)
+
+
+@bp.route("/qrcode/<int:migrant_id>")
+@login_required
+def get_migrant_qr(migrant_id):
+    migrant = Migrant.query.get_or_404(migrant_id)
+    view_url = url_for('records.view_migrant', migrant_id=migrant.id, _external=True)
+    qr_data = qr_payload(migrant, view_url)
+    key = qr_payload_key(qr_data)
+    if migrant.qr_code != key:
+        # Core UPDATE: recording the cache key is bookkeeping, not a record change
+        db.session.execute(update(Migrant.__table__).where(Migrant.__table__.c.id == migrant.id).values(qr_code=key))
+        db.session.commit()
+    if request.if_none_match.contains(key):
+        response = current_app.response_class(status=304)
+    else:
+        png = get_qr_cache().get_or_render(key, qr_data)
+        response = send_file(io.BytesIO(png), mimetype='image/png', max_age=current_app.config['QR_CACHE_MAX_AGE'])
+    response.set_etag(key)
+    response.cache_control.public = False
+    response.cache_control.private = True
+    response.cache_control.max_age = current_app.config['QR_CACHE_MAX_AGE']
+    return response
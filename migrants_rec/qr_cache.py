@@ -0,0 +1,147 @@
+"""Content-addressed cache for migrant QR code images."""
+
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+
+from flask import current_app, has_app_context
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+
+from models import Migrant
+
+# Migrant attributes encoded in the QR payload; changing any of them changes the cache key.
+ENCODED_FIELDS = ("id", "name", "age", "gender", "contact", "health_condition", "blood_group")
+
+
+def qr_payload(migrant, view_url):
+    """Build the text encoded in a migrant's QR code."""
+    qr_data = f"ID: {migrant.id}\nName: {migrant.name}\nAge: {migrant.age}\nGender: {migrant.gender}"
+    if migrant.contact:
+        qr_data += f"\nContact: {migrant.contact}"
+    if migrant.health_condition:
+        qr_data += f"\nHealth Status: {migrant.health_condition}"
+    if migrant.blood_group:
+        qr_data += f"\nBlood Group: {migrant.blood_group}"
+    qr_data += f"\n\nView full record: {view_url}"
+    return qr_data
+
+
+def payload_key(payload):
+    """Return the cache key (and HTTP ETag) for a QR payload."""
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+def render_png(payload):
+    """Encode ``payload`` as a QR code and return the PNG bytes."""
+    import qrcode  # Imported on first render: qrcode and Pillow are slow to load
+    buffer = io.BytesIO()
+    qrcode.make(payload).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+class QRCache:
+    """Two-level PNG cache: a bounded in-process LRU in front of an on-disk store.
+
+    Keys are hashes of the encoded payload, so an entry never goes stale; edits
+    simply produce a new key and the old entry is discarded or ages out.
+    """
+
+    def __init__(self, directory, max_items=512):
+        self.directory = directory
+        self.max_items = max_items
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.png")
+
+    def _remember(self, key, png):
+        with self._lock:
+            self._memory[key] = png
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_items:
+                self._memory.popitem(last=False)
+
+    def get(self, key):
+        """Return the cached PNG for ``key`` or None."""
+        with self._lock:
+            png = self._memory.get(key)
+            if png is not None:
+                self._memory.move_to_end(key)
+                return png
+        try:
+            with open(self._path(key), "rb") as f:
+                png = f.read()
+        except FileNotFoundError:
+            return None
+        self._remember(key, png)
+        return png
+
+    def put(self, key, png):
+        """Store ``png`` under ``key`` in memory and on disk."""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(png)
+        os.replace(tmp_path, path)  # Atomic, so concurrent readers never see half a file
+        self._remember(key, png)
+
+    def get_or_render(self, key, payload):
+        """Return the PNG for ``key``, rendering and storing ``payload`` on a miss."""
+        png = self.get(key)
+        if png is None:
+            png = render_png(payload)
+            self.put(key, png)
+        return png
+
+    def discard(self, key):
+        """Drop ``key`` from both cache levels; missing keys are ignored."""
+        if not key:
+            return
+        with self._lock:
+            self._memory.pop(key, None)
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+
+# Whatever path edits a record (web form, API, ...), a change to an encoded
+# field clears Migrant.qr_code and the old PNG is dropped once the edit commits.
+@event.listens_for(Migrant, "before_update")
+def _clear_stale_qr(mapper, connection, target):
+    state = inspect(target)
+    if target.qr_code and any(state.attrs[field].history.has_changes() for field in ENCODED_FIELDS):
+        session = object_session(target)
+        if session is not None:
+            session.info.setdefault("stale_qr_keys", set()).add(target.qr_code)
+        target.qr_code = None
+
+
+@event.listens_for(Session, "after_commit")
+def _discard_stale_qr(session):
+    stale = session.info.pop("stale_qr_keys", None)
+    if stale and has_app_context():
+        cache = current_app.extensions.get("qr_cache")
+        if cache is not None:
+            for key in stale:
+                cache.discard(key)
+
+
+@event.listens_for(Session, "after_rollback")
+def _keep_qr_on_rollback(session):
+    session.info.pop("stale_qr_keys", None)
+
+
+def get_qr_cache():
+    """Return the QRCache of the current app."""
+    return current_app.extensions["qr_cache"]
+
+
+def init_app(app):
+    """Attach a QRCache configured from ``app.config`` to ``app``."""
+    app.extensions["qr_cache"] = QRCache(app.config["QR_CACHE_DIR"], app.config["QR_CACHE_MAX_ITEMS"])
@@ -0,0 +1,292 @@
+"""Migrant record pages: listing and search, add, edit, view, import and export."""
+
+import io
+from datetime import date
+
+from flask import Blueprint, Response, abort, current_app, flash, redirect, render_template, request, stream_with_context, url_for
+from flask_login import current_user, login_required
+from sqlalchemy.orm.exc import StaleDataError
+
+from audit import as_text, changes_since
+from auth import admin_required
+from dedupe import find_candidates, record_candidates
+from exporter import FORMATS as EXPORT_FORMATS, MIMETYPES as EXPORT_MIMETYPES, resolve_columns, stream_export
+from forms import MigrantForm, SearchForm, ImportForm, JobForm
+from importer import guess_format, import_stream
+from jobs import submit
+from models import db, Migrant
+from pagination import KeysetPage, paginate_keyset
+from search import apply_search, ranked_ids
+from visits import history_page, next_page_url
+
+bp = Blueprint("records", __name__)
+
+# Columns the edit form may write; bmi is derived and version is managed by the mapper
+EDITABLE_COLUMNS = frozenset(Migrant.__table__.columns.keys()) - {"id", "bmi", "version", "qr_code"}
+
+
+@bp.route("/", methods=["GET", "POST"])
+@login_required
+def index():
+    search_form = SearchForm()
+    if request.method == 'POST' and search_form.validate_on_submit():
+        # Redirect searches to GET so the q/by filter survives in the paging links
+        return redirect(url_for('records.index', q=search_form.search_term.data or None, by=search_form.filter_by.data))
+    query = Migrant.list_query()
+    search_term = request.args.get('q')
+    filter_by = request.args.get('by')
+    per_page = request.args.get('per_page', type=int) or current_app.config['MIGRANTS_PER_PAGE']
+    per_page = max(1, min(per_page, current_app.config['MAX_MIGRANTS_PER_PAGE']))
+    ranked = bool(search_term) and filter_by != 'id'
+    if ranked:
+        page = ranked_page(search_term, filter_by, request.args.get('offset', type=int), per_page)
+    else:
+        if search_term:
+            query = apply_search(query, search_term, filter_by)
+        after, before = request.args.get('after', type=int), request.args.get('before', type=int)
+        page = paginate_keyset(query, Migrant.id, after=after, before=before, per_page=per_page)
+    return render_template(
+        "index.html", migrants=page.items, page=page, search_form=search_form,
+        search_term=search_term, filter_by=filter_by, ranked=ranked, job_form=JobForm()
+    )
+
+
+def ranked_page(term, by, offset, per_page):
+    """One page of search matches, best first, starting ``offset`` matches into the ranking.
+
+    Relevance order has no stable key to seek from, so ranked pages are
+    reached by ?offset= (the cursors are offsets) and each costs the matches
+    before it. Paging stops after the best MAX_SEARCH_RESULTS matches.
+    """
+    limit = current_app.config['MAX_SEARCH_RESULTS']
+    start = max(0, offset or 0)
+    if start >= limit:
+        start = max(0, limit - per_page)
+    count = min(per_page, limit - start)
+    ids = ranked_ids(term, by, count + 1, offset=start)
+    has_next = len(ids) > count and start + count < limit
+    ids = ids[:count]
+    rows = {row.id: row for row in Migrant.list_query().filter(Migrant.id.in_(ids))} if ids else {}
+    return KeysetPage([rows[i] for i in ids if i in rows], per_page,
+                      next_cursor=start + per_page if has_next else None,
+                      prev_cursor=max(0, start - per_page) if start else None)
+
+
+# Add route (fixed to use WTForms data directly)
+@bp.route("/add", methods=["GET", "POST"])
+@login_required
+def add_migrant():
+    form = MigrantForm()
+    if form.validate_on_submit():
+        duplicates = find_candidates(form.data)
+        if duplicates and not form.confirm_not_duplicate.data:
+            flash("This person may already be registered. Check the records below before saving.", "warning")
+            return render_template("add_migrant.html", form=form, duplicates=duplicates, title="Add Migrant")
+        try:
+            # Data conversion is handled safely by WTForms FloatField/DateField now
+            migrant = Migrant(
+                name=form.name.data,
+                age=form.age.data,
+                gender=form.gender.data,
+                date_of_birth=form.date_of_birth.data,
+                nationality=form.nationality.data,
+                state_of_origin=form.state_of_origin.data,
+                contact=form.contact.data,
+                emergency_contact_name=form.emergency_contact_name.data,
+                emergency_contact_number=form.emergency_contact_number.data,
+                aadhaar_passport=form.aadhaar_passport.data,
+                preferred_language=form.preferred_language.data,
+                literacy_level=form.literacy_level.data,
+                data_sharing_consent=form.data_sharing_consent.data, # Boolean field data is boolean
+                occupation=form.occupation.data,
+                employer_name=form.employer_name.data,
+                employer_contact=form.employer_contact.data,
+                work_location_district=form.work_location_district.data,
+                work_location_pincode=form.work_location_pincode.data,
+                duration_of_stay=form.duration_of_stay.data,
+                living_conditions=form.living_conditions.data,
+                allergies=form.allergies.data,
+                past_medical_conditions=form.past_medical_conditions.data,
+                past_surgical_history=form.past_surgical_history.data,
+                family_history=form.family_history.data,
+                immunization_status=form.immunization_status.data,
+                height=form.height.data, # FloatField gives None/Float
+                weight=form.weight.data, # FloatField gives None/Float
+                blood_group=form.blood_group.data,
+                vital_signs=form.vital_signs.data,
+                current_medications=form.current_medications.data,
+                ongoing_treatment=form.ongoing_treatment.data,
+                infectious_disease_screening=form.infectious_disease_screening.data,
+                health_condition=form.health_condition.data,
+                last_checkup=form.last_checkup.data,
+                healthcare_facility=form.healthcare_facility.data,
+                doctor_name=form.doctor_name.data,
+                symptoms=form.symptoms.data,
+                diagnosis=form.diagnosis.data,
+                prescriptions=form.prescriptions.data,
+                lab_results=form.lab_results.data,
+                vaccination_records=form.vaccination_records.data,
+                disease_alerts=form.disease_alerts.data,
+                contact_tracing_info=form.contact_tracing_info.data,
+                referral_notes=form.referral_notes.data,
+                follow_up_date=form.follow_up_date.data,
+            )
+            if migrant.height and migrant.weight:
+                migrant.calculate_bmi()
+            db.session.add(migrant)
+            db.session.flush()
+            record_candidates(migrant.id, duplicates)  # Saved anyway; still listed for review
+            db.session.commit()
+            flash("Migrant record added successfully!", "success")
+            return redirect(url_for("records.index"))
+        except Exception as e:
+            db.session.rollback()
+            flash(f"Error adding migrant record: {str(e)}", "danger")
+            # print(e) # You can uncomment this line to debug specific SQL/DB errors
+            
+    return render_template("add_migrant.html", form=form, title="Add Migrant")
+
+
+def form_changes(form, migrant):
+    """{column: value} for the record columns the form sent with a value different from the saved one.
+
+    Only fields the page sent are compared: the edit page renders a subset
+    of MigrantForm, and a missing field must not blank the saved value.
+    """
+    changes = {}
+    for name, field in form._fields.items():
+        if name not in EDITABLE_COLUMNS or name not in request.form:
+            continue
+        if as_text(field.data) != as_text(getattr(migrant, name)):
+            changes[name] = field.data
+    return changes
+
+
+def merge_conflicts(form, migrant, base_version):
+    """Line up the edits saved since ``base_version`` with this form's values.
+
+    A field only someone else changed takes their value in the form; a field
+    both changed keeps ours and is flagged. Returns one dict per field the
+    others changed, for the conflict view.
+    """
+    theirs = {}
+    for change in changes_since(migrant.id, base_version):
+        entry = theirs.setdefault(change.field, {"field": change.field, "base": change.old_value})
+        entry.update(saved=change.new_value, username=change.username, changed_at=change.changed_at)
+    conflicts = []
+    for name, entry in theirs.items():
+        field = form._fields.get(name)
+        sent = field is not None and name in request.form
+        mine = as_text(field.data) if sent else None
+        if sent and mine == entry["base"]:
+            field.data = getattr(migrant, name)  # Untouched here: keep their value
+        conflicts.append({
+            **entry, "label": field.label.text if field is not None else name, "mine": mine,
+            "conflict": sent and mine != entry["base"] and mine != entry["saved"],
+        })
+    return conflicts
+
+
+@bp.route("/edit/<int:migrant_id>", methods=["GET", "POST"])
+@login_required
+def edit_migrant(migrant_id):
+    """Edit a record, writing only the fields that changed.
+
+    The form carries the version the record had when it was opened. If
+    someone saved the record since, the form comes back with their edits
+    merged in and the fields both of you changed flagged, instead of
+    silently overwriting them.
+    """
+    migrant = Migrant.with_groups().get_or_404(migrant_id)
+    form = MigrantForm(obj=migrant)
+    conflicts = None
+    if request.method == "GET":
+        form.record_version.data = migrant.version
+    elif form.validate_on_submit():
+        try:
+            base_version = int(form.record_version.data)
+        except (TypeError, ValueError):
+            abort(400, "The form has expired; reload the page and try again.")
+        stale = base_version != migrant.version
+        if stale:
+            conflicts = merge_conflicts(form, migrant, base_version)
+        else:
+            changes = form_changes(form, migrant)
+            if not changes:
+                flash("No changes to save.", "info")
+                return redirect(url_for("records.view_migrant", migrant_id=migrant.id))
+            try:
+                for name, value in changes.items():
+                    setattr(migrant, name, value)
+                if ("height" in changes or "weight" in changes) and migrant.height and migrant.weight:
+                    migrant.calculate_bmi()
+                db.session.commit()  # UPDATE ... WHERE version = <loaded version>
+                flash("Migrant record updated successfully!", "success")
+                return redirect(url_for("records.index"))
+            except StaleDataError:
+                # Saved by someone else between loading the record and writing it
+                db.session.rollback()
+                migrant = Migrant.with_groups().get_or_404(migrant_id)
+                conflicts, stale = merge_conflicts(form, migrant, base_version), True
+            except Exception as e:
+                db.session.rollback()
+                flash(f"Error updating migrant record: {str(e)}", "danger")
+        if stale:
+            form.record_version.data = migrant.version
+            flash("Someone else saved this record while you were editing it. Review their changes below and save again.",
+                  "danger")
+    return render_template("edit_migrant.html", form=form, migrant=migrant, conflicts=conflicts, title="Edit Migrant")
+
+
+@bp.route("/view/<int:migrant_id>")
+@login_required
+def view_migrant(migrant_id):
+    migrant = Migrant.with_groups("personal", "history", "current_status", "visit").get_or_404(migrant_id)
+    qr_code_url = url_for('qr.get_migrant_qr', migrant_id=migrant.id, _external=True)
+    visits = history_page(migrant.id)
+    return render_template(
+        "view_migrant.html", migrant=migrant, title="View Migrant", qr_code_url=qr_code_url,
+        visits=visits.items, visits_next_url=next_page_url(migrant.id, visits)
+    )
+
+
+@bp.route("/import", methods=["GET", "POST"])
+@admin_required
+def import_migrants():
+    form = ImportForm()
+    result = None
+    if form.validate_on_submit():
+        upload = form.file.data
+        stream = io.TextIOWrapper(upload.stream, encoding="utf-8-sig", newline="")
+        result = import_stream(stream, guess_format(upload.filename))
+        flash(f"Imported {result.inserted} records; {result.failed} rows rejected.",
+              "success" if not result.failed else "info")
+    return render_template("import_migrants.html", form=form, result=result, title="Import Migrants")
+
+
+@bp.route("/export", methods=["GET", "POST"])
+@admin_required
+def export_migrants():
+    """Stream consenting records as CSV/NDJSON, filtered like the index page.
+
+    A POST queues the same export as a background job and redirects to its page.
+    """
+    fmt = request.values.get('format', 'csv')
+    if fmt not in EXPORT_FORMATS:
+        abort(400, f"Unsupported export format: {fmt}")
+    try:
+        columns = resolve_columns(request.values.get('columns'))
+    except ValueError as e:
+        abort(400, str(e))
+    if request.method == "POST":
+        if not JobForm().validate_on_submit():
+            abort(400, "The form has expired; reload the page and try again.")
+        params = {"format": fmt, "columns": columns, "q": request.values.get('q'), "by": request.values.get('by')}
+        return redirect(url_for("jobs.job_status", job_id=submit("export", params, current_user.id).id))
+    chunks = stream_export(fmt, columns, request.args.get('q'), request.args.get('by'))
+    filename = f"migrants-{date.today().isoformat()}.{fmt}"
+    return Response(
+        stream_with_context(chunks),
+        mimetype=EXPORT_MIMETYPES[fmt],
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+    )
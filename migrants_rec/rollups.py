@@ -0,0 +1,172 @@
+"""Incrementally maintained per-dimension counts behind the analytics dashboard."""
+
+from collections import Counter
+
+import click
+from sqlalchemy import event, inspect, text
+
+from models import db, Migrant, AnalyticsRollup, migrants_bulk_inserted
+
+AGE_RANGES = [
+    ('0-18', 0, 18),
+    ('19-30', 19, 30),
+    ('31-45', 31, 45),
+    ('46-60', 46, 60),
+    ('60+', 61, 200)
+]
+
+
+def age_bucket(age):
+    """Return the AGE_RANGES label for ``age``, or None if it falls outside them."""
+    if age is None:
+        return None
+    for label, min_age, max_age in AGE_RANGES:
+        if min_age <= age <= max_age:
+            return label
+    return None
+
+
+# dimension -> (source attribute, function mapping the attribute value to a rollup value)
+DIMENSIONS = {
+    'total': ('id', lambda value: ''),
+    'gender': ('gender', lambda value: value or ''),
+    'nationality': ('nationality', lambda value: value or ''),
+    'health_condition': ('health_condition', lambda value: value or ''),
+    'age': ('age', age_bucket),
+    'occupation': ('occupation', lambda value: value or ''),
+}
+
+SOURCE_FIELDS = tuple(sorted({source for source, _ in DIMENSIONS.values()}))
+
+_UPSERT_SQL = text(
+    "INSERT INTO analytics_rollups (dimension, value, count) VALUES (:dimension, :value, :delta) "
+    "ON CONFLICT (dimension, value) DO UPDATE SET count = analytics_rollups.count + excluded.count"
+)
+
+
+def _keys(values):
+    """Yield the (dimension, value) pairs a record with column ``values`` counts towards."""
+    for dimension, (source, bucket) in DIMENSIONS.items():
+        value = bucket(values.get(source))
+        if value is not None:
+            yield dimension, value
+
+
+def apply(connection, rows, delta=1):
+    """Add ``delta`` to the rollups for each mapping of column values in ``rows``."""
+    counts = Counter()
+    for values in rows:
+        counts.update(_keys(values))
+    params = [
+        {'dimension': dimension, 'value': value, 'delta': count * delta}
+        for (dimension, value), count in counts.items()
+    ]
+    if params:
+        connection.execute(_UPSERT_SQL, params)
+
+
+def _current_values(target):
+    return {field: getattr(target, field) for field in SOURCE_FIELDS}
+
+
+def _previous_values(target):
+    state = inspect(target)
+    values = {}
+    for field in SOURCE_FIELDS:
+        history = state.attrs[field].history
+        values[field] = history.deleted[0] if history.deleted else getattr(target, field)
+    return values
+
+
+# ORM hooks: counts change on the flush connection, inside the record's own transaction.
+@event.listens_for(Migrant, "after_insert")
+def _after_insert(mapper, connection, target):
+    apply(connection, [_current_values(target)], 1)
+
+
+@event.listens_for(Migrant, "after_update")
+def _after_update(mapper, connection, target):
+    state = inspect(target)
+    if not any(state.attrs[field].history.has_changes() for field in SOURCE_FIELDS):
+        return  # Checked without loading deferred columns
+    old, new = _previous_values(target), _current_values(target)
+    if old == new:
+        return
+    old_keys, new_keys = set(_keys(old)), set(_keys(new))
+    changes = Counter({key: -1 for key in old_keys - new_keys})
+    changes.update({key: 1 for key in new_keys - old_keys})
+    if not changes:
+        return  # e.g. an age change within the same bucket
+    connection.execute(_UPSERT_SQL, [
+        {'dimension': dimension, 'value': value, 'delta': delta}
+        for (dimension, value), delta in changes.items()
+    ])
+
+
+@event.listens_for(Migrant, "before_delete")
+def _before_delete(mapper, connection, target):
+    apply(connection, [_current_values(target)], -1)
+
+
+@migrants_bulk_inserted.connect
+def _after_bulk_insert(sender, connection, rows):
+    apply(connection, rows, 1)
+
+
+def rebuild(batch_size=1000):
+    """Recompute every rollup in one pass over ``migrants``; returns the rows counted."""
+    counts = Counter()
+    total = 0
+    rows = db.session.execute(
+        db.select(*[getattr(Migrant, f) for f in SOURCE_FIELDS]).execution_options(yield_per=batch_size)
+    )
+    for row in rows:
+        counts.update(_keys(row._asdict()))
+        total += 1
+    db.session.query(AnalyticsRollup).delete()
+    db.session.add_all(
+        AnalyticsRollup(dimension=dimension, value=value, count=count)
+        for (dimension, value), count in counts.items()
+    )
+    db.session.commit()
+    return total
+
+
+def ensure_built():
+    """Backfill the rollups when the table is empty but migrants already exist."""
+    has_rollups = db.session.query(AnalyticsRollup.dimension).filter_by(dimension='total').first()
+    if has_rollups is None and db.session.query(Migrant.id).first() is not None:
+        rebuild()
+
+
+def distribution(rollups, dimension, top=None):
+    """Return chart-ready {'labels', 'data'} for one dimension of the loaded rollups."""
+    rows = [(value, count) for dim, value, count in rollups if dim == dimension and count > 0]
+    if dimension == 'age':
+        counts = dict(rows)
+        return {
+            'labels': [label for label, _, _ in AGE_RANGES],
+            'data': [counts.get(label, 0) for label, _, _ in AGE_RANGES]
+        }
+    if top is not None:
+        rows = sorted(rows, key=lambda row: row[1], reverse=True)[:top]
+    return {
+        'labels': [value if value else 'Unknown' for value, _ in rows],
+        'data': [count for _, count in rows]
+    }
+
+
+def load():
+    """Read all rollup rows as (dimension, value, count) tuples in a single query."""
+    return db.session.query(
+        AnalyticsRollup.dimension, AnalyticsRollup.value, AnalyticsRollup.count
+    ).order_by(AnalyticsRollup.dimension, AnalyticsRollup.value).all()
+
+
+def init_app(app):
+    """Register the rollup CLI commands on ``app``."""
+
+    @app.cli.command("rebuild-rollups")
+    def rebuild_rollups_command():
+        """Recompute the analytics rollups from the migrants table."""
+        click.echo(f"Rolled up {rebuild()} migrant records.")
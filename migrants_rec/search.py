@@ -0,0 +1,253 @@
+"""Full-text search over migrant records backed by an SQLite FTS5 index."""
+
+import re
+
+import click
+from flask import current_app, has_app_context
+from sqlalchemy import column, event, inspect, or_, text
+from sqlalchemy.exc import OperationalError
+
+from models import db, Migrant, migrants_bulk_inserted
+
+FTS_TABLE = "migrants_fts"
+
+# Columns stored in the FTS table. ``contact_digits`` holds the phone number
+# with punctuation stripped (plus the 10-digit national number when a country
+# code is present) and ``contact_rev`` the digits reversed, so a prefix query on
+# the reversed string matches the end of a number.
+FTS_COLUMNS = (
+    "name", "gender", "health_condition", "contact_digits", "contact_rev",
+    "aadhaar_passport", "diagnosis", "symptoms",
+)
+
+# Migrant attributes that feed the index; updates touching none of them skip re-indexing.
+SOURCE_FIELDS = ("name", "gender", "health_condition", "contact", "aadhaar_passport", "diagnosis", "symptoms")
+
+# bm25() weights, in FTS_COLUMNS order: name and identifiers rank above free text.
+RANK_WEIGHTS = (10.0, 2.0, 2.0, 5.0, 5.0, 8.0, 1.0, 1.0)
+
+# FTS columns searched by each SearchForm.filter_by option
+FILTER_COLUMNS = {
+    "name": ("name",),
+    "gender": ("gender",),
+    "health_condition": ("health_condition",),
+    "contact": ("contact_digits",),
+    "all": ("name", "contact_digits", "aadhaar_passport", "diagnosis", "symptoms"),
+}
+
+# Model columns used when the database has no FTS5 support
+LIKE_COLUMNS = {
+    "name": (Migrant.name,),
+    "gender": (Migrant.gender,),
+    "health_condition": (Migrant.health_condition,),
+    "contact": (Migrant.contact,),
+    "all": (Migrant.name, Migrant.contact, Migrant.aadhaar_passport, Migrant.diagnosis, Migrant.symptoms),
+}
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def fts_enabled():
+    """Return True when the current app's database has a usable FTS index.
+
+    Unless create_index() already recorded the answer, each worker looks the
+    table up once, on first use.
+    """
+    if not has_app_context():
+        return False
+    enabled = current_app.extensions.get("migrant_search_fts")
+    if enabled is None:
+        enabled = current_app.extensions["migrant_search_fts"] = _fts_table_exists()
+    return enabled
+
+
+def _fts_table_exists():
+    if db.engine.dialect.name != "sqlite":
+        return False
+    with db.engine.connect() as connection:
+        return connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE name = :name"), {"name": FTS_TABLE}
+        ).first() is not None
+
+
+def _digits(value):
+    return re.sub(r"\D", "", value or "")
+
+
+def _document(values):
+    """Build the FTS row for a Migrant instance or a mapping of column values."""
+    get = values.get if isinstance(values, dict) else lambda key: getattr(values, key, None)
+    digits = _digits(get("contact"))
+    national = f" {digits[-10:]}" if len(digits) > 10 else ""
+    return {
+        "rowid": get("id"),
+        "name": get("name") or "",
+        "gender": get("gender") or "",
+        "health_condition": get("health_condition") or "",
+        "contact_digits": digits + national,
+        "contact_rev": digits[::-1],
+        "aadhaar_passport": get("aadhaar_passport") or "",
+        "diagnosis": get("diagnosis") or "",
+        "symptoms": get("symptoms") or "",
+    }
+
+
+_INSERT_SQL = text(
+    f"INSERT INTO {FTS_TABLE} (rowid, {', '.join(FTS_COLUMNS)}) "
+    f"VALUES (:rowid, {', '.join(':' + c for c in FTS_COLUMNS)})"
+)
+_DELETE_SQL = text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :rowid")
+
+
+def index_rows(connection, rows):
+    """(Re)index Migrant instances or column mappings that already have an ``id``."""
+    documents = [_document(row) for row in rows]
+    if not documents:
+        return
+    connection.execute(_DELETE_SQL, [{"rowid": d["rowid"]} for d in documents])
+    connection.execute(_INSERT_SQL, documents)
+
+
+def unindex_rows(connection, ids):
+    """Drop the given migrant ids from the index."""
+    ids = list(ids)
+    if ids:
+        connection.execute(_DELETE_SQL, [{"rowid": i} for i in ids])
+
+
+# ORM hooks: run on the flush connection, so the index commits or rolls back with the record.
+@event.listens_for(Migrant, "after_insert")
+def _after_insert(mapper, connection, target):
+    if fts_enabled():
+        index_rows(connection, [target])
+
+
+@event.listens_for(Migrant, "after_update")
+def _after_update(mapper, connection, target):
+    if not fts_enabled():
+        return
+    state = inspect(target)
+    if any(state.attrs[field].history.has_changes() for field in SOURCE_FIELDS):
+        index_rows(connection, [target])
+
+
+@event.listens_for(Migrant, "after_delete")
+def _after_delete(mapper, connection, target):
+    if fts_enabled():
+        unindex_rows(connection, [target.id])
+
+
+@migrants_bulk_inserted.connect
+def _after_bulk_insert(sender, connection, rows):
+    if fts_enabled():
+        index_rows(connection, rows)
+
+
+def _match_expression(term, by):
+    """Translate a user search term into an FTS5 MATCH expression, or None."""
+    tokens = _TOKEN_RE.findall(term)
+    if not tokens:
+        return None
+    columns = FILTER_COLUMNS[by]
+    scope = "{" + " ".join(columns) + "}"
+    clauses = []
+    for token in tokens:
+        clause = f'{scope} : "{token}"*'
+        if "contact_digits" in columns and token.isdigit():
+            # Phone numbers are usually searched by their last few digits
+            clause = f'({clause} OR contact_rev : "{token[::-1]}"*)'
+        clauses.append(clause)
+    return " AND ".join(clauses)
+
+
+def apply_search(query, term, by):
+    """Restrict a Migrant query to rows matching ``term`` in the ``by`` field(s).
+
+    Uses the FTS index when available and falls back to the original
+    ``ILIKE '%term%'`` filters otherwise. ``by='id'`` is an exact id lookup.
+    """
+    by = by if by in FILTER_COLUMNS or by == "id" else "all"
+    if by == "id":
+        try:
+            return query.filter(Migrant.id == int(term))
+        except ValueError:
+            return query.filter(False)
+    if fts_enabled():
+        match = _match_expression(term, by)
+        if match is None:
+            return query.filter(False)
+        matching_ids = text(
+            f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match"
+        ).bindparams(match=match).columns(column("rowid"))
+        return query.filter(Migrant.id.in_(matching_ids))
+    return query.filter(or_(*[col.ilike(f"%{term}%") for col in LIKE_COLUMNS[by]]))
+
+
+def ranked_ids(term, by="all", limit=20, offset=0):
+    """Return up to ``limit`` matching migrant ids, best bm25 match first, skipping the first ``offset``."""
+    by = by if by in FILTER_COLUMNS else "all"
+    if not fts_enabled():
+        return [row.id for row in apply_search(db.session.query(Migrant.id), term, by)
+                .order_by(Migrant.id.desc()).limit(limit).offset(offset)]
+    match = _match_expression(term, by)
+    if match is None:
+        return []
+    weights = ", ".join(str(w) for w in RANK_WEIGHTS)
+    result = db.session.execute(
+        text(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match "
+             f"ORDER BY bm25({FTS_TABLE}, {weights}) LIMIT :limit OFFSET :offset"),
+        {"match": match, "limit": limit, "offset": offset},
+    )
+    return [row[0] for row in result]
+
+
+def rebuild_index(batch_size=1000):
+    """Repopulate the FTS table from ``migrants``; returns the number of rows indexed."""
+    connection = db.session.connection()
+    connection.execute(text(f"DELETE FROM {FTS_TABLE}"))
+    source = [getattr(Migrant, f) for f in ("id",) + SOURCE_FIELDS]
+    rows = db.session.execute(db.select(*source).execution_options(yield_per=batch_size))
+    total = 0
+    for chunk in rows.partitions():
+        connection.execute(_INSERT_SQL, [_document(row._asdict()) for row in chunk])
+        total += len(chunk)
+    db.session.commit()
+    return total
+
+
+def create_index(app, backfill=True):
+    """Create the FTS table if the database supports it and record the result on ``app``.
+
+    A freshly created table is backfilled from ``migrants`` unless ``backfill`` is False.
+    """
+    enabled, existed = False, True
+    if db.engine.dialect.name == "sqlite":
+        columns = ", ".join(FTS_COLUMNS)
+        try:
+            with db.engine.begin() as connection:
+                existed = connection.execute(
+                    text("SELECT 1 FROM sqlite_master WHERE name = :name"), {"name": FTS_TABLE}
+                ).first() is not None
+                connection.execute(text(
+                    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+                    f"{columns}, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+                ))
+            enabled = True
+        except OperationalError:
+            pass  # No FTS5 in this SQLite build; keep the LIKE fallback
+    app.extensions["migrant_search_fts"] = enabled
+    if enabled and backfill and not existed:
+        rebuild_index()
+
+
+def init_app(app):
+    """Register the search CLI commands on ``app``."""
+
+    @app.cli.command("rebuild-search")
+    def rebuild_search_command():
+        """Rebuild the full-text search index from the migrants table."""
+        create_index(app, backfill=False)
+        if not fts_enabled():
+            click.echo("FTS5 is not available for this database; searches use LIKE.")
+            return
+        click.echo(f"Indexed {rebuild_index()} migrant records.")
@@ -0,0 +1,71 @@
+"""Measure worker startup: importing the app module and building an app.
+
+Each sample runs in a fresh interpreter, so nothing is already imported.
+Exits non-zero when the median is over the target or when a module that
+should load lazily was imported during startup.
+
+Usage: python startup_time.py [--runs 5] [--target-ms 800]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Heavy modules that must only load on first use
+LAZY_MODULES = ("qrcode", "PIL.Image", "alembic", "flask_migrate")
+DEFAULT_TARGET_MS = 800
+
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+app.create_app()
+created = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "create_ms": (created - imported) * 1000,
+    "loaded": [name for name in %r if name in sys.modules],
+}))
+"""
+
+
+def sample():
+    """Time one cold start in a fresh interpreter; returns the probe's JSON result."""
+    env = dict(os.environ)
+    env.pop("FLASK_RUN_FROM_CLI", None)
+    output = subprocess.run(
+        [sys.executable, "-c", _PROBE % (LAZY_MODULES,)],
+        cwd=os.path.dirname(os.path.abspath(__file__)), env=env,
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure app import and create_app() time.")
+    parser.add_argument("--runs", type=int, default=5, help="Cold starts to sample")
+    parser.add_argument("--target-ms", type=float, default=DEFAULT_TARGET_MS, help="Budget for import + create_app()")
+    args = parser.parse_args()
+    samples = [sample() for _ in range(args.runs)]
+    import_ms = statistics.median(s["import_ms"] for s in samples)
+    create_ms = statistics.median(s["create_ms"] for s in samples)
+    loaded = sorted({name for s in samples for name in s["loaded"]})
+    total = import_ms + create_ms
+    print(f"import app: {import_ms:.0f} ms  create_app(): {create_ms:.0f} ms  "
+          f"total: {total:.0f} ms (target {args.target_ms:.0f} ms, median of {args.runs})")
+    failed = False
+    if loaded:
+        print(f"Loaded eagerly but should be lazy: {', '.join(loaded)}")
+        failed = True
+    if total > args.target_ms:
+        print("Over the startup target.")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,30 @@
+const analyticsData = JSON.parse(document.getElementById('analytics-data').textContent);
+const renderChart = (ctxId, type, labels, data, colors) => {
+const ctx = document.getElementById(ctxId).getContext('2d');
+new Chart(ctx, {
+type: type,
+data: {
+labels: labels,
+datasets: [{
+label: 'Count',
+data: data,
+backgroundColor: colors,
+borderColor: 'white',
+borderWidth: 1
+}]
+},
+options: {
+responsive: true,
+maintainAspectRatio: false,
+scales: { y: { beginAtZero: true } }
+}
+});
+};
+renderChart('genderChart', 'pie',
+analyticsData.gender.labels,
+analyticsData.gender.data,
+['#3B82F6', '#EF4444', '#F59E0B', '#10B981']);
+renderChart('nationalityChart', 'bar',
+analyticsData.nationality.labels,
+analyticsData.nationality.data,
+'#10B981');
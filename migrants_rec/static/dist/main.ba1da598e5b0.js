@@ -0,0 +1,21 @@
+AOS.init();
+feather.replace();
+document.getElementById('sidebarToggle').addEventListener('click', function() {
+document.getElementById('sidebar').classList.toggle('-translate-x-full');
+});
+const languageSelect = document.getElementById('languageSelect');
+languageSelect.addEventListener('change', function() {
+window.location.href = `/language/${this.value}`;
+});
+if (languageSelect.dataset.current) {
+languageSelect.value = languageSelect.dataset.current;
+}
+document.addEventListener('DOMContentLoaded', () => {
+const cards = document.querySelectorAll('.migrant-card');
+cards.forEach((card, index) => {
+setTimeout(() => {
+card.style.opacity = 1;
+card.style.transform = 'translateY(0)';
+}, index * 100);
+});
+});
@@ -1,4 +1,20 @@
-console.log("Frontend loaded. Ready for interactive magic!");
+// Page-wide setup, loaded at the end of <body> after the AOS and Feather scripts
+AOS.init();
+feather.replace();
+
+// Toggle sidebar on mobile
+document.getElementById('sidebarToggle').addEventListener('click', function() {
+    document.getElementById('sidebar').classList.toggle('-translate-x-full');
+});
+
+// Language switcher; the page renders the current language into data-current
+const languageSelect = document.getElementById('languageSelect');
+languageSelect.addEventListener('change', function() {
+    window.location.href = `/language/${this.value}`;
+});
+if (languageSelect.dataset.current) {
+    languageSelect.value = languageSelect.dataset.current;
+}
 
 // Example of a simple interactive feature
 document.addEventListener('DOMContentLoaded', () => {
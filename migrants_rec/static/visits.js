@@ -0,0 +1,22 @@
+// "More visits" on the record page: appends the next page of the visit history
+(function () {
+    var button = document.getElementById('more-visits');
+    if (!button) {
+        return;
+    }
+    button.addEventListener('click', function () {
+        button.disabled = true;
+        fetch(button.dataset.url, {credentials: 'same-origin'}).then(function (response) {
+            var next = response.headers.get('X-Next-Page');
+            return response.text().then(function (html) {
+                document.getElementById('visit-rows').insertAdjacentHTML('beforeend', html);
+                if (next) {
+                    button.dataset.url = next;
+                    button.disabled = false;
+                } else {
+                    button.parentNode.remove();
+                }
+            });
+        });
+    });
+})();
@@ -0,0 +1,262 @@
+"""Disease surveillance: coded conditions, daily case counts per place and rolling-window alerts.
+
+The free-text screening, alert and health-condition fields are matched
+against CONDITIONS whenever a record is written. Each condition found is
+a case, counted once on the day it is first recorded (the check-up date,
+or the day of the write) in the record's district and pincode. Like the
+analytics rollups, the daily buckets in ``surveillance_counts`` change in
+the record's own transaction, so 7/14/28-day counts and week-over-week
+growth are a range scan over at most 28 days of buckets.
+"""
+
+import re
+from collections import Counter
+from datetime import date, timedelta
+
+import click
+from flask import Blueprint, current_app, jsonify, request
+from flask_login import login_required
+from sqlalchemy import case, event, func, inspect, or_, text
+
+from models import db, Migrant, SurveillanceCase, SurveillanceCount, migrants_bulk_inserted
+
+bp = Blueprint("surveillance", __name__)
+
+# code -> (label, pattern matching it in free text, 7-day cases in one place that raise an alert)
+CONDITIONS = {
+    "tuberculosis": ("Tuberculosis", r"\btb\b|tubercul|koch", 2),
+    "malaria": ("Malaria", r"malaria|plasmodium|falciparum|vivax", 3),
+    "dengue": ("Dengue", r"dengue|\bns1\b", 3),
+    "covid19": ("COVID-19", r"covid|sars[- ]?cov|corona", 3),
+    "influenza": ("Influenza-like illness", r"influenza|\bflu\b|\bili\b|h1n1", 5),
+    "cholera": ("Cholera", r"cholera", 1),
+    "diarrhoea": ("Acute diarrhoeal disease", r"diarrh|gastroenteritis|loose stool", 5),
+    "typhoid": ("Typhoid", r"typhoid|enteric fever|widal", 3),
+    "hepatitis": ("Viral hepatitis / jaundice", r"hepatitis|jaundice", 2),
+    "leptospirosis": ("Leptospirosis", r"leptospir", 1),
+    "measles": ("Measles", r"measles|rubeola", 1),
+    "chickenpox": ("Chickenpox", r"chicken ?pox|varicella", 3),
+    "scabies": ("Scabies", r"scabies", 5),
+    "hiv": ("HIV", r"\bhiv\b|\baids\b", 2),
+}
+
+TEXT_FIELDS = ("infectious_disease_screening", "disease_alerts", "health_condition")
+SOURCE_FIELDS = TEXT_FIELDS + ("last_checkup", "work_location_district", "work_location_pincode")
+WINDOWS = (7, 14, 28)
+
+_PATTERNS = [(code, re.compile(pattern, re.IGNORECASE)) for code, (_, pattern, _) in CONDITIONS.items()]
+# "Malaria negative", "no TB", "HIV: -ve", "dengue ruled out" record a test, not a case
+_NEGATION_RE = re.compile(r"\b(?:no|not|non|neg|negative|nil|absent|ruled out|free of)\b|-ve\b|\(-\)", re.IGNORECASE)
+_CLAUSE_RE = re.compile(r"[,;\n|/]+|\band\b|\bbut\b", re.IGNORECASE)
+
+_CASES_SQL = text("SELECT condition, day, district, pincode FROM surveillance_cases WHERE migrant_id = :migrant_id")
+_INSERT_CASE_SQL = text(
+    "INSERT INTO surveillance_cases (migrant_id, condition, day, district, pincode) "
+    "VALUES (:migrant_id, :condition, :day, :district, :pincode)"
+)
+_DELETE_CASE_SQL = text("DELETE FROM surveillance_cases WHERE migrant_id = :migrant_id AND condition = :condition")
+_UPSERT_COUNT_SQL = text(
+    "INSERT INTO surveillance_counts (day, condition, district, pincode, count) "
+    "VALUES (:day, :condition, :district, :pincode, :delta) "
+    "ON CONFLICT (day, condition, district, pincode) DO UPDATE SET count = surveillance_counts.count + excluded.count"
+)
+
+
+def code_text(value):
+    """Return the set of CONDITIONS codes mentioned, and not negated, in one free-text value."""
+    found = set()
+    for clause in _CLAUSE_RE.split(value or ""):
+        if not clause.strip() or _NEGATION_RE.search(clause):
+            continue
+        found.update(code for code, pattern in _PATTERNS if pattern.search(clause))
+    return found
+
+
+def code_conditions(values):
+    """Return the set of condition codes in the TEXT_FIELDS of a record's column ``values``."""
+    found = set()
+    for field in TEXT_FIELDS:
+        found |= code_text(values.get(field))
+    return found
+
+
+def _new_cases(migrant_id, conditions, values, today):
+    day = values.get("last_checkup") or today
+    district, pincode = values.get("work_location_district") or "", values.get("work_location_pincode") or ""
+    return [{"migrant_id": migrant_id, "condition": condition, "day": day, "district": district, "pincode": pincode}
+            for condition in sorted(conditions)]
+
+
+def _apply_counts(connection, deltas):
+    params = [{"day": day, "condition": condition, "district": district, "pincode": pincode, "delta": delta}
+              for (day, condition, district, pincode), delta in deltas.items() if delta]
+    if params:
+        connection.execute(_UPSERT_COUNT_SQL, params)
+
+
+def _bucket(case_row):
+    return case_row["day"], case_row["condition"], case_row["district"], case_row["pincode"]
+
+
+def record_cases(connection, migrant_id, values, existing=()):
+    """Bring a migrant's cases in line with its column ``values``; ``existing`` are its current case rows."""
+    existing = {row["condition"]: row for row in existing}
+    conditions = code_conditions(values)
+    added = _new_cases(migrant_id, conditions - set(existing), values, date.today())
+    removed = [row for condition, row in existing.items() if condition not in conditions]
+    deltas = Counter({_bucket(row): 1 for row in added})
+    deltas.subtract(_bucket(row) for row in removed)
+    _apply_counts(connection, deltas)
+    for row in removed:
+        connection.execute(_DELETE_CASE_SQL, {"migrant_id": migrant_id, "condition": row["condition"]})
+    if added:
+        connection.execute(_INSERT_CASE_SQL, added)
+
+
+def _existing_cases(connection, migrant_id):
+    return [row._asdict() for row in connection.execute(_CASES_SQL, {"migrant_id": migrant_id})]
+
+
+def _current_values(target):
+    return {field: getattr(target, field) for field in SOURCE_FIELDS}
+
+
+# ORM hooks: cases and counts change on the flush connection, inside the record's own transaction.
+@event.listens_for(Migrant, "after_insert")
+def _after_insert(mapper, connection, target):
+    record_cases(connection, target.id, _current_values(target))
+
+
+@event.listens_for(Migrant, "after_update")
+def _after_update(mapper, connection, target):
+    state = inspect(target)
+    if not any(state.attrs[field].history.has_changes() for field in TEXT_FIELDS):
+        return  # A case keeps the day and place it was first recorded; checked without loading deferred columns
+    record_cases(connection, target.id, _current_values(target), _existing_cases(connection, target.id))
+
+
+@event.listens_for(Migrant, "before_delete")
+def _before_delete(mapper, connection, target):
+    record_cases(connection, target.id, {}, _existing_cases(connection, target.id))
+
+
+@migrants_bulk_inserted.connect
+def _after_bulk_insert(sender, connection, rows):
+    today = date.today()
+    cases = [case_row for row in rows for case_row in _new_cases(row["id"], code_conditions(row), row, today)]
+    if cases:
+        _apply_counts(connection, Counter(_bucket(case_row) for case_row in cases))
+        connection.execute(_INSERT_CASE_SQL, cases)
+
+
+def backfill(connection, batch_size=1000):
+    """Code every record into empty case and count tables on ``connection``; returns the number of cases.
+
+    The day a case was first recorded is lost for records without a
+    check-up date: they are counted today. Also run by the alembic revision
+    that creates the tables.
+    """
+    rows = connection.execute(
+        db.select(Migrant.id, *[getattr(Migrant, field) for field in SOURCE_FIELDS])
+        .where(or_(*[getattr(Migrant, field).isnot(None) for field in TEXT_FIELDS]))
+        .execution_options(yield_per=batch_size)
+    )
+    today, total = date.today(), 0
+    for batch in rows.partitions():
+        cases = [case_row for row in batch
+                 for case_row in _new_cases(row.id, code_conditions(row._asdict()), row._asdict(), today)]
+        if cases:
+            _apply_counts(connection, Counter(_bucket(case_row) for case_row in cases))
+            connection.execute(_INSERT_CASE_SQL, cases)
+            total += len(cases)
+    return total
+
+
+def rebuild(batch_size=1000):
+    """Recode every record and recount from scratch; returns the number of cases."""
+    db.session.query(SurveillanceCase).delete()
+    db.session.query(SurveillanceCount).delete()
+    total = backfill(db.session.connection(), batch_size)
+    db.session.commit()
+    return total
+
+
+def ensure_built():
+    """Code the existing records when the case table is empty but some record has text to code."""
+    if db.session.query(SurveillanceCase.migrant_id).first() is None and db.session.query(Migrant.id).filter(
+        or_(*[getattr(Migrant, field).isnot(None) for field in TEXT_FIELDS])
+    ).first() is not None:
+        rebuild()
+
+
+def window_counts(end=None, level="district", condition=None):
+    """Rolling case counts up to and including ``end`` (default today), per condition and place.
+
+    ``level`` is "district" or "pincode". Returns dicts with last_7,
+    last_14, last_28, previous_7 (the 7 days before the last 7) and growth
+    (week-over-week change as a fraction; None when the previous week had none).
+    """
+    end = end or date.today()
+    places = [SurveillanceCount.district] + ([SurveillanceCount.pincode] if level == "pincode" else [])
+
+    def since(days):
+        return func.sum(case((SurveillanceCount.day > end - timedelta(days=days), SurveillanceCount.count), else_=0))
+
+    # Bounded by the leading "day" column of the primary key: at most 28 days of buckets are read
+    query = db.session.query(SurveillanceCount.condition, *places, *[since(days) for days in WINDOWS]).filter(
+        SurveillanceCount.day > end - timedelta(days=max(WINDOWS)), SurveillanceCount.day <= end
+    )
+    if condition is not None:
+        query = query.filter(SurveillanceCount.condition == condition)
+    results = []
+    for row in query.group_by(SurveillanceCount.condition, *places):
+        condition_code, *place, last_7, last_14, last_28 = row
+        if not last_28:
+            continue  # Only buckets that were decremented back to zero
+        previous_7 = last_14 - last_7
+        results.append({
+            "condition": condition_code,
+            "label": CONDITIONS[condition_code][0] if condition_code in CONDITIONS else condition_code,
+            "district": place[0],
+            **({"pincode": place[1]} if level == "pincode" else {}),
+            "last_7": last_7, "last_14": last_14, "last_28": last_28, "previous_7": previous_7,
+            "growth": (last_7 - previous_7) / previous_7 if previous_7 else None,
+        })
+    results.sort(key=lambda result: (-result["last_7"], -result["last_28"], result["condition"], result["district"]))
+    return results
+
+
+def alerts(end=None, level="district"):
+    """Places where a condition crossed its 7-day threshold and is growing week over week."""
+    min_growth = current_app.config["SURVEILLANCE_ALERT_GROWTH"]
+    return [
+        result for result in window_counts(end, level)
+        if result["condition"] in CONDITIONS and result["last_7"] >= CONDITIONS[result["condition"]][2]
+        and (result["growth"] is None or result["growth"] >= min_growth)
+    ]
+
+
+@bp.route("/analytics/surveillance")
+@login_required
+def surveillance_counts():
+    """Rolling-window counts as JSON: ?end=YYYY-MM-DD&level=district|pincode&condition=&alerts=1."""
+    try:
+        end = date.fromisoformat(request.args["end"]) if request.args.get("end") else None
+    except ValueError:
+        return jsonify(error="end must be a YYYY-MM-DD date"), 400
+    level = "pincode" if request.args.get("level") == "pincode" else "district"
+    if request.args.get("alerts"):
+        results = alerts(end, level)
+    else:
+        results = window_counts(end, level, request.args.get("condition") or None)
+    return jsonify(end=(end or date.today()).isoformat(), level=level, results=results)
+
+
+def init_app(app):
+    """Register the surveillance endpoint and the ``rebuild-surveillance`` command on ``app``."""
+    app.register_blueprint(bp)
+
+    @app.cli.command("rebuild-surveillance")
+    def rebuild_surveillance_command():
+        """Recode the screening/alert fields of every record and recount the daily case buckets."""
+        click.echo(f"Counted {rebuild()} cases.")
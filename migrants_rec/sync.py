@@ -0,0 +1,261 @@
+"""Delta sync for offline clients: a change sequence, /sync downloads and batched uploads.
+
+Every write to a migrant (form, API, import) records the record's new
+position in ``sync_changes`` from mapper events, inside the same
+transaction. ``GET /sync?since=<seq>`` streams the records changed after
+``seq`` as gzip-compressed NDJSON, read through the (district, seq) index,
+so a sync costs the number of changes rather than the size of the table.
+``POST /sync`` applies a batch of offline edits; an edit made against an
+older version than the server's is returned as a conflict, not applied.
+
+The sequence is only gap-free in commit order on a single-writer database
+(SQLite); on PostgreSQL a slow transaction can commit a lower seq after a
+client has already moved past it.
+"""
+
+import json
+import zlib
+
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context
+from sqlalchemy import event, func, inspect, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.exc import StaleDataError
+
+from api import API_FIELDS, WRITABLE_FIELDS, api_login_required, compress_response, serialize, validate_payload
+from exporter import plain_value
+from models import db, Migrant, SyncChange, migrants_bulk_inserted
+
+bp = Blueprint("sync", __name__, url_prefix="/sync")
+bp.after_request(compress_response)
+
+DEFAULT_CHUNK_SIZE = 500
+
+_LIVE_SQL = text("SELECT district FROM sync_changes WHERE migrant_id = :migrant_id AND deleted = 0")
+_CLEAR_SQL = text(
+    "DELETE FROM sync_changes WHERE migrant_id = :migrant_id AND (deleted = 0 OR district = :district)"
+)
+_INSERT_SQL = text("INSERT INTO sync_changes (migrant_id, district, deleted) VALUES (:migrant_id, :district, :deleted)")
+
+
+def record_change(connection, migrant_id, district, deleted=False):
+    """Give ``migrant_id`` a new sequence number, leaving a tombstone in the district it left."""
+    district = district or ""
+    previous = connection.execute(_LIVE_SQL, {"migrant_id": migrant_id}).scalar()
+    connection.execute(_CLEAR_SQL, {"migrant_id": migrant_id, "district": district})
+    if previous is not None and previous != district:
+        connection.execute(_CLEAR_SQL, {"migrant_id": migrant_id, "district": previous})
+        connection.execute(_INSERT_SQL, {"migrant_id": migrant_id, "district": previous, "deleted": True})
+    connection.execute(_INSERT_SQL, {"migrant_id": migrant_id, "district": district, "deleted": deleted})
+
+
+# ORM hooks: the change is recorded on the flush connection, inside the record's own transaction.
+@event.listens_for(Migrant, "after_insert")
+def _after_insert(mapper, connection, target):
+    # Goes through record_change because SQLite may reuse the id of a deleted record
+    record_change(connection, target.id, target.work_location_district)
+
+
+@event.listens_for(Migrant, "after_update")
+def _after_update(mapper, connection, target):
+    state = inspect(target)
+    if not any(state.attrs[name].history.has_changes() for name in API_FIELDS):
+        return  # Only bookkeeping (e.g. qr_code) changed; checked without loading deferred columns
+    record_change(connection, target.id, target.work_location_district)
+
+
+@event.listens_for(Migrant, "before_delete")
+def _before_delete(mapper, connection, target):
+    record_change(connection, target.id, target.work_location_district, deleted=True)
+
+
+@migrants_bulk_inserted.connect
+def _after_bulk_insert(sender, connection, rows):
+    params = [
+        {"migrant_id": row["id"], "district": row.get("work_location_district") or "", "deleted": False}
+        for row in rows
+    ]
+    connection.execute(_CLEAR_SQL, params)  # Tombstones of a reused id
+    connection.execute(_INSERT_SQL, params)
+
+
+def ensure_built():
+    """Give every existing migrant a sequence number when the change log is still empty."""
+    if db.session.query(SyncChange.seq).first() is None:
+        db.session.execute(text(
+            "INSERT INTO sync_changes (migrant_id, district, deleted) "
+            "SELECT id, COALESCE(work_location_district, ''), 0 FROM migrants ORDER BY id"
+        ))
+        db.session.commit()
+
+
+def current_seq():
+    """The highest sequence number handed out so far (0 for an empty log)."""
+    return db.session.query(func.max(SyncChange.seq)).scalar() or 0
+
+
+def live_seqs(migrant_ids):
+    """{migrant_id: seq} of the live change row for each of ``migrant_ids`` that still exists."""
+    if not migrant_ids:
+        return {}
+    rows = db.session.query(SyncChange.migrant_id, SyncChange.seq).filter(
+        SyncChange.migrant_id.in_(migrant_ids), SyncChange.deleted.is_(False)
+    )
+    return dict(rows.all())
+
+
+def changes_statement(since, until, district=None):
+    """SELECT the change rows in (since, until], each with the migrant's current columns, in seq order."""
+    statement = db.select(
+        SyncChange.seq, SyncChange.migrant_id, SyncChange.deleted, *[getattr(Migrant, name) for name in API_FIELDS]
+    ).outerjoin(Migrant, Migrant.id == SyncChange.migrant_id).where(SyncChange.seq > since, SyncChange.seq <= until)
+    if district is not None:
+        statement = statement.where(SyncChange.district == district)
+    return statement.order_by(SyncChange.seq)
+
+
+def _change_lines(partitions):
+    for rows in partitions:
+        lines = []
+        for row in rows:
+            if row.deleted or row.id is None:
+                change = {"seq": row.seq, "op": "delete", "id": row.migrant_id}
+            else:
+                change = {"seq": row.seq, "op": "upsert", "data": {name: plain_value(getattr(row, name)) for name in API_FIELDS}}
+            lines.append(json.dumps(change, ensure_ascii=False, separators=(",", ":")) + "\n")
+        yield "".join(lines)
+
+
+def _gzip_chunks(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode("utf-8"))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+@bp.route("", methods=["GET"])
+@api_login_required
+def download_changes():
+    """Stream the changes after ?since= (optionally for one ?district=) as NDJSON.
+
+    The X-Sync-Seq header holds the sequence number to send as ``since``
+    next time; changes committed while the response streams go out then.
+    """
+    since = max(request.args.get("since", 0, type=int), 0)
+    district = request.args.get("district") or None
+    until = current_seq()
+    if since > until:
+        return jsonify(error="since is ahead of the server; sync again from 0", seq=until), 409
+    statement = changes_statement(since, until, district).execution_options(yield_per=DEFAULT_CHUNK_SIZE)
+    chunks = _change_lines(db.session.execute(statement).partitions())
+    headers = {"X-Sync-Seq": str(until), "Vary": "Accept-Encoding"}
+    if request.accept_encodings["gzip"]:
+        chunks = _gzip_chunks(chunks)
+        headers["Content-Encoding"] = "gzip"
+    response = Response(stream_with_context(chunks), mimetype="application/x-ndjson", headers=headers)
+    response.cache_control.private = True
+    response.cache_control.no_store = True
+    return response
+
+
+def _upload_body():
+    """The decoded JSON upload (gzip request bodies are accepted); None if it is not a JSON object.
+
+    The body must be sent as application/json: a cross-site form cannot set
+    that type without a CORS preflight, so a logged-in browser cannot be
+    made to post edits here.
+    """
+    if not request.is_json:
+        return None
+    data = request.get_data()
+    if request.content_encoding == "gzip":
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        limit = current_app.config["SYNC_UPLOAD_MAX_BYTES"]
+        try:
+            data = decompressor.decompress(data, limit)
+        except zlib.error:
+            return None
+        if decompressor.unconsumed_tail:
+            return None  # Larger than SYNC_UPLOAD_MAX_BYTES once inflated
+    try:
+        payload = json.loads(data)
+    except ValueError:
+        return None
+    return payload if isinstance(payload, dict) else None
+
+
+def _conflict(migrant, seq):
+    return {"status": "conflict", "id": migrant.id, "seq": seq, "data": serialize(migrant, list(API_FIELDS))}
+
+
+def _apply(change, migrants, seqs):
+    """Apply one uploaded change and return its result entry."""
+    data = change.get("data")
+    if not isinstance(data, dict):
+        return {"status": "invalid", "errors": {"data": ["Expected a JSON object."]}}
+    migrant_id = change.get("id")
+    if migrant_id is None:
+        values, errors = validate_payload(data)
+        if errors:
+            return {"status": "invalid", "errors": errors}
+        migrant = Migrant(**values)
+    else:
+        migrant = migrants.get(migrant_id)
+        if migrant is None or migrant_id not in seqs:
+            return {"status": "gone", "id": migrant_id}
+        base_seq = change.get("base_seq")
+        if not isinstance(base_seq, int):
+            return {"status": "invalid", "id": migrant_id, "errors": {"base_seq": ["Required for an update."]}}
+        if seqs[migrant_id] > base_seq:
+            # Changed on the server since the client's copy; the client decides how to merge
+            return _conflict(migrant, seqs[migrant_id])
+        values, errors = validate_payload(data, {field: getattr(migrant, field) for field in WRITABLE_FIELDS})
+        if errors:
+            return {"status": "invalid", "id": migrant_id, "errors": errors}
+    try:
+        with db.session.begin_nested():
+            for field, value in values.items():
+                setattr(migrant, field, value)
+            db.session.add(migrant)
+            db.session.flush()
+    except IntegrityError as e:
+        return {"status": "rejected", "id": migrant_id, "error": str(e.orig)}
+    except StaleDataError:
+        # Saved by someone else between loading the record and writing it (Migrant.version moved on)
+        db.session.refresh(migrant)
+        seqs[migrant_id] = live_seqs([migrant_id]).get(migrant_id)
+        return _conflict(migrant, seqs[migrant_id])
+    seqs[migrant.id] = live_seqs([migrant.id]).get(migrant.id)
+    return {"status": "created" if migrant_id is None else "updated", "id": migrant.id, "seq": seqs[migrant.id]}
+
+
+@bp.route("", methods=["POST"])
+@api_login_required
+def upload_changes():
+    """Apply {"changes": [{"id", "base_seq", "data"}, ...]} made offline.
+
+    New records omit ``id``. An update whose ``base_seq`` is older than the
+    record's current seq is not applied and comes back as a conflict with
+    the server's copy. Results are returned in the order of the changes.
+    """
+    payload = _upload_body()
+    if payload is None or not isinstance(payload.get("changes"), list):
+        return jsonify(error='Expected a JSON object with a "changes" list'), 415
+    changes = payload["changes"]
+    if len(changes) > current_app.config["SYNC_UPLOAD_MAX_CHANGES"]:
+        return jsonify(error="Too many changes in one upload", limit=current_app.config["SYNC_UPLOAD_MAX_CHANGES"]), 413
+    ids = [change["id"] for change in changes if isinstance(change, dict) and isinstance(change.get("id"), int)]
+    migrants = {migrant.id: migrant for migrant in Migrant.with_groups().filter(Migrant.id.in_(ids))} if ids else {}
+    seqs = live_seqs(ids)
+    results = []
+    for index, change in enumerate(changes):
+        result = _apply(change, migrants, seqs) if isinstance(change, dict) else {"status": "invalid", "errors": {"change": ["Expected a JSON object."]}}
+        results.append(dict(index=index, **result))
+    db.session.commit()
+    return jsonify(results=results, seq=current_seq())
+
+
+def init_app(app):
+    """Register the sync endpoints on ``app``."""
+    app.register_blueprint(bp)
@@ -0,0 +1,226 @@
+"""Seeded generator of realistic synthetic migrant records, for load testing.
+
+The same seed always yields the same rows (dates are relative to ``today``),
+so benchmark runs at 10k/100k/1M rows can be compared with each other.
+
+Usage: python synthetic_data.py --rows 100000 [--seed 42] [--batch-size N] [--ndjson FILE]
+"""
+
+import argparse
+import json
+import random
+import time
+from datetime import date, timedelta
+
+from forms import MigrantForm
+from importer import DEFAULT_BATCH_SIZE, ImportResult, insert_batch
+from models import compute_bmi
+
+DEFAULT_SEED = 42
+
+# District -> first three digits of its pincodes
+KERALA_DISTRICTS = {
+    "Thiruvananthapuram": "695", "Kollam": "691", "Pathanamthitta": "689", "Alappuzha": "688",
+    "Kottayam": "686", "Idukki": "685", "Ernakulam": "682", "Thrissur": "680", "Palakkad": "678",
+    "Malappuram": "676", "Kozhikode": "673", "Wayanad": "673", "Kannur": "670", "Kasaragod": "671",
+}
+# Most migrant workers in Kerala come from a handful of states; weights are rough shares
+STATES_OF_ORIGIN = {
+    "West Bengal": 30, "Odisha": 15, "Assam": 14, "Bihar": 12, "Jharkhand": 8,
+    "Uttar Pradesh": 8, "Tamil Nadu": 8, "Madhya Pradesh": 3, "Nepal": 2,
+}
+STATE_LANGUAGE = {
+    "West Bengal": "Bengali", "Odisha": "Odiya", "Bihar": "Hindi", "Jharkhand": "Hindi",
+    "Uttar Pradesh": "Hindi", "Madhya Pradesh": "Hindi", "Tamil Nadu": "Tamil",
+}
+FIRST_NAMES = {
+    "Male": ["Rahul", "Sanjay", "Amit", "Rakesh", "Bikash", "Sujit", "Manoj", "Ramesh", "Arjun", "Dipankar",
+             "Suresh", "Prakash", "Anil", "Babul", "Rajesh", "Kamal", "Mohan", "Ajay", "Santosh", "Biswajit"],
+    "Female": ["Sunita", "Rekha", "Priya", "Anita", "Mamata", "Puja", "Lakshmi", "Kavita", "Rina", "Shanti",
+               "Geeta", "Meena", "Asha", "Sabina", "Jyoti", "Radha", "Lata", "Nandini", "Seema", "Kalpana"],
+}
+SURNAMES = ["Das", "Mondal", "Sheikh", "Behera", "Nayak", "Kumar", "Singh", "Yadav", "Paswan", "Mahato",
+            "Roy", "Sahu", "Gogoi", "Bora", "Hansda", "Murmu", "Pradhan", "Ali", "Murugan", "Thapa"]
+OCCUPATIONS = {
+    "Construction Worker": 30, "Mason": 10, "Plumber": 6, "Electrician": 5, "Carpenter": 5, "Hotel Staff": 8,
+    "Fish Processing Worker": 7, "Plywood Factory Worker": 7, "Agricultural Labourer": 8,
+    "Domestic Worker": 6, "Painter": 4, "Security Guard": 4,
+}
+EMPLOYERS = ["Malabar Builders", "Periyar Plywood", "Cochin Seafoods", "Green Valley Estates", "Sree Constructions",
+             "Lulu Hospitality", "Kerala Infra Ltd", "Coastal Fisheries", "Tharakan Contractors", "Hilltop Plantations"]
+FACILITIES = ["PHC", "CHC", "Taluk Hospital", "District Hospital", "General Hospital", "Mobile Medical Unit"]
+DOCTORS = ["Dr. Anjali Menon", "Dr. Joseph Varghese", "Dr. Fathima Rasheed", "Dr. Suresh Nair", "Dr. Meera Pillai",
+           "Dr. Thomas Kurian", "Dr. Shafeeq Ahmed", "Dr. Lekha Raj", "JHI Binu", "JPHN Sreeja"]
+# health_condition -> (weight, symptoms, diagnosis, prescriptions)
+CONDITIONS = {
+    "Good": (45, None, None, None),
+    "Stable": (15, None, "Routine screening, no findings", None),
+    "Fever": (8, "Fever, body ache", "Viral fever", "Paracetamol 500mg TDS x 3 days"),
+    "Respiratory Infection": (6, "Cough, sore throat", "Upper respiratory tract infection", "Amoxicillin 500mg TDS x 5 days"),
+    "Hypertension": (5, "Headache, dizziness", "Essential hypertension", "Amlodipine 5mg OD"),
+    "Diabetes": (4, "Increased thirst, fatigue", "Type 2 diabetes mellitus", "Metformin 500mg BD"),
+    "Skin Infection": (5, "Itching, rash", "Scabies", "Permethrin 5% cream"),
+    "Occupational Injury": (5, "Laceration, swelling", "Soft tissue injury", "Dressing, Ibuprofen 400mg"),
+    "Malaria": (2, "Fever with chills", "Plasmodium vivax malaria", "Chloroquine, Primaquine"),
+    "Tuberculosis": (2, "Persistent cough, weight loss", "Pulmonary tuberculosis", "DOTS category I"),
+    "Anaemia": (3, "Fatigue, pallor", "Iron deficiency anaemia", "Ferrous sulphate 200mg OD"),
+}
+ALLERGIES = ["Penicillin", "Sulfa drugs", "Dust", "Seafood", "Peanuts"]
+PAST_CONDITIONS = ["Malaria (treated)", "Typhoid", "Jaundice", "Asthma", "Chickenpox"]
+VACCINES = ["Covishield 2 doses", "Covishield 2 doses + booster", "Td", "Hepatitis B", "Covaxin 2 doses"]
+CONDITION_WEIGHTS = {name: spec[0] for name, spec in CONDITIONS.items()}
+SCREENINGS = ["Malaria RDT negative", "Sputum AFB negative", "Chest X-ray normal", "Filaria smear negative"]
+
+
+def _choices(field_name):
+    """Non-empty values of a SelectField declared on MigrantForm."""
+    return [value for value, _ in getattr(MigrantForm, field_name).kwargs["choices"] if value]
+
+
+LANGUAGES = _choices("preferred_language")
+LITERACY_LEVELS = _choices("literacy_level")
+LIVING_CONDITIONS = _choices("living_conditions")
+BLOOD_GROUPS = [group for group in _choices("blood_group") if group != "Unknown"]
+
+
+def _weighted(rng, table):
+    return rng.choices(list(table), weights=list(table.values()))[0]
+
+
+def _maybe(rng, probability, value):
+    return value if rng.random() < probability else None
+
+
+def _phone(rng):
+    return f"{rng.choice('6789')}{rng.randrange(10**9):09d}"
+
+
+def generate_rows(count, seed=DEFAULT_SEED, start=0, today=None):
+    """Yield ``count`` dicts holding every writable Migrant column.
+
+    ``start`` offsets the sequence so several batches from one seed do not
+    repeat Aadhaar numbers; rows are independent of the batch size.
+    """
+    today = today or date.today()
+    for index in range(start, start + count):
+        rng = random.Random(f"{seed}:{index}")
+        gender = "Female" if rng.random() < 0.3 else "Male"
+        if rng.random() < 0.005:
+            gender = "Other"
+        age = min(65, max(18, int(rng.gauss(31, 9))))
+        state = _weighted(rng, STATES_OF_ORIGIN)
+        district = rng.choice(list(KERALA_DISTRICTS))
+        condition = _weighted(rng, CONDITION_WEIGHTS)
+        _, symptoms, diagnosis, prescriptions = CONDITIONS[condition]
+        height = round(rng.gauss(163 if gender == "Male" else 152, 6), 1)
+        weight = round(rng.gauss(58 if gender == "Male" else 50, 8), 1)
+        contact = _phone(rng)
+        last_checkup = today - timedelta(days=rng.randrange(365)) if rng.random() < 0.8 else None
+        follow_up = None
+        if last_checkup and (diagnosis or rng.random() < 0.1):
+            follow_up = last_checkup + timedelta(days=rng.choice((7, 14, 30, 90)))
+        first_name = rng.choice(FIRST_NAMES["Female" if gender == "Female" else "Male"])
+        yield {
+            "name": f"{first_name} {rng.choice(SURNAMES)}",
+            "date_of_birth": today - timedelta(days=age * 365 + rng.randrange(365)),
+            "age": age,
+            "gender": gender,
+            "nationality": "Nepali" if state == "Nepal" else "Indian",
+            "state_of_origin": state,
+            "contact": f"+91 {contact}" if rng.random() < 0.2 else contact,
+            "emergency_contact_name": f"{rng.choice(FIRST_NAMES['Male'])} {rng.choice(SURNAMES)}",
+            "emergency_contact_number": _phone(rng),
+            # 12 digits starting 2-9 like a real Aadhaar; 7919 is coprime with 8 * 10**11,
+            # so distinct indexes never share a number
+            "aadhaar_passport": str(2 * 10**11 + (index * 7919 + 100003 * seed) % (8 * 10**11)),
+            "preferred_language": STATE_LANGUAGE.get(state, "Other") if rng.random() < 0.85 else rng.choice(LANGUAGES),
+            "literacy_level": rng.choice(LITERACY_LEVELS),
+            "data_sharing_consent": rng.random() < 0.85,
+            "occupation": _weighted(rng, OCCUPATIONS),
+            "employer_name": rng.choice(EMPLOYERS),
+            "employer_contact": _phone(rng),
+            "work_location_district": district,
+            "work_location_pincode": f"{KERALA_DISTRICTS[district]}{rng.randrange(1, 700):03d}",
+            "duration_of_stay": f"{rng.randrange(2, 12)} years" if rng.random() < 0.7 else f"{rng.randrange(2, 12)} months",
+            "living_conditions": rng.choice(LIVING_CONDITIONS),
+            "allergies": _maybe(rng, 0.1, rng.choice(ALLERGIES)),
+            "past_medical_conditions": _maybe(rng, 0.2, rng.choice(PAST_CONDITIONS)),
+            "past_surgical_history": _maybe(rng, 0.05, "Appendectomy"),
+            "family_history": _maybe(rng, 0.15, rng.choice(("Diabetes", "Hypertension", "Asthma"))),
+            "immunization_status": rng.choice(("Complete", "Partial", "Unknown")),
+            "height": height,
+            "weight": weight,
+            "bmi": compute_bmi(height, weight),
+            "blood_group": rng.choice(BLOOD_GROUPS),
+            "vital_signs": f"BP {rng.randrange(100, 150)}/{rng.randrange(60, 95)}, Pulse {rng.randrange(60, 100)}, "
+                           f"Temp {rng.uniform(97.5, 101.5 if symptoms else 99):.1f}F, SpO2 {rng.randrange(94, 100)}%",
+            "current_medications": prescriptions,
+            "ongoing_treatment": _maybe(rng, 0.5, prescriptions) if prescriptions else None,
+            "infectious_disease_screening": _maybe(rng, 0.6, rng.choice(SCREENINGS)),
+            "health_condition": condition,
+            "last_checkup": last_checkup,
+            "healthcare_facility": f"{rng.choice(FACILITIES)} {district}" if last_checkup else None,
+            "doctor_name": rng.choice(DOCTORS) if last_checkup else None,
+            "symptoms": symptoms,
+            "diagnosis": diagnosis,
+            "prescriptions": prescriptions,
+            "lab_results": _maybe(rng, 0.3, f"Hb {rng.uniform(9, 15):.1f} g/dL"),
+            "vaccination_records": _maybe(rng, 0.7, rng.choice(VACCINES)),
+            "disease_alerts": "Notifiable disease" if condition in ("Malaria", "Tuberculosis") else None,
+            "contact_tracing_info": f"Shares {rng.choice(LIVING_CONDITIONS).lower()} with ph {_phone(rng)}"
+                                    if condition in ("Malaria", "Tuberculosis", "Fever") else None,
+            "referral_notes": _maybe(rng, 0.3, f"Referred to {rng.choice(FACILITIES)}") if diagnosis else None,
+            "follow_up_date": follow_up,
+            "qr_code": None,
+        }
+
+
+def seed_database(count, seed=DEFAULT_SEED, batch_size=DEFAULT_BATCH_SIZE, start=0):
+    """Insert ``count`` synthetic rows through the bulk import path; returns an ImportResult.
+
+    Must run inside an application context.
+    """
+    result = ImportResult()
+    seen_ids = set()
+    batch = []
+    for line_number, values in enumerate(generate_rows(count, seed, start), start=start + 1):
+        batch.append((line_number, values))
+        if len(batch) >= batch_size:
+            insert_batch(batch, result, seen_ids)
+            batch = []
+    if batch:
+        insert_batch(batch, result, seen_ids)
+    return result
+
+
+def write_ndjson(path, count, seed=DEFAULT_SEED, start=0):
+    """Write the rows to ``path`` as NDJSON, e.g. to benchmark the importer itself."""
+    with open(path, "w", encoding="utf-8") as stream:
+        for values in generate_rows(count, seed, start):
+            values.pop("bmi")
+            values.pop("qr_code")
+            stream.write(json.dumps(values, default=date.isoformat, ensure_ascii=False) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic migrant records.")
+    parser.add_argument("--rows", type=int, default=10000, help="Number of records (e.g. 10000, 100000, 1000000)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Random seed")
+    parser.add_argument("--start", type=int, default=0, help="Sequence offset, to add more rows from the same seed")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Rows per transaction")
+    parser.add_argument("--ndjson", metavar="FILE", help="Write an NDJSON file instead of inserting")
+    args = parser.parse_args()
+    started = time.perf_counter()
+    if args.ndjson:
+        write_ndjson(args.ndjson, args.rows, args.seed, args.start)
+        print(f"Wrote {args.rows} records to {args.ndjson} in {time.perf_counter() - started:.1f}s.")
+        return
+    from app import create_app
+    with create_app().app_context():
+        result = seed_database(args.rows, args.seed, args.batch_size, args.start)
+    elapsed = time.perf_counter() - started
+    print(f"Inserted {result.inserted} synthetic records in {elapsed:.1f}s; {result.failed} rejected.")
+
+
+if __name__ == "__main__":
+    main()
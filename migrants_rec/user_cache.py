@@ -0,0 +1,110 @@
+"""In-process cache of logged-in users, so authenticated requests skip the users query."""
+
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app, has_app_context
+from flask_login import UserMixin
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from models import db, User
+
+
+class SessionUser(UserMixin):
+    """Read-only snapshot of a User row, safe to share across requests and threads."""
+
+    def __init__(self, id, username, email, role):
+        self.id = id
+        self.username = username
+        self.email = email
+        self.role = role
+
+    @classmethod
+    def from_user(cls, user):
+        return cls(user.id, user.username, user.email, user.role)
+
+    def is_admin(self):
+        return self.role == "admin"
+
+    def __repr__(self):
+        return f"<SessionUser {self.username}>"
+
+
+class UserCache:
+    """Bounded TTL cache of SessionUser snapshots keyed by user id.
+
+    Entries are dropped when the user row changes in this process; other
+    workers pick the change up once their entry expires after ``ttl`` seconds.
+    """
+
+    def __init__(self, ttl=60, max_items=1024):
+        self.ttl = ttl
+        self.max_items = max_items
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        """Return the SessionUser for ``user_id``, loading it on a miss; None if it does not exist."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(user_id)
+                return entry[1]
+        user = db.session.get(User, user_id)
+        if user is None:
+            return None
+        snapshot = SessionUser.from_user(user)
+        with self._lock:
+            self._entries[user_id] = (now + self.ttl, snapshot)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_items:
+                self._entries.popitem(last=False)
+        return snapshot
+
+    def invalidate(self, user_id=None):
+        """Forget one user, or everyone when ``user_id`` is None."""
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(user_id, None)
+
+
+def get_user_cache():
+    """Return the UserCache of the current app."""
+    return current_app.extensions["user_cache"]
+
+
+# Registration, role and password changes all go through the User mapper.
+# Ids are collected at flush time and evicted once the transaction commits,
+# so a concurrent request cannot re-cache the pre-commit row.
+@event.listens_for(User, "after_insert")
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _remember_changed_user(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault("changed_user_ids", set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _evict_changed_users(session):
+    changed = session.info.pop("changed_user_ids", None)
+    if changed and has_app_context():
+        cache = current_app.extensions.get("user_cache")
+        if cache is not None:
+            for user_id in changed:
+                cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changed_users(session):
+    session.info.pop("changed_user_ids", None)
+
+
+def init_app(app):
+    """Attach a UserCache configured from ``app.config`` to ``app``."""
+    app.extensions["user_cache"] = UserCache(app.config["USER_CACHE_TTL"], app.config["USER_CACHE_MAX_ITEMS"])
@@ -0,0 +1,180 @@
+"""Visit history: an append-only log of the visits recorded for each migrant.
+
+The visit columns on Migrant (last_checkup, diagnosis, ...) describe the
+latest visit and stay there for the forms, API, import and export. Every
+write that sets them also appends a ``visits`` row from mapper events, so
+the history survives the next edit: a new check-up date, a second visit
+on the same day and a corrected diagnosis each add a row (a cheap insert)
+and no stored visit is rewritten. The migrant's own row is still updated
+on every visit, so the log does not take writes off it. The history is read a page at a time
+through (migrant_id, visit_date), and a facility's workload through
+(healthcare_facility, visit_date).
+"""
+
+from datetime import date, timedelta
+
+from flask import Blueprint, current_app, render_template, request, url_for
+from flask_login import login_required
+from sqlalchemy import event, inspect, text
+
+from models import db, Migrant, Visit, migrants_bulk_inserted
+from pagination import paginate_keyset
+
+bp = Blueprint("visits", __name__)
+
+# Migrant column -> visits column
+VISIT_FIELDS = {
+    "last_checkup": "visit_date",
+    "healthcare_facility": "healthcare_facility",
+    "doctor_name": "doctor_name",
+    "vital_signs": "vital_signs",
+    "symptoms": "symptoms",
+    "diagnosis": "diagnosis",
+    "prescriptions": "prescriptions",
+    "lab_results": "lab_results",
+}
+
+_columns = ", ".join(VISIT_FIELDS.values())
+_INSERT_SQL = text(
+    f"INSERT INTO visits (migrant_id, {_columns}) VALUES (:migrant_id, {', '.join(':' + c for c in VISIT_FIELDS.values())})"
+)
+_DETAIL_COLUMNS = [column for column in VISIT_FIELDS.values() if column != "visit_date"]
+_SAME_DAY_SQL = text(f"SELECT {', '.join(_DETAIL_COLUMNS)} FROM visits "
+                     "WHERE migrant_id = :migrant_id AND visit_date = :visit_date")
+_DELETE_SQL = text("DELETE FROM visits WHERE migrant_id = :migrant_id")
+# Backfill (and the migration) copy the same columns straight from migrants
+BACKFILL_SQL = text(
+    f"INSERT INTO visits (migrant_id, {_columns}) SELECT id, {', '.join(VISIT_FIELDS)} "
+    "FROM migrants WHERE last_checkup IS NOT NULL ORDER BY id"
+)
+
+
+def visit_row(migrant_id, values):
+    """Return the visits row for a migrant with column ``values``, or None without a check-up date."""
+    if values.get("last_checkup") is None:
+        return None
+    row = {column: values.get(field) for field, column in VISIT_FIELDS.items()}
+    row["migrant_id"] = migrant_id
+    return row
+
+
+def _current_values(target):
+    return {field: getattr(target, field) for field in VISIT_FIELDS}
+
+
+# ORM hooks: visits are written on the flush connection, inside the record's own transaction.
+@event.listens_for(Migrant, "after_insert")
+def _after_insert(mapper, connection, target):
+    row = visit_row(target.id, _current_values(target))
+    if row is not None:
+        connection.execute(_INSERT_SQL, row)
+
+
+@event.listens_for(Migrant, "after_update")
+def _after_update(mapper, connection, target):
+    state = inspect(target)
+    if not any(state.attrs[field].history.has_changes() for field in VISIT_FIELDS):
+        return  # Checked without loading deferred columns
+    row = visit_row(target.id, _current_values(target))
+    if row is None:
+        return
+    # A visit already logged as it is (e.g. moved over by a merge that then copies it) is not logged twice
+    recorded = connection.execute(_SAME_DAY_SQL, row).mappings()
+    if not any(all(other[column] == row[column] for column in _DETAIL_COLUMNS) for other in recorded):
+        connection.execute(_INSERT_SQL, row)
+
+
+@event.listens_for(Migrant, "before_delete")
+def _before_delete(mapper, connection, target):
+    connection.execute(_DELETE_SQL, {"migrant_id": target.id})
+
+
+@migrants_bulk_inserted.connect
+def _after_bulk_insert(sender, connection, rows):
+    entries = [entry for entry in (visit_row(row["id"], row) for row in rows) if entry is not None]
+    if entries:
+        connection.execute(_INSERT_SQL, entries)
+
+
+def ensure_built():
+    """Copy the latest visit of every migrant into ``visits`` when the table is still empty."""
+    if db.session.query(Visit.id).first() is None:
+        db.session.execute(BACKFILL_SQL)
+        db.session.commit()
+
+
+def reassign(from_id, to_id):
+    """Move the visits of migrant ``from_id`` to ``to_id`` (when merging records); both histories are kept."""
+    db.session.execute(text("UPDATE visits SET migrant_id = :to_id WHERE migrant_id = :from_id"),
+                       {"from_id": from_id, "to_id": to_id})
+
+
+def history_page(migrant_id, before=None):
+    """A KeysetPage of a migrant's visits, newest first, continuing after the (visit_date, id) cursor ``before``."""
+    query = db.session.query(Visit).filter(Visit.migrant_id == migrant_id)
+    return paginate_keyset(query, (Visit.visit_date, Visit.id), after=before,
+                           per_page=current_app.config["VISITS_PER_PAGE"])
+
+
+def format_cursor(cursor):
+    return f"{cursor[0].isoformat()}.{cursor[1]}" if cursor else None
+
+
+def parse_cursor(value):
+    """Turn a "YYYY-MM-DD.<id>" paging cursor back into (date, id); None if it is malformed."""
+    try:
+        visit_date, visit_id = value.split(".")
+        return date.fromisoformat(visit_date), int(visit_id)
+    except (AttributeError, ValueError):
+        return None
+
+
+def parse_date(value):
+    try:
+        return date.fromisoformat(value) if value else None
+    except ValueError:
+        return None
+
+
+def next_page_url(migrant_id, page):
+    """URL of the history fragment after ``page``, or None on the last page."""
+    if not page.has_next:
+        return None
+    return url_for("visits.visit_history", migrant_id=migrant_id, before=format_cursor(page.next_cursor))
+
+
+@bp.route("/view/<int:migrant_id>/visits")
+@login_required
+def visit_history(migrant_id):
+    """The next rows of a migrant's visit history, as an HTML fragment for the record page."""
+    page = history_page(migrant_id, parse_cursor(request.args.get("before")))
+    response = current_app.make_response(render_template("_visit_rows.html", visits=page.items))
+    next_url = next_page_url(migrant_id, page)
+    if next_url:
+        response.headers["X-Next-Page"] = next_url
+    return response
+
+
+@bp.route("/visits")
+@login_required
+def facility_visits():
+    """Visits at one facility in a date range (default: the last 30 days), newest first."""
+    facility = request.args.get("facility") or None
+    last = parse_date(request.args.get("to")) or date.today()
+    first = parse_date(request.args.get("from")) or last - timedelta(days=29)
+    page = None
+    if facility:
+        query = db.session.query(Visit.id, Visit.visit_date, Visit.migrant_id, Visit.doctor_name, Visit.diagnosis,
+                                 Migrant.name).join(Migrant, Migrant.id == Visit.migrant_id).filter(
+            Visit.healthcare_facility == facility, Visit.visit_date >= first, Visit.visit_date <= last
+        )
+        page = paginate_keyset(query, (Visit.visit_date, Visit.id), after=parse_cursor(request.args.get("after")),
+                               before=parse_cursor(request.args.get("before")),
+                               per_page=current_app.config["VISITS_PER_PAGE"])
+    return render_template("facility_visits.html", page=page, facility=facility, first=first, last=last,
+                           format_cursor=format_cursor, title="Facility Visits")
+
+
+def init_app(app):
+    """Register the visit history routes on ``app``."""
+    app.register_blueprint(bp)